@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import Application, ApplicationDocument, ApplicationEvaluation, ApplicationNotification
+from . import evaluations
+from .models import (
+    Application, ApplicationDocument, ApplicationEvaluation, ApplicationNotification,
+    EvaluationSummary, NotificationArchive, NotificationCounter, NotificationOutbox, ProjectWaitlist, WaitlistEntry
+)
 
 
 @admin.register(Application)
@@ -51,6 +55,23 @@ class ApplicationEvaluationAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('application__user', 'evaluator')
+    
+    # Los cambios desde el admin no pasan por record_evaluation: recalcular los resúmenes afectados
+    def save_model(self, request, obj, form, change):
+        application_ids = {obj.application_id}
+        if change and 'application' in form.changed_data:
+            application_ids.add(form.initial['application'])
+        super().save_model(request, obj, form, change)
+        evaluations.refresh_summaries(application_ids)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        evaluations.refresh_summaries([obj.application_id])
+    
+    def delete_queryset(self, request, queryset):
+        application_ids = set(queryset.values_list('application_id', flat=True))
+        super().delete_queryset(request, queryset)
+        evaluations.refresh_summaries(application_ids)
 
 
 @admin.register(ApplicationNotification)
@@ -65,3 +86,86 @@ class ApplicationNotificationAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('recipient', 'application__user', 'application__project')
+
+
+@admin.register(ProjectWaitlist)
+class ProjectWaitlistAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo ProjectWaitlist
+    """
+    list_display = ('project', 'size', 'head', 'tail', 'updated_at')
+    search_fields = ('project__name',)
+    readonly_fields = ('head', 'tail', 'size', 'created_at', 'updated_at')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('project')
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo WaitlistEntry
+    """
+    list_display = ('application', 'waitlist', 'position', 'created_at')
+    search_fields = ('application__user__first_name', 'application__user__last_name', 'application__project__name')
+    ordering = ('waitlist', 'position')
+    readonly_fields = ('position', 'created_at')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('waitlist__project', 'application__user', 'application__project')
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo NotificationOutbox
+    """
+    list_display = ('notification_type', 'recipient', 'status', 'attempts', 'available_at', 'dispatched_at')
+    list_filter = ('status', 'notification_type')
+    search_fields = ('recipient__first_name', 'recipient__last_name', 'title')
+    ordering = ('-created_at',)
+    readonly_fields = ('notification', 'attempts', 'last_error', 'created_at', 'dispatched_at')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('recipient', 'application')
+
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo NotificationCounter
+    """
+    list_display = ('user', 'unread_count', 'updated_at')
+    search_fields = ('user__first_name', 'user__last_name', 'user__username')
+    readonly_fields = ('unread_count', 'updated_at')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo NotificationArchive
+    """
+    list_display = ('user', 'notification_count', 'oldest_at', 'newest_at', 'created_at')
+    search_fields = ('user__first_name', 'user__last_name', 'user__username')
+    exclude = ('payload',)
+    readonly_fields = ('notification_count', 'oldest_at', 'newest_at', 'created_at')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(EvaluationSummary)
+class EvaluationSummaryAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo EvaluationSummary
+    """
+    list_display = ('application', 'project', 'mean_score', 'evaluation_count', 'approve_count', 'reject_count', 'interview_count')
+    list_filter = ('project',)
+    search_fields = ('application__user__first_name', 'application__user__last_name', 'project__name')
+    readonly_fields = ('evaluation_count', 'score_total', 'mean_score', 'approve_count', 'reject_count', 'interview_count', 'updated_at')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('application__user', 'application__project', 'project')
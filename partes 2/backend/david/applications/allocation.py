@@ -0,0 +1,299 @@
+"""
+Asignación masiva de aplicaciones pendientes a proyectos.
+
+El problema se modela como un flujo de costo mínimo: fuente -> estudiante
+(capacidad `max_per_student`) -> proyecto (una arista por aplicación, costo
+igual al peso negativo) -> sumidero (capacidad igual a las plazas libres). La
+solución maximiza el peso total sin exceder ningún cupo. Se resuelve con
+caminos mínimos sucesivos (Dijkstra con potenciales) aumentando todos los
+caminos de igual costo en cada fase.
+
+El peso combina la puntuación promedio de las evaluaciones, las horas por semana
+disponibles frente a las que requiere el proyecto y la cercanía entre la fecha
+de inicio preferida y el inicio del proyecto.
+"""
+
+import hashlib
+import heapq
+from collections import defaultdict
+
+from django.db import transaction
+
+from projects.models import Project
+from . import bulk
+from .models import Application
+
+
+# Peso relativo de cada criterio (suman 1)
+SCORE_WEIGHT = 0.6
+HOURS_WEIGHT = 0.25
+START_DATE_WEIGHT = 0.15
+
+# Puntuación asumida para aplicaciones sin evaluaciones (escala 1-10)
+UNEVALUATED_SCORE = 5.0
+
+# Días de diferencia con el inicio del proyecto a partir de los cuales la fecha no suma
+START_DATE_TOLERANCE_DAYS = 60
+
+# Los pesos se escalan a enteros para comparar costos de forma exacta
+WEIGHT_SCALE = 1000
+
+INFINITY = float('inf')
+
+
+class PlanChanged(Exception):
+    """El plan confirmado ya no coincide con el que se calcula al aplicar"""
+
+
+def weekly_hours_needed(project):
+    weeks = max((project['end_date'] - project['start_date']).days / 7, 1)
+    return max(project['max_hours'] / weeks, 1)
+
+
+def application_weight(application, project):
+    """Peso entero (1..WEIGHT_SCALE) de asignar la aplicación al proyecto"""
+    mean_score = application['evaluation_summary__mean_score']
+    score = (mean_score if mean_score is not None else UNEVALUATED_SCORE) / 10
+
+    hours = min(application['available_hours_per_week'] / weekly_hours_needed(project), 1)
+
+    days_apart = abs((application['start_date_preference'] - project['start_date'].date()).days)
+    start_date = 1 - min(days_apart / START_DATE_TOLERANCE_DAYS, 1)
+
+    weight = SCORE_WEIGHT * score + HOURS_WEIGHT * hours + START_DATE_WEIGHT * start_date
+    return max(round(weight * WEIGHT_SCALE), 1)
+
+
+class _FlowGraph:
+    """Grafo residual en listas paralelas; la arista inversa de `e` es `e ^ 1`"""
+
+    def __init__(self, size):
+        self.adjacency = [[] for _ in range(size)]
+        self.to = []
+        self.capacity = []
+        self.cost = []
+
+    def add_edge(self, source, target, capacity, cost):
+        edge = len(self.to)
+        self.adjacency[source].append(edge)
+        self.to.append(target)
+        self.capacity.append(capacity)
+        self.cost.append(cost)
+        self.adjacency[target].append(edge + 1)
+        self.to.append(source)
+        self.capacity.append(0)
+        self.cost.append(-cost)
+        return edge
+
+    def _shortest_paths(self, source, potential):
+        size = len(self.adjacency)
+        distance = [INFINITY] * size
+        distance[source] = 0
+        heap = [(0, source)]
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if dist > distance[node]:
+                continue
+            for edge in self.adjacency[node]:
+                if self.capacity[edge] <= 0:
+                    continue
+                target = self.to[edge]
+                candidate = dist + self.cost[edge] + potential[node] - potential[target]
+                if candidate < distance[target]:
+                    distance[target] = candidate
+                    heapq.heappush(heap, (candidate, target))
+        return distance
+
+    def _augment(self, source, sink, potential, next_edge, dead):
+        """Busca (DFS iterativo) un camino de aristas con costo reducido 0 y lo aumenta"""
+        stack = [source]
+        path = []
+        on_path = {source}
+        while stack:
+            node = stack[-1]
+            if node == sink:
+                flow = min(self.capacity[edge] for edge in path)
+                for edge in path:
+                    self.capacity[edge] -= flow
+                    self.capacity[edge ^ 1] += flow
+                return flow
+
+            edges = self.adjacency[node]
+            while next_edge[node] < len(edges):
+                edge = edges[next_edge[node]]
+                target = self.to[edge]
+                if (self.capacity[edge] > 0 and not dead[target] and target not in on_path and
+                        self.cost[edge] + potential[node] - potential[target] == 0):
+                    break
+                next_edge[node] += 1
+            else:
+                dead[node] = True
+                on_path.discard(stack.pop())
+                if path:
+                    path.pop()
+                    next_edge[stack[-1]] += 1
+                continue
+
+            stack.append(target)
+            path.append(edge)
+            on_path.add(target)
+        return 0
+
+    def min_cost_flow(self, source, sink, potential):
+        """
+        Aumenta mientras el camino más corto tenga costo negativo.
+        `potential` debe dejar costos reducidos no negativos en las aristas con capacidad.
+        """
+        size = len(self.adjacency)
+        while True:
+            distance = self._shortest_paths(source, potential)
+            if distance[sink] == INFINITY:
+                return
+            for node in range(size):
+                potential[node] += min(distance[node], distance[sink])
+            if potential[sink] - potential[source] >= 0:
+                return
+
+            next_edge = [0] * size
+            dead = [False] * size
+            while self._augment(source, sink, potential, next_edge, dead):
+                pass
+
+
+def _candidates(project_ids=None, min_score=None):
+    projects = Project.objects.filter(is_active=True)
+    if project_ids:
+        projects = projects.filter(id__in=project_ids)
+    projects = {
+        project['id']: project
+        for project in projects.values(
+            'id', 'name', 'max_participants', 'current_participants',
+            'max_hours', 'start_date', 'end_date'
+        )
+        if project['max_participants'] > project['current_participants']
+    }
+
+    applications = Application.objects.filter(
+        status='pending',
+        project_id__in=projects.keys()
+    )
+    if min_score is not None:
+        applications = applications.filter(evaluation_summary__mean_score__gte=min_score)
+    applications = list(applications.order_by('id').values(
+        'id', 'user_id', 'user__carnet', 'project_id', 'available_hours_per_week',
+        'start_date_preference', 'evaluation_summary__mean_score'
+    ))
+    return projects, applications
+
+
+def build_plan(project_ids=None, max_per_student=1, min_score=None):
+    """
+    Calcula la asignación óptima sin modificar nada.
+
+    Retorna un diccionario con el resumen por proyecto (aplicaciones a aprobar
+    y cuántas quedan pendientes), los totales y `plan`, un resumen (hash) de las
+    aprobaciones que se usa para confirmar que se aplica exactamente lo revisado.
+    """
+    projects, applications = _candidates(project_ids, min_score)
+
+    students = {user_id: index for index, user_id in enumerate(sorted({a['user_id'] for a in applications}))}
+    project_nodes = {project_id: index for index, project_id in enumerate(projects)}
+    source, sink = 0, 1
+    student_base = 2
+    project_base = student_base + len(students)
+
+    graph = _FlowGraph(project_base + len(projects))
+    potential = [0] * (project_base + len(projects))
+
+    for index in range(len(students)):
+        graph.add_edge(source, student_base + index, max_per_student, 0)
+
+    edges = {}
+    weights = {}
+    for application in applications:
+        project = projects[application['project_id']]
+        weight = application_weight(application, project)
+        project_node = project_base + project_nodes[project['id']]
+        edges[application['id']] = graph.add_edge(
+            student_base + students[application['user_id']], project_node, 1, -weight
+        )
+        weights[application['id']] = weight
+        potential[project_node] = min(potential[project_node], -weight)
+
+    for project_id, index in project_nodes.items():
+        project = projects[project_id]
+        spots = project['max_participants'] - project['current_participants']
+        graph.add_edge(project_base + index, sink, spots, 0)
+    potential[sink] = min(potential[project_base:], default=0)
+
+    graph.min_cost_flow(source, sink, potential)
+
+    assigned = {
+        application['id'] for application in applications
+        if graph.capacity[edges[application['id']]] == 0
+    }
+
+    by_project = defaultdict(list)
+    for application in applications:
+        by_project[application['project_id']].append(application)
+
+    summary = []
+    for project_id, project in projects.items():
+        project_applications = by_project[project_id]
+        approve = sorted(
+            (a for a in project_applications if a['id'] in assigned),
+            key=lambda a: (-weights[a['id']], a['id'])
+        )
+        summary.append({
+            'project': project_id,
+            'project_name': project['name'],
+            'available_spots': project['max_participants'] - project['current_participants'],
+            'approve': [
+                {
+                    'application': a['id'],
+                    'user': a['user_id'],
+                    'user_carnet': a['user__carnet'],
+                    'weight': weights[a['id']] / WEIGHT_SCALE,
+                }
+                for a in approve
+            ],
+            'pending_left': len(project_applications) - len(approve),
+        })
+
+    return {
+        'plan': plan_digest(assigned),
+        'projects': summary,
+        'total_pending': len(applications),
+        'total_approved': len(assigned),
+        'total_weight': sum(weights[application_id] for application_id in assigned) / WEIGHT_SCALE,
+    }
+
+
+def plan_digest(application_ids):
+    payload = ','.join(str(application_id) for application_id in sorted(application_ids))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def apply_plan(reviewer=None, plan=None, notes='', **options):
+    """
+    Recalcula la asignación con los proyectos bloqueados y la aplica en una sola
+    transacción: aprobaciones, membresías y notificaciones por conjuntos.
+    Si se indica `plan` y no coincide con el recalculado lanza PlanChanged.
+    """
+    with transaction.atomic():
+        project_ids = options.get('project_ids')
+        locked = Project.objects.select_for_update().filter(is_active=True)
+        if project_ids:
+            locked = locked.filter(id__in=project_ids)
+        list(locked.order_by('id').values_list('id', flat=True))
+
+        result = build_plan(**options)
+        if plan is not None and plan != result['plan']:
+            raise PlanChanged(result['plan'])
+
+        application_ids = [
+            entry['application'] for project in result['projects'] for entry in project['approve']
+        ]
+        bulk.bulk_review(application_ids, 'approved', reviewer, notes)
+
+    return result
@@ -5,3 +5,6 @@ class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications'
     verbose_name = 'Aplicaciones'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,70 @@
+"""
+Revisión masiva de aplicaciones con operaciones por conjuntos.
+
+Independientemente de cuántas aplicaciones se revisen, el costo es un número
+fijo de sentencias: un SELECT de las pendientes, un UPDATE condicional, los
+INSERT en lote de eventos de notificación y miembros, y un UPDATE de contadores.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from projects import membership
+from . import outbox
+from .models import Application
+
+
+BATCH_SIZE = 1000
+
+
+def bulk_review(application_ids, new_status, reviewer, notes=''):
+    """
+    Cambia a `new_status` todas las aplicaciones pendientes de `application_ids`.
+
+    Si se aprueban, los estudiantes se agregan como miembros de sus proyectos y
+    se recalculan los contadores de participantes, igual que en review_application.
+    Retorna la lista de aplicaciones actualizadas (con su proyecto cargado).
+    """
+    with transaction.atomic():
+        applications = list(
+            Application.objects.select_for_update().filter(
+                id__in=application_ids,
+                status='pending'
+            ).select_related('project').only(
+                'id', 'user_id', 'project_id', 'project__name'
+            )
+        )
+        if not applications:
+            return []
+
+        now = timezone.now()
+        Application.objects.filter(
+            id__in=[application.id for application in applications],
+            status='pending'
+        ).update(
+            status=new_status,
+            reviewed_by=reviewer,
+            reviewed_at=now,
+            review_notes=notes,
+            updated_at=now
+        )
+        for application in applications:
+            application.status = new_status
+
+        outbox.publish_many((
+            (
+                application.id,
+                application.user_id,
+                f'application_{new_status}',
+                f'Aplicación {new_status}',
+                f'Tu aplicación para el proyecto {application.project.name} ha sido {new_status}.'
+            )
+            for application in applications
+        ), batch_size=BATCH_SIZE)
+
+        if new_status == 'approved':
+            membership.add_memberships(
+                (application.project_id, application.user_id) for application in applications
+            )
+
+    return applications
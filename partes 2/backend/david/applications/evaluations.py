@@ -0,0 +1,128 @@
+"""
+Agregados de evaluaciones y preselección de aplicantes.
+
+Cada evaluación nueva actualiza el EvaluationSummary de su aplicación con un
+UPDATE atómico. La preselección de un proyecto recorre solo tuplas
+(promedio, id) de los resúmenes, elige las k mejores con un heap y carga el
+detalle únicamente de esas k; la paginación es por cursor (keyset).
+"""
+
+import heapq
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast
+
+from .models import ApplicationEvaluation, EvaluationSummary
+
+
+RECOMMENDATION_FIELDS = {
+    'approve': 'approve_count',
+    'reject': 'reject_count',
+    'interview': 'interview_count',
+}
+
+
+def record_evaluation(evaluation):
+    """
+    Suma una evaluación recién creada al resumen de su aplicación.
+    Debe llamarse en la misma transacción que crea la evaluación.
+    """
+    application = evaluation.application
+    EvaluationSummary.objects.get_or_create(
+        application_id=application.id,
+        defaults={'project_id': application.project_id}
+    )
+
+    # Las expresiones del lado derecho usan los valores previos de la fila
+    recommendation_field = RECOMMENDATION_FIELDS[evaluation.recommendation]
+    EvaluationSummary.objects.filter(application_id=application.id).update(
+        evaluation_count=F('evaluation_count') + 1,
+        score_total=F('score_total') + evaluation.score,
+        mean_score=Cast(F('score_total') + evaluation.score, FloatField()) / (F('evaluation_count') + 1),
+        **{recommendation_field: F(recommendation_field) + 1}
+    )
+
+
+def refresh_summaries(application_ids=None):
+    """
+    Recalcula los resúmenes desde ApplicationEvaluation. ApplicationEvaluationAdmin
+    la llama al crear, editar o borrar evaluaciones. Sin `application_ids`, todos.
+    """
+    evaluations = ApplicationEvaluation.objects.all()
+    summaries = EvaluationSummary.objects.all()
+    if application_ids is not None:
+        evaluations = evaluations.filter(application_id__in=application_ids)
+        summaries = summaries.filter(application_id__in=application_ids)
+
+    rows = evaluations.order_by().values('application_id', 'application__project_id').annotate(
+        evaluation_count=Count('id'),
+        score_total=Sum('score'),
+        **{
+            field: Count('id', filter=Q(recommendation=recommendation))
+            for recommendation, field in RECOMMENDATION_FIELDS.items()
+        }
+    )
+
+    with transaction.atomic():
+        summaries.delete()
+        EvaluationSummary.objects.bulk_create([
+            EvaluationSummary(
+                application_id=row['application_id'],
+                project_id=row['application__project_id'],
+                evaluation_count=row['evaluation_count'],
+                score_total=row['score_total'],
+                mean_score=row['score_total'] / row['evaluation_count'],
+                **{field: row[field] for field in RECOMMENDATION_FIELDS.values()}
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+def encode_cursor(summary):
+    return f'{summary.mean_score!r}:{summary.application_id}'
+
+
+def decode_cursor(cursor):
+    """Retorna (promedio, application_id) o lanza ValueError"""
+    mean_score, application_id = cursor.split(':')
+    return float(mean_score), int(application_id)
+
+
+def shortlist(project_id, k=20, cursor=None, statuses=('pending',), min_evaluations=1):
+    """
+    Las k aplicaciones mejor evaluadas del proyecto, por promedio descendente y,
+    a igual promedio, por orden de llegada (id ascendente).
+    `cursor` es el valor retornado en la página anterior.
+    Retorna (resúmenes con aplicación y usuario cargados, cursor_siguiente).
+    """
+    candidates = EvaluationSummary.objects.filter(
+        project_id=project_id,
+        evaluation_count__gte=min_evaluations
+    )
+    if statuses:
+        candidates = candidates.filter(application__status__in=statuses)
+    if cursor is not None:
+        mean_score, application_id = decode_cursor(cursor)
+        candidates = candidates.filter(
+            Q(mean_score__lt=mean_score) |
+            Q(mean_score=mean_score, application_id__gt=application_id)
+        )
+
+    # Selección con heap sobre tuplas livianas; se pide uno extra para saber si hay más
+    top = heapq.nsmallest(
+        k + 1,
+        candidates.values_list('mean_score', 'application_id').iterator(),
+        key=lambda row: (-row[0], row[1])
+    )
+    has_more = len(top) > k
+    top = top[:k]
+
+    summaries = EvaluationSummary.objects.filter(
+        application_id__in=[application_id for _, application_id in top]
+    ).select_related('application__user')
+    order = {application_id: index for index, (_, application_id) in enumerate(top)}
+    summaries = sorted(summaries, key=lambda summary: order[summary.application_id])
+
+    next_cursor = encode_cursor(summaries[-1]) if has_more else None
+    return summaries, next_cursor
@@ -0,0 +1,119 @@
+"""
+Pub/sub de eventos de notificaciones para el stream SSE.
+
+El backend por defecto (InProcessBroker) reparte los eventos entre las
+conexiones abiertas en el mismo proceso; el poller de applications.stream le
+entrega las notificaciones creadas por cualquier proceso. Se puede reemplazar
+con NOTIFICATION_EVENTS_BACKEND (ruta a una clase con la misma interfaz:
+subscribe, unsubscribe, has_subscribers, subscribed_users y publish).
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import notifications as counters
+
+
+DEFAULT_BACKEND = 'applications.events.InProcessBroker'
+
+# Eventos sin leer que se guardan por conexión antes de descartar los más viejos
+QUEUE_SIZE = 100
+
+
+class InProcessBroker:
+    """
+    Broker en memoria: una cola asyncio por conexión, agrupadas por usuario.
+    `publish` se puede llamar desde cualquier hilo (vistas síncronas, comandos).
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Registra una conexión del usuario y retorna su cola"""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None:
+                return
+            subscribers.difference_update([s for s in subscribers if s[1] is queue])
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscribers
+
+    def subscribed_users(self):
+        """Usuarios con al menos una conexión abierta en este proceso"""
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_put_latest, queue, event)
+
+
+def _put_latest(queue, event):
+    """Encola el evento; si la conexión está atrasada descarta el más viejo"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        backend = getattr(settings, 'NOTIFICATION_EVENTS_BACKEND', DEFAULT_BACKEND)
+        _broker = import_string(backend)()
+    return _broker
+
+
+def publish_notifications(notifications):
+    """Publica las notificaciones a las conexiones abiertas de sus destinatarios"""
+    broker = get_broker()
+    for notification in notifications:
+        if not broker.has_subscribers(notification.recipient_id):
+            continue
+        broker.publish(notification.recipient_id, {
+            'event': 'notification',
+            'data': {
+                'id': notification.id,
+                'application': notification.application_id,
+                'notification_type': notification.notification_type,
+                'title': notification.title,
+                'message': notification.message,
+                'is_read': notification.is_read,
+                'created_at': notification.created_at.isoformat(),
+            }
+        })
+
+
+def publish_unread_counts(counts):
+    """Publica los contadores de no leídas de {user_id: sin_leer}"""
+    broker = get_broker()
+    for user_id, unread_count in counts.items():
+        broker.publish(user_id, {'event': 'unread_count', 'data': {'unread_count': unread_count}})
+
+
+def publish_unread_count(user_id):
+    """Publica el contador de no leídas del usuario (por ejemplo, después de marcar leídas)"""
+    broker = get_broker()
+    if not broker.has_subscribers(user_id):
+        return
+    unread_count = counters.unread_count(user_id)
+    broker.publish(user_id, {'event': 'unread_count', 'data': {'unread_count': unread_count}})
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0001_initial'),
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('approved', 'Aprobada'), ('rejected', 'Rechazada'), ('in_progress', 'En Progreso'), ('completed', 'Completada'), ('cancelled', 'Cancelada'), ('waitlisted', 'En Lista de Espera')], default='pending', max_length=20, verbose_name='Estado'),
+        ),
+        migrations.CreateModel(
+            name='ProjectWaitlist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('head', models.PositiveIntegerField(default=0, verbose_name='Cabeza')),
+                ('tail', models.PositiveIntegerField(default=0, verbose_name='Cola')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='projects.project', verbose_name='Proyecto')),
+            ],
+            options={
+                'verbose_name': 'Lista de Espera',
+                'verbose_name_plural': 'Listas de Espera',
+            },
+        ),
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(verbose_name='Posición Absoluta')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entry', to='applications.application', verbose_name='Aplicación')),
+                ('waitlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='applications.projectwaitlist', verbose_name='Lista de Espera')),
+            ],
+            options={
+                'verbose_name': 'Entrada de Lista de Espera',
+                'verbose_name_plural': 'Entradas de Listas de Espera',
+                'ordering': ['position'],
+                'indexes': [models.Index(fields=['waitlist', 'position'], name='application_waitlis_2b6ef5_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_project_waitlist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(max_length=30, verbose_name='Tipo de Notificación')),
+                ('title', models.CharField(max_length=200, verbose_name='Título')),
+                ('message', models.TextField(verbose_name='Mensaje')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('dispatched', 'Despachado'), ('failed', 'Fallido')], default='pending', max_length=20, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos de Envío')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Disponible Desde')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Despacho')),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_events', to='applications.application', verbose_name='Aplicación')),
+                ('notification', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='applications.applicationnotification', verbose_name='Notificación Creada')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_events', to=settings.AUTH_USER_MODEL, verbose_name='Destinatario')),
+            ],
+            options={
+                'verbose_name': 'Evento de Notificación',
+                'verbose_name_plural': 'Bandeja de Salida de Notificaciones',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='application_status_a673fd_idx')],
+            },
+        ),
+    ]
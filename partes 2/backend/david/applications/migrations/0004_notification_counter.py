@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    ApplicationNotification = apps.get_model('applications', 'ApplicationNotification')
+    NotificationCounter = apps.get_model('applications', 'NotificationCounter')
+    unread = ApplicationNotification.objects.filter(is_read=False).order_by().values(
+        'recipient_id'
+    ).annotate(total=Count('id'))
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row['recipient_id'], unread_count=row['total']) for row in unread],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_notification_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0, verbose_name='Notificaciones sin Leer')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Contador de Notificaciones',
+                'verbose_name_plural': 'Contadores de Notificaciones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='applicationnotification',
+            index=models.Index(fields=['recipient', 'is_read', 'created_at'], name='application_recipie_a8e8cb_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_counter', to=settings.AUTH_USER_MODEL, verbose_name='Usuario'),
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_notification_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.BinaryField(verbose_name='Notificaciones Comprimidas')),
+                ('notification_count', models.PositiveIntegerField(verbose_name='Cantidad de Notificaciones')),
+                ('oldest_at', models.DateTimeField(verbose_name='Notificación más Antigua')),
+                ('newest_at', models.DateTimeField(verbose_name='Notificación más Reciente')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_archives', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Archivo de Notificaciones',
+                'verbose_name_plural': 'Archivos de Notificaciones',
+                'ordering': ['-newest_at', '-id'],
+                'indexes': [models.Index(fields=['user', '-newest_at', '-id'], name='application_user_id_79575f_idx')],
+            },
+        ),
+    ]
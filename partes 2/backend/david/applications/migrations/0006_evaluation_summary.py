@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def seed_summaries(apps, schema_editor):
+    ApplicationEvaluation = apps.get_model('applications', 'ApplicationEvaluation')
+    EvaluationSummary = apps.get_model('applications', 'EvaluationSummary')
+    rows = ApplicationEvaluation.objects.order_by().values('application_id', 'application__project_id').annotate(
+        evaluation_count=Count('id'),
+        score_total=Sum('score'),
+        approve_count=Count('id', filter=Q(recommendation='approve')),
+        reject_count=Count('id', filter=Q(recommendation='reject')),
+        interview_count=Count('id', filter=Q(recommendation='interview')),
+    )
+    EvaluationSummary.objects.bulk_create([
+        EvaluationSummary(
+            application_id=row['application_id'],
+            project_id=row['application__project_id'],
+            evaluation_count=row['evaluation_count'],
+            score_total=row['score_total'],
+            mean_score=row['score_total'] / row['evaluation_count'],
+            approve_count=row['approve_count'],
+            reject_count=row['reject_count'],
+            interview_count=row['interview_count'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_notification_archive'),
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('evaluation_count', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Evaluaciones')),
+                ('score_total', models.PositiveIntegerField(default=0, verbose_name='Suma de Puntuaciones')),
+                ('mean_score', models.FloatField(default=0, verbose_name='Puntuación Promedio')),
+                ('approve_count', models.PositiveIntegerField(default=0, verbose_name='Recomendaciones de Aprobar')),
+                ('reject_count', models.PositiveIntegerField(default=0, verbose_name='Recomendaciones de Rechazar')),
+                ('interview_count', models.PositiveIntegerField(default=0, verbose_name='Recomendaciones de Entrevista')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_summary', to='applications.application', verbose_name='Aplicación')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_summaries', to='projects.project', verbose_name='Proyecto')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Evaluaciones',
+                'verbose_name_plural': 'Resúmenes de Evaluaciones',
+                'indexes': [models.Index(fields=['project', '-mean_score', 'application'], name='application_project_275817_idx')],
+            },
+        ),
+        migrations.RunPython(seed_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:48
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_size(apps, schema_editor):
+    ProjectWaitlist = apps.get_model('applications', 'ProjectWaitlist')
+    for waitlist in ProjectWaitlist.objects.annotate(waiting=Count('entries')):
+        ProjectWaitlist.objects.filter(pk=waitlist.pk).update(size=waitlist.waiting)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_evaluation_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='waitlistentry',
+            name='application_waitlis_2b6ef5_idx',
+        ),
+        migrations.AddField(
+            model_name='projectwaitlist',
+            name='size',
+            field=models.PositiveIntegerField(default=0, verbose_name='En Espera'),
+        ),
+        migrations.AddConstraint(
+            model_name='waitlistentry',
+            constraint=models.UniqueConstraint(fields=('waitlist', 'position'), name='unique_waitlist_position'),
+        ),
+        migrations.RunPython(seed_size, migrations.RunPython.noop),
+    ]
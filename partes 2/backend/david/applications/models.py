@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from users.models import User
 from projects.models import Project
 
@@ -16,6 +17,7 @@ class Application(models.Model):
         ('in_progress', 'En Progreso'),
         ('completed', 'Completada'),
         ('cancelled', 'Cancelada'),
+        ('waitlisted', 'En Lista de Espera'),
     ]
     
     user = models.ForeignKey(
@@ -234,6 +236,72 @@ class ApplicationEvaluation(models.Model):
         return f"{self.application} - {self.evaluator.full_name}"
 
 
+class EvaluationSummary(models.Model):
+    """
+    Agregados desnormalizados de las evaluaciones de una aplicación.
+    
+    Se actualizan con UPDATE atómicos al crear cada evaluación y permiten
+    ordenar a los aplicantes de un proyecto por puntuación sin leer todas las
+    evaluaciones. `project` se copia de la aplicación para indexar el ranking.
+    """
+    
+    application = models.OneToOneField(
+        Application,
+        on_delete=models.CASCADE,
+        related_name='evaluation_summary',
+        verbose_name='Aplicación'
+    )
+    
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='evaluation_summaries',
+        verbose_name='Proyecto'
+    )
+    
+    evaluation_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Evaluaciones'
+    )
+    
+    score_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Suma de Puntuaciones'
+    )
+    
+    mean_score = models.FloatField(
+        default=0,
+        verbose_name='Puntuación Promedio'
+    )
+    
+    approve_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Recomendaciones de Aprobar'
+    )
+    
+    reject_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Recomendaciones de Rechazar'
+    )
+    
+    interview_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Recomendaciones de Entrevista'
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Resumen de Evaluaciones'
+        verbose_name_plural = 'Resúmenes de Evaluaciones'
+        indexes = [
+            models.Index(fields=['project', '-mean_score', 'application']),
+        ]
+    
+    def __str__(self):
+        return f"{self.application_id}: {self.mean_score:.2f} ({self.evaluation_count} evaluaciones)"
+
+
 class ApplicationNotification(models.Model):
     """
     Notificaciones relacionadas con aplicaciones
@@ -289,6 +357,267 @@ class ApplicationNotification(models.Model):
         verbose_name = 'Notificación de Aplicación'
         verbose_name_plural = 'Notificaciones de Aplicaciones'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.recipient.full_name} - {self.title}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Contador desnormalizado de notificaciones sin leer de un usuario.
+    
+    Se actualiza con UPDATE atómicos (F()) al crear y al marcar notificaciones
+    como leídas, para que el badge no requiera un COUNT por consulta.
+    """
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notification_counter',
+        verbose_name='Usuario'
+    )
+    
+    unread_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Notificaciones sin Leer'
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Contador de Notificaciones'
+        verbose_name_plural = 'Contadores de Notificaciones'
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count} sin leer"
+
+
+class ProjectWaitlist(models.Model):
+    """
+    Lista de espera FIFO de un proyecto.
+    
+    Las entradas reciben posiciones absolutas crecientes que no se renumeran:
+    `tail` es la última posición asignada, `head` la posición de la última
+    entrada que salió por el frente y `size` cuántas siguen esperando. Quitar
+    una entrada del medio deja un hueco, así que encolar, desencolar y quitar
+    tocan una sola entrada; la posición en la cola se cuenta sobre el índice
+    (waitlist, position).
+    """
+    
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='waitlist',
+        verbose_name='Proyecto'
+    )
+    
+    head = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cabeza'
+    )
+    
+    tail = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cola'
+    )
+    
+    size = models.PositiveIntegerField(
+        default=0,
+        verbose_name='En Espera'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Lista de Espera'
+        verbose_name_plural = 'Listas de Espera'
+    
+    def __str__(self):
+        return f"{self.project.name} - {self.get_length()} en espera"
+    
+    def get_length(self):
+        """Cantidad de aplicaciones en espera"""
+        return self.size
+
+
+class WaitlistEntry(models.Model):
+    """
+    Aplicación en la lista de espera de un proyecto
+    """
+    
+    waitlist = models.ForeignKey(
+        ProjectWaitlist,
+        on_delete=models.CASCADE,
+        related_name='entries',
+        verbose_name='Lista de Espera'
+    )
+    
+    application = models.OneToOneField(
+        Application,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entry',
+        verbose_name='Aplicación'
+    )
+    
+    position = models.PositiveIntegerField(
+        verbose_name='Posición Absoluta'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Entrada de Lista de Espera'
+        verbose_name_plural = 'Entradas de Listas de Espera'
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['waitlist', 'position'], name='unique_waitlist_position'),
+        ]
+    
+    def __str__(self):
+        return f"{self.application} - #{self.get_position()}"
+    
+    def get_position(self):
+        """Posición actual en la cola (1 = siguiente en ser promovido)"""
+        return WaitlistEntry.objects.filter(
+            waitlist_id=self.waitlist_id,
+            position__lte=self.position
+        ).count()
+
+
+class NotificationOutbox(models.Model):
+    """
+    Bandeja de salida de notificaciones (patrón outbox transaccional).
+    
+    Las vistas registran los eventos en la misma transacción que el cambio de
+    estado; el despachador (`python manage.py dispatch_notifications`) los
+    convierte en ApplicationNotification y envía el correo en lotes.
+    `python manage.py archive_notifications` borra los despachados antiguos.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('dispatched', 'Despachado'),
+        ('failed', 'Fallido'),
+    ]
+    
+    application = models.ForeignKey(
+        Application,
+        on_delete=models.CASCADE,
+        related_name='outbox_events',
+        verbose_name='Aplicación'
+    )
+    
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='outbox_events',
+        verbose_name='Destinatario'
+    )
+    
+    notification_type = models.CharField(
+        max_length=30,
+        verbose_name='Tipo de Notificación'
+    )
+    
+    title = models.CharField(
+        max_length=200,
+        verbose_name='Título'
+    )
+    
+    message = models.TextField(
+        verbose_name='Mensaje'
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Estado'
+    )
+    
+    notification = models.ForeignKey(
+        ApplicationNotification,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+',
+        verbose_name='Notificación Creada'
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Intentos de Envío'
+    )
+    
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Disponible Desde'
+    )
+    
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Último Error'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Fecha de Despacho'
+    )
+    
+    class Meta:
+        verbose_name = 'Evento de Notificación'
+        verbose_name_plural = 'Bandeja de Salida de Notificaciones'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.notification_type} -> {self.recipient_id} ({self.status})"
+
+
+class NotificationArchive(models.Model):
+    """
+    Bloque comprimido de notificaciones leídas archivadas de un usuario.
+    
+    `python manage.py archive_notifications` mueve aquí las notificaciones
+    antiguas (JSON comprimido con zlib) para mantener pequeña la tabla
+    ApplicationNotification; se consultan bajo demanda desde el endpoint de archivo.
+    """
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notification_archives',
+        verbose_name='Usuario'
+    )
+    
+    payload = models.BinaryField(
+        verbose_name='Notificaciones Comprimidas'
+    )
+    
+    notification_count = models.PositiveIntegerField(
+        verbose_name='Cantidad de Notificaciones'
+    )
+    
+    oldest_at = models.DateTimeField(verbose_name='Notificación más Antigua')
+    newest_at = models.DateTimeField(verbose_name='Notificación más Reciente')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Archivo de Notificaciones'
+        verbose_name_plural = 'Archivos de Notificaciones'
+        ordering = ['-newest_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-newest_at', '-id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.notification_count} notificaciones archivadas"
@@ -0,0 +1,105 @@
+"""
+Contador de notificaciones sin leer.
+
+Cada usuario tiene una fila en NotificationCounter que se incrementa al crear
+notificaciones y se decrementa al marcarlas como leídas o al borrar una sin
+leer (applications.signals, también en cascada), siempre con UPDATE atómicos
+sobre la fila del contador. Marcar como leídas es un solo UPDATE sobre
+ApplicationNotification, sin importar cuántas sean.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import ApplicationNotification, NotificationCounter
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
+
+
+def unread_count(user):
+    """Notificaciones sin leer del usuario, leídas del contador (una consulta)"""
+    return NotificationCounter.objects.filter(user_id=_pk(user)).values_list(
+        'unread_count', flat=True
+    ).first() or 0
+
+
+def unread_counts(user_ids):
+    """Contadores de varios usuarios en una consulta: {user_id: sin_leer}"""
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(
+        NotificationCounter.objects.filter(user_id__in=user_ids).values_list('user_id', 'unread_count')
+    )
+    return counts
+
+
+def increment(user_ids):
+    """
+    Suma al contador una notificación por cada aparición del usuario en `user_ids`.
+    Crea los contadores que falten; un UPDATE por cada incremento distinto.
+    """
+    increments = Counter(user_ids)
+    if not increments:
+        return
+
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id in increments],
+        ignore_conflicts=True
+    )
+
+    by_amount = {}
+    for user_id, amount in increments.items():
+        by_amount.setdefault(amount, []).append(user_id)
+    for amount, ids in by_amount.items():
+        NotificationCounter.objects.filter(user_id__in=ids).update(
+            unread_count=F('unread_count') + amount
+        )
+
+
+def discount(user, amount):
+    """Descuenta `amount` notificaciones sin leer del contador (sin bajar de 0)"""
+    if amount:
+        NotificationCounter.objects.filter(user_id=_pk(user)).update(
+            unread_count=Greatest(F('unread_count') - amount, 0)
+        )
+
+
+def mark_read(user, notification_ids=None):
+    """
+    Marca como leídas las notificaciones del usuario (todas, o solo `notification_ids`)
+    con un único UPDATE y descuenta las que cambiaron. Retorna cuántas se marcaron.
+    """
+    queryset = ApplicationNotification.objects.filter(recipient_id=_pk(user), is_read=False)
+    if notification_ids is not None:
+        queryset = queryset.filter(id__in=notification_ids)
+
+    with transaction.atomic():
+        updated = queryset.update(is_read=True)
+        discount(user, updated)
+    return updated
+
+
+def sync_counters(user_ids=None):
+    """
+    Recalcula los contadores desde ApplicationNotification (por ejemplo, después de
+    un borrado masivo con _raw_delete o SQL directo, que no emite señales).
+    Sin `user_ids` recalcula todos.
+    """
+    counters = NotificationCounter.objects.all()
+    if user_ids is not None:
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in set(user_ids)],
+            ignore_conflicts=True
+        )
+        counters = counters.filter(user_id__in=user_ids)
+
+    unread = ApplicationNotification.objects.filter(
+        recipient_id=OuterRef('user_id'),
+        is_read=False
+    ).values('recipient_id').annotate(total=Count('id')).values('total')
+
+    return counters.update(unread_count=Coalesce(Subquery(unread), 0))
@@ -0,0 +1,191 @@
+"""
+Bandeja de salida transaccional para notificaciones de aplicaciones.
+
+`publish` y `publish_many` solo insertan filas en NotificationOutbox, dentro de
+la transacción de la vista. `dispatch_batch` (usado por el comando
+dispatch_notifications) drena los eventos pendientes: crea las
+ApplicationNotification en lote y envía los correos con una sola conexión del
+EMAIL_BACKEND configurado por lote, reintentando con espera exponencial.
+
+Los correos se envían fuera de toda transacción: tomar el lote y crear las
+notificaciones se confirma primero (el lote queda reservado LEASE_SECONDS
+moviendo su available_at) y el resultado del envío se guarda después en otra
+transacción corta. Así la escritura no queda bloqueada durante el SMTP. Si el
+proceso muere entre ambas, el lote vuelve a tomarse al vencer la reserva: las
+notificaciones no se duplican, pero los correos pueden repetirse.
+
+Un evento despachado ya tiene su ApplicationNotification: prune_dispatched
+(llamado por archive_notifications) borra los que tengan más de RETENTION_DAYS
+días. Los fallidos se conservan para revisarlos.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from . import notifications
+from .models import ApplicationNotification, NotificationOutbox
+
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+
+# Tiempo que un lote tomado queda reservado mientras se envían sus correos
+LEASE_SECONDS = 300
+
+# Días que se conservan los eventos despachados y filas borradas por lote al podarlos
+RETENTION_DAYS = getattr(settings, 'NOTIFICATION_OUTBOX_RETENTION_DAYS', 7)
+PRUNE_BATCH_SIZE = 5000
+
+
+def _event(application, recipient, notification_type, title, message):
+    return NotificationOutbox(
+        application_id=getattr(application, 'pk', application),
+        recipient_id=getattr(recipient, 'pk', recipient),
+        notification_type=notification_type,
+        title=title,
+        message=message
+    )
+
+
+def publish(application, recipient, notification_type, title, message):
+    """Registra un evento de notificación en la transacción actual"""
+    event = _event(application, recipient, notification_type, title, message)
+    event.save()
+    return event
+
+
+def publish_many(events, batch_size=1000):
+    """
+    Registra varios eventos con un INSERT por lote.
+    `events` es un iterable de tuplas (application, recipient, notification_type, title, message).
+    """
+    return NotificationOutbox.objects.bulk_create(
+        [_event(*event) for event in events],
+        batch_size=batch_size
+    )
+
+
+def _claim_batch(batch_size):
+    """Bloquea los próximos eventos disponibles (saltando los que tome otro worker)"""
+    return list(
+        NotificationOutbox.objects.select_for_update(skip_locked=True).filter(
+            status='pending',
+            available_at__lte=timezone.now()
+        ).select_related('recipient', 'notification').order_by('id')[:batch_size]
+    )
+
+
+def _fan_out(events):
+    """Crea las ApplicationNotification que falten (una sola vez por evento)"""
+    missing = [event for event in events if event.notification_id is None]
+    created = ApplicationNotification.objects.bulk_create([
+        ApplicationNotification(
+            application_id=event.application_id,
+            recipient_id=event.recipient_id,
+            notification_type=event.notification_type,
+            title=event.title,
+            message=event.message
+        )
+        for event in missing
+    ])
+    for event, notification in zip(missing, created):
+        event.notification = notification
+    notifications.increment([event.recipient_id for event in missing])
+
+
+def _send_emails(events):
+    """
+    Envía un correo por evento reutilizando una sola conexión.
+    Retorna {event_id: error} para los envíos que fallaron.
+    """
+    errors = {}
+    pending = [event for event in events if event.recipient.email]
+    if not pending:
+        return errors
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for event in pending:
+            message = EmailMessage(
+                subject=event.title,
+                body=event.message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[event.recipient.email],
+                connection=connection
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                errors[event.id] = str(e)
+    except Exception as e:
+        for event in pending:
+            errors.setdefault(event.id, str(e))
+    finally:
+        connection.close()
+
+    return errors
+
+
+def dispatch_batch(batch_size=BATCH_SIZE):
+    """
+    Despacha un lote de eventos pendientes.
+    Retorna (despachados, reintentos_o_fallidos).
+    """
+    with transaction.atomic():
+        events = _claim_batch(batch_size)
+        if not events:
+            return 0, 0
+
+        _fan_out(events)
+        lease = timezone.now() + timedelta(seconds=LEASE_SECONDS)
+        for event in events:
+            event.available_at = lease
+        NotificationOutbox.objects.bulk_update(events, ['notification', 'available_at'])
+
+    errors = _send_emails(events)
+
+    now = timezone.now()
+    for event in events:
+        if event.id in errors:
+            event.attempts += 1
+            event.last_error = errors[event.id]
+            if event.attempts >= MAX_ATTEMPTS:
+                event.status = 'failed'
+            else:
+                event.available_at = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (event.attempts - 1))
+        else:
+            event.status = 'dispatched'
+            event.dispatched_at = now
+
+    with transaction.atomic():
+        NotificationOutbox.objects.bulk_update(
+            events,
+            ['status', 'attempts', 'available_at', 'last_error', 'dispatched_at']
+        )
+
+    return len(events) - len(errors), len(errors)
+
+
+def prune_dispatched(days=RETENTION_DAYS, batch_size=PRUNE_BATCH_SIZE, now=None):
+    """
+    Borra los eventos despachados hace más de `days` días en lotes de
+    `batch_size`, cada uno en su propia transacción. Retorna cuántos se borraron.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = list(
+            NotificationOutbox.objects.filter(status='dispatched', dispatched_at__lt=cutoff)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted += NotificationOutbox.objects.filter(id__in=ids).delete()[0]
+    return deleted
@@ -0,0 +1,136 @@
+"""
+Retención y archivo de notificaciones.
+
+Las notificaciones leídas más antiguas que la ventana de retención (o que
+exceden las N más recientes de cada usuario) se mueven por lotes a
+NotificationArchive como JSON comprimido, un bloque por usuario y lote, y se
+borran de la tabla activa. Solo se archivan notificaciones leídas, así que los
+contadores de no leídas no cambian.
+"""
+
+import json
+import zlib
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import ApplicationNotification, NotificationArchive
+
+
+BATCH_SIZE = 1000
+
+ARCHIVED_FIELDS = ['id', 'application_id', 'notification_type', 'title', 'message', 'created_at']
+
+
+def archivable(days, keep_recent=None):
+    """
+    Notificaciones leídas con más de `days` días o, si se indica `keep_recent`,
+    que no estén entre las `keep_recent` más recientes de su destinatario.
+    """
+    condition = Q(created_at__lt=timezone.now() - timedelta(days=days))
+
+    if keep_recent is not None:
+        ranked = ApplicationNotification.objects.filter(is_read=True).annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F('recipient_id'),
+                order_by=[F('created_at').desc(), F('id').desc()]
+            )
+        ).filter(rank__gt=keep_recent).values('id')
+        condition |= Q(id__in=ranked)
+
+    return ApplicationNotification.objects.filter(condition, is_read=True)
+
+
+def _compress(rows):
+    for row in rows:
+        row['created_at'] = row['created_at'].isoformat()
+    return zlib.compress(json.dumps(rows).encode('utf-8'))
+
+
+def archive_batch(queryset, batch_size=BATCH_SIZE):
+    """
+    Archiva hasta `batch_size` notificaciones de `queryset` en una transacción.
+    Retorna cuántas se archivaron (0 cuando ya no quedan).
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.order_by('recipient_id', 'created_at', 'id').values(
+                'recipient_id', *ARCHIVED_FIELDS
+            )[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        by_user = {}
+        for row in rows:
+            by_user.setdefault(row.pop('recipient_id'), []).append(row)
+
+        NotificationArchive.objects.bulk_create([
+            NotificationArchive(
+                user_id=user_id,
+                notification_count=len(user_rows),
+                oldest_at=user_rows[0]['created_at'],
+                newest_at=user_rows[-1]['created_at'],
+                payload=_compress(user_rows)
+            )
+            for user_id, user_rows in by_user.items()
+        ])
+        ApplicationNotification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+    return len(rows)
+
+
+def read_archive(user, cursor=None, limit=20):
+    """
+    Hasta `limit` notificaciones archivadas del usuario, de la más reciente a
+    la más antigua. El cursor es (id del bloque, notificaciones ya leídas de
+    ese bloque), así que una página nunca trae más de `limit` notificaciones
+    aunque los bloques tengan hasta BATCH_SIZE.
+    Retorna (notificaciones, cursor_siguiente).
+    """
+    archives = NotificationArchive.objects.filter(user=user)
+    skip = 0
+    if cursor is not None:
+        chunk_id, skip = cursor
+        start = archives.filter(id=chunk_id).values('newest_at', 'id').first()
+        if start is None:
+            return [], None
+        archives = archives.filter(
+            Q(newest_at__lt=start['newest_at']) |
+            Q(newest_at=start['newest_at'], id__lte=start['id'])
+        )
+
+    # Cada bloque tiene al menos una notificación: con limit + 1 bloques se llena
+    # la página y se sabe si queda otro. Solo se descomprimen los necesarios.
+    chunks = list(archives.order_by('-newest_at', '-id').values_list('id', 'notification_count')[:limit + 1])
+    needed, available = [], -skip
+    for chunk_id, count in chunks:
+        if available >= limit:
+            break
+        needed.append(chunk_id)
+        available += count
+    payloads = NotificationArchive.objects.filter(id__in=needed).in_bulk()
+
+    notifications = []
+    next_cursor = None
+    for index, chunk_id in enumerate(needed):
+        rows = json.loads(zlib.decompress(bytes(payloads[chunk_id].payload)))[::-1]
+        page_rows = rows[skip:skip + limit - len(notifications)]
+        offset, skip = skip + len(page_rows), 0
+        for row in page_rows:
+            row['application'] = row.pop('application_id')
+            row['is_read'] = True
+            notifications.append(row)
+
+        if len(notifications) == limit:
+            if offset < len(rows):
+                next_cursor = (chunk_id, offset)
+            elif index + 1 < len(chunks):
+                next_cursor = (chunks[index + 1][0], 0)
+            break
+
+    return notifications, next_cursor
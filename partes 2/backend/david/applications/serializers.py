@@ -1,5 +1,10 @@
 from rest_framework import serializers
-from .models import Application, ApplicationDocument, ApplicationEvaluation, ApplicationNotification
+from django.db import IntegrityError, transaction
+from . import waitlist
+from .models import (
+    Application, ApplicationDocument, ApplicationEvaluation, ApplicationNotification, EvaluationSummary
+)
+from projects.models import Project
 from projects.serializers import ProjectListSerializer
 from users.serializers import UserSerializer
 
@@ -49,46 +54,68 @@ class ApplicationSerializer(serializers.ModelSerializer):
 
 class ApplicationCreateSerializer(serializers.ModelSerializer):
     """
-    Serializer para creación de aplicaciones
+    Serializer para creación de aplicaciones.
+    Si la convocatoria está llena, la aplicación queda en lista de espera.
+    
+    La creación es una sola transacción: bloquea la fila del proyecto mientras
+    verifica la convocatoria y el cupo, e inserta confiando en el unique_together
+    (user, project) en lugar de consultar antes si ya existe una aplicación.
     """
+    waitlist_position = serializers.SerializerMethodField()
+    
+    ALREADY_APPLIED_MESSAGE = "Ya has aplicado a este proyecto."
+    CLOSED_MESSAGE = "Este proyecto no está aceptando aplicaciones en este momento."
+    
     class Meta:
         model = Application
         fields = [
             'project', 'motivation', 'relevant_experience',
-            'available_hours_per_week', 'start_date_preference', 'additional_notes'
+            'available_hours_per_week', 'start_date_preference', 'additional_notes',
+            'status', 'waitlist_position'
         ]
+        read_only_fields = ['status']
     
     def validate(self, attrs):
         if 'request' not in self.context:
             raise serializers.ValidationError("Contexto de request no disponible")
         
-        user = self.context['request'].user
         project = attrs.get('project')
         
         if not project:
             raise serializers.ValidationError({"project": "El proyecto es requerido"})
         
-        # Verificar que el usuario no haya aplicado previamente
-        existing_application = Application.objects.filter(user=user, project=project).first()
-        if existing_application:
-            if existing_application.status in ['pending', 'approved', 'in_progress']:
-                raise serializers.ValidationError(
-                    {"project": "Ya has aplicado a este proyecto."}
-                )
-        
-        # Verificar que el proyecto esté aceptando aplicaciones
-        if not project.is_accepting_applications():
-            raise serializers.ValidationError(
-                {"project": "Este proyecto no está aceptando aplicaciones en este momento."}
-            )
-        
-        # Verificar que el proyecto no esté lleno
-        if project.current_participants >= project.max_participants:
-            raise serializers.ValidationError(
-                {"project": "Este proyecto ya ha alcanzado el máximo de participantes."}
-            )
+        # Verificación rápida con el proyecto ya cargado; create() la repite con la fila bloqueada
+        if not project.is_convocatoria_open():
+            raise serializers.ValidationError({"project": self.CLOSED_MESSAGE})
         
         return attrs
+    
+    def create(self, validated_data):
+        with transaction.atomic():
+            # Reserva corta del cupo: la fila del proyecto queda bloqueada hasta el commit
+            project = Project.objects.select_for_update().get(pk=validated_data['project'].pk)
+            if not project.is_convocatoria_open():
+                raise serializers.ValidationError({"project": self.CLOSED_MESSAGE})
+            validated_data['project'] = project
+            
+            try:
+                with transaction.atomic():
+                    application = super().create(validated_data)
+            except IntegrityError:
+                if Application.objects.filter(user=validated_data['user'], project=project).exists():
+                    raise serializers.ValidationError({"project": self.ALREADY_APPLIED_MESSAGE})
+                raise
+            
+            # Si el proyecto ya está lleno, encolar en la lista de espera
+            if project.current_participants >= project.max_participants:
+                waitlist.enqueue(application)
+        
+        return application
+    
+    def get_waitlist_position(self, obj):
+        if obj.status != 'waitlisted':
+            return None
+        return waitlist.get_position(obj)
 
 
 class ApplicationUpdateSerializer(serializers.ModelSerializer):
@@ -114,7 +141,8 @@ class ApplicationUpdateSerializer(serializers.ModelSerializer):
                 'in_progress': ['completed', 'cancelled'],
                 'completed': [],  # Estado final
                 'rejected': [],   # Estado final
-                'cancelled': []   # Estado final
+                'cancelled': [],  # Estado final
+                'waitlisted': ['approved', 'cancelled']
             }
             
             if value not in valid_transitions.get(current_status, []):
@@ -143,6 +171,25 @@ class ApplicationEvaluationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'evaluated_at']
 
 
+class ShortlistEntrySerializer(serializers.ModelSerializer):
+    """
+    Serializer para la preselección de aplicantes de un proyecto
+    """
+    user_name = serializers.CharField(source='application.user.full_name', read_only=True)
+    user_carnet = serializers.CharField(source='application.user.carnet', read_only=True)
+    status = serializers.CharField(source='application.status', read_only=True)
+    available_hours_per_week = serializers.IntegerField(source='application.available_hours_per_week', read_only=True)
+    applied_at = serializers.DateTimeField(source='application.applied_at', read_only=True)
+    
+    class Meta:
+        model = EvaluationSummary
+        fields = [
+            'application', 'user_name', 'user_carnet', 'status', 'available_hours_per_week',
+            'applied_at', 'mean_score', 'evaluation_count', 'approve_count', 'reject_count',
+            'interview_count'
+        ]
+
+
 class ApplicationNotificationSerializer(serializers.ModelSerializer):
     """
     Serializer para notificaciones de aplicaciones
@@ -187,6 +234,7 @@ class ApplicationStatsSerializer(serializers.Serializer):
     in_progress_applications = serializers.IntegerField()
     completed_applications = serializers.IntegerField()
     cancelled_applications = serializers.IntegerField()
+    waitlisted_applications = serializers.IntegerField()
 
 
 class ProjectApplicationSerializer(serializers.ModelSerializer):
@@ -235,6 +283,38 @@ class StudentApplicationSerializer(serializers.ModelSerializer):
         return obj.get_remaining_hours()
 
 
+class AllocationSerializer(serializers.Serializer):
+    """
+    Serializer para la asignación masiva de aplicaciones
+    """
+    apply = serializers.BooleanField(default=False)
+    plan = serializers.CharField(required=False)
+    project_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+    max_per_student = serializers.IntegerField(default=1, min_value=1)
+    min_score = serializers.FloatField(required=False, min_value=1, max_value=10)
+    notes = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate(self, data):
+        if data['apply'] and not data.get('plan'):
+            raise serializers.ValidationError(
+                "Para aplicar la asignación se debe enviar el plan revisado en el dry-run"
+            )
+        return data
+
+
+class NotificationMarkReadSerializer(serializers.Serializer):
+    """
+    Serializer para marcar varias notificaciones como leídas
+    """
+    notification_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1
+    )
+
+
 class ApplicationBulkActionSerializer(serializers.Serializer):
     """
     Serializer para acciones masivas en aplicaciones
@@ -0,0 +1,20 @@
+"""
+Señales de la app de aplicaciones.
+
+Las notificaciones se borran sobre todo en cascada (al borrar una aplicación,
+un proyecto o un usuario), sin pasar por notifications.mark_read. Al borrar
+una notificación sin leer se descuenta del contador de su destinatario para
+que el badge no quede inflado.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import notifications
+from .models import ApplicationNotification
+
+
+@receiver(post_delete, sender=ApplicationNotification)
+def discount_unread_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        notifications.discount(instance.recipient_id, 1)
@@ -0,0 +1,66 @@
+"""
+Estadísticas de aplicaciones por estado.
+
+Los conteos por estado se resuelven con un solo GROUP BY (globales) o una sola
+agregación condicional (por estudiante) en lugar de un COUNT por estado.
+Las cifras globales de administración se cachean unos segundos.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Application
+
+
+STATUSES = [status for status, _ in Application.STATUS_CHOICES]
+
+GLOBAL_STATS_CACHE_KEY = 'applications:global-stats'
+GLOBAL_STATS_CACHE_TTL = getattr(settings, 'APPLICATION_STATS_CACHE_TTL', 30)
+
+
+def status_counts(queryset=None):
+    """
+    Cuenta las aplicaciones de `queryset` por estado con un único GROUP BY.
+    Retorna un diccionario con todos los estados (0 si no hay ninguna).
+    """
+    if queryset is None:
+        queryset = Application.objects.all()
+
+    counts = dict.fromkeys(STATUSES, 0)
+    counts.update(
+        queryset.order_by().values_list('status').annotate(total=Count('id'))
+    )
+    return counts
+
+
+def user_status_counts(user):
+    """
+    Cuenta las aplicaciones de un estudiante por estado con una sola agregación condicional.
+    Incluye la clave 'total'.
+    """
+    return Application.objects.filter(user=user).aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status in STATUSES}
+    )
+
+
+def global_stats():
+    """
+    Cifras globales para administradores: conteos por estado, total y
+    los 5 proyectos con más aplicaciones. Se cachean GLOBAL_STATS_CACHE_TTL segundos.
+    """
+    stats = cache.get(GLOBAL_STATS_CACHE_KEY)
+    if stats is None:
+        counts = status_counts()
+        stats = {
+            'counts': counts,
+            'total': sum(counts.values()),
+            'applications_by_project': list(
+                Application.objects.order_by().values('project__name').annotate(
+                    count=Count('id')
+                ).order_by('-count')[:5]
+            ),
+        }
+        cache.set(GLOBAL_STATS_CACHE_KEY, stats, GLOBAL_STATS_CACHE_TTL)
+    return stats
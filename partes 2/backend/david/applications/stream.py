@@ -0,0 +1,184 @@
+"""
+Stream de notificaciones con Server-Sent Events.
+
+Reemplaza el polling de /notifications/ y /dashboard/: cada usuario mantiene una
+conexión abierta que recibe las notificaciones nuevas y los cambios del contador
+de no leídas. Es una vista asíncrona, así que debe servirse con ASGI
+(por ejemplo `uvicorn keyhours_backend.asgi:application`) para que las
+conexiones en espera no ocupen un hilo cada una.
+
+Las notificaciones las crea el despachador de la bandeja de salida
+(`python manage.py dispatch_notifications`), normalmente en otro proceso. Cada
+proceso ASGI corre un NotificationPoller que cada POLL_INTERVAL_SECONDS lee
+las notificaciones recientes y los contadores de los usuarios conectados a él
+y los publica en su broker, así ningún proceso depende de haber tomado el
+evento para avisar a sus conexiones. Con NOTIFICATION_STREAM_DISPATCH el
+proceso ASGI además drena la bandeja de salida (útil en desarrollo, sin worker).
+"""
+
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from users.authentication import ClaimsJWTAuthentication
+from . import events, notifications, outbox
+from .models import ApplicationNotification
+
+
+HEARTBEAT_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 25)
+DISPATCH_IN_PROCESS = getattr(settings, 'NOTIFICATION_STREAM_DISPATCH', False)
+DISPATCH_INTERVAL_SECONDS = 1
+POLL_INTERVAL_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_POLL_INTERVAL', 1)
+
+# Margen para notificaciones que se confirman tarde o vienen de un servidor con otro reloj
+LOOKBACK_SECONDS = 30
+
+# Usuarios por consulta del poller
+POLL_BATCH_SIZE = 500
+
+_dispatcher = None
+_poller = None
+_poller_task = None
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def notification_events(user_id, unread_count, heartbeat=HEARTBEAT_SECONDS):
+    """
+    Generador SSE de un usuario: primero el contador actual y luego los eventos
+    publicados, con un comentario de keep-alive cada `heartbeat` segundos.
+    """
+    broker = events.get_broker()
+    queue = broker.subscribe(user_id)
+    try:
+        yield format_event('unread_count', {'unread_count': unread_count})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event['event'], event['data'])
+    finally:
+        broker.unsubscribe(user_id, queue)
+
+
+async def _run_dispatcher():
+    while True:
+        dispatched, failed = await sync_to_async(outbox.dispatch_batch)()
+        if not (dispatched or failed):
+            await asyncio.sleep(DISPATCH_INTERVAL_SECONDS)
+
+
+class NotificationPoller:
+    """
+    Lleva a las conexiones de este proceso las notificaciones nuevas y los
+    cambios del contador de sus usuarios, sin importar qué proceso las creó.
+
+    Lee las notificaciones de los últimos LOOKBACK_SECONDS y recuerda las ya
+    publicadas; a un usuario solo se le publican las creadas desde que se vio
+    conectado. El contador se publica cuando cambia respecto de la lectura anterior.
+    """
+
+    def __init__(self, broker=None):
+        self.broker = broker or events.get_broker()
+        self.polled_at = None
+        self.since = {}
+        self.counts = {}
+        self.seen = {}
+
+    def poll(self):
+        """Una lectura: dos consultas por cada POLL_BATCH_SIZE usuarios conectados"""
+        now = timezone.now()
+        user_ids = self.broker.subscribed_users()
+        connected_at = self.polled_at or now
+        self.polled_at = now
+        self.since = {user_id: self.since.get(user_id, connected_at) for user_id in user_ids}
+        self.counts = {user_id: count for user_id, count in self.counts.items() if user_id in self.since}
+
+        window = now - timedelta(seconds=LOOKBACK_SECONDS)
+        self.seen = {pk: created_at for pk, created_at in self.seen.items() if created_at >= window}
+
+        for start in range(0, len(user_ids), POLL_BATCH_SIZE):
+            batch = user_ids[start:start + POLL_BATCH_SIZE]
+            recent = ApplicationNotification.objects.filter(
+                recipient_id__in=batch,
+                created_at__gte=window
+            ).order_by('created_at', 'id')
+            fresh = []
+            for notification in recent:
+                if notification.id in self.seen:
+                    continue
+                self.seen[notification.id] = notification.created_at
+                if notification.created_at >= self.since[notification.recipient_id]:
+                    fresh.append(notification)
+            events.publish_notifications(fresh)
+
+            counts = notifications.unread_counts(batch)
+            changed = {
+                user_id: count for user_id, count in counts.items() if self.counts.get(user_id) != count
+            }
+            self.counts.update(changed)
+            events.publish_unread_counts(changed)
+
+
+async def _run_poller():
+    while True:
+        await sync_to_async(_poller.poll)()
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+def _ensure_background_tasks():
+    """Arranca (o reinicia) el poller y, si está activado, el despachador en este proceso"""
+    global _dispatcher, _poller, _poller_task
+    loop = asyncio.get_running_loop()
+    if _poller is None:
+        _poller = NotificationPoller()
+    if _poller_task is None or _poller_task.done():
+        _poller_task = loop.create_task(_run_poller())
+    if DISPATCH_IN_PROCESS and (_dispatcher is None or _dispatcher.done()):
+        _dispatcher = loop.create_task(_run_dispatcher())
+
+
+def _authenticate(request):
+    """
+    Autentica con el JWT del header Authorization o del parámetro `token`
+    (EventSource no permite enviar headers)
+    """
+    jwt_auth = ClaimsJWTAuthentication()
+    header = jwt_auth.get_header(request)
+    raw_token = jwt_auth.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    return jwt_auth.get_user(jwt_auth.get_validated_token(raw_token))
+
+
+async def notification_stream(request):
+    """
+    Stream SSE de notificaciones del usuario autenticado
+    """
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except (InvalidToken, AuthenticationFailed):
+        user = None
+    if user is None:
+        return JsonResponse({'error': 'Token inválido o ausente'}, status=401)
+
+    unread_count = await sync_to_async(notifications.unread_count)(user)
+    _ensure_background_tasks()
+
+    response = StreamingHttpResponse(
+        notification_events(user.id, unread_count),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
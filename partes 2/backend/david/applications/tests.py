@@ -0,0 +1,708 @@
+import asyncio
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.models import Project
+from users.models import User
+from . import bulk, events, notifications, outbox, retention, stats, stream
+from .models import (
+    Application, ApplicationEvaluation, ApplicationNotification, EvaluationSummary, NotificationArchive,
+    NotificationOutbox, ProjectWaitlist, WaitlistEntry
+)
+
+
+class ApplicationTestCase(TestCase):
+    """
+    Datos comunes: un administrador, estudiantes y una convocatoria abierta con un cupo
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', password='admin12345', carnet='ADM1', user_type='admin'
+        )
+        self.students = [
+            User.objects.create_user(
+                username=f'estudiante{i}', password='estudiante123', carnet=f'EST{i}',
+                first_name='Estudiante', last_name=str(i), user_type='student'
+            )
+            for i in range(5)
+        ]
+        self.project = self.create_project(max_participants=1)
+
+    def create_project(self, **fields):
+        now = timezone.now()
+        defaults = {
+            'name': 'Convocatoria', 'description': 'Proyecto de prueba', 'manager': self.admin,
+            'max_hours': 40, 'visibility': 'convocatoria',
+            'start_date': now - timedelta(days=1), 'end_date': now + timedelta(days=60),
+        }
+        defaults.update(fields)
+        return Project.objects.create(**defaults)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def apply(self, student, project=None):
+        return self.client_for(student).post('/api/applications/', {
+            'project': (project or self.project).pk,
+            'motivation': 'Quiero participar',
+            'start_date_preference': date.today().isoformat(),
+        }, format='json')
+
+    def review(self, application, new_status):
+        return self.client_for(self.admin).post(
+            f'/api/applications/{application.pk}/review/', {'status': new_status}, format='json'
+        )
+
+    def application_of(self, student, project=None):
+        return Application.objects.get(user=student, project=project or self.project)
+
+
+class WaitlistTests(ApplicationTestCase):
+    """Lista de espera: encolar al llenarse, quitar sin renumerar y promover al liberar cupo"""
+
+    def fill_project(self):
+        self.apply(self.students[0])
+        self.review(self.application_of(self.students[0]), 'approved')
+        for student in self.students[1:4]:
+            self.apply(student)
+
+    def position(self, student):
+        response = self.client_for(student).get(
+            f'/api/applications/{self.application_of(student).pk}/waitlist/'
+        )
+        return response.data['position']
+
+    def test_full_project_queues_applications_in_order(self):
+        self.fill_project()
+
+        self.assertEqual(self.application_of(self.students[1]).status, 'waitlisted')
+        self.assertEqual([self.position(student) for student in self.students[1:4]], [1, 2, 3])
+        self.assertEqual(ProjectWaitlist.objects.get(project=self.project).get_length(), 3)
+
+    def test_cancel_leaves_a_gap_without_renumbering(self):
+        self.fill_project()
+        last = WaitlistEntry.objects.get(application=self.application_of(self.students[3]))
+
+        response = self.client_for(self.students[2]).post(
+            f'/api/applications/{self.application_of(self.students[2]).pk}/cancel/'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        last.refresh_from_db()
+        self.assertEqual(last.position, 3)
+        self.assertEqual(self.position(self.students[3]), 2)
+        self.assertEqual(ProjectWaitlist.objects.get(project=self.project).get_length(), 2)
+
+    def test_freed_spot_promotes_the_head_of_the_queue(self):
+        self.fill_project()
+        self.client_for(self.students[1]).post(
+            f'/api/applications/{self.application_of(self.students[1]).pk}/cancel/'
+        )
+
+        self.review(self.application_of(self.students[0]), 'rejected')
+
+        promoted = self.application_of(self.students[2])
+        self.assertEqual(promoted.status, 'approved')
+        self.assertTrue(self.project.members.filter(pk=self.students[2].pk).exists())
+        self.assertTrue(NotificationOutbox.objects.filter(
+            application=promoted, notification_type='application_approved'
+        ).exists())
+        self.assertEqual(self.position(self.students[3]), 1)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_participants, 1)
+
+    def test_positions_are_unique_per_waitlist(self):
+        self.fill_project()
+        waitlist = ProjectWaitlist.objects.get(project=self.project)
+        extra = Application.objects.create(
+            user=self.students[4], project=self.project, motivation='Duplicada',
+            start_date_preference=date.today()
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            WaitlistEntry.objects.create(waitlist=waitlist, application=extra, position=waitlist.tail)
+
+
+class OutboxTests(ApplicationTestCase):
+    """Bandeja de salida: la revisión solo encola y el despachador entrega una vez"""
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.students[0]
+        self.student.email = 'estudiante0@example.com'
+        self.student.save(update_fields=['email'])
+        self.apply(self.student)
+        self.application = self.application_of(self.student)
+
+    def test_review_publishes_without_delivering(self):
+        self.review(self.application, 'approved')
+
+        event = NotificationOutbox.objects.get(application=self.application, recipient=self.student)
+        self.assertEqual(event.status, 'pending')
+        self.assertFalse(ApplicationNotification.objects.filter(recipient=self.student).exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_dispatch_delivers_each_event_once(self):
+        self.review(self.application, 'approved')
+
+        dispatched, failed = outbox.dispatch_batch()
+
+        self.assertEqual(failed, 0)
+        self.assertEqual(dispatched, NotificationOutbox.objects.filter(status='dispatched').count())
+        self.assertEqual(ApplicationNotification.objects.filter(recipient=self.student).count(), 1)
+        self.assertEqual(mail.outbox[0].to, ['estudiante0@example.com'])
+        self.assertEqual(outbox.dispatch_batch(), (0, 0))
+
+    def test_failed_email_is_retried_later(self):
+        self.review(self.application, 'approved')
+        event = NotificationOutbox.objects.get(recipient=self.student)
+
+        with mock.patch.object(outbox, '_send_emails', return_value={event.id: 'SMTP caído'}):
+            outbox.dispatch_batch()
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'pending')
+        self.assertEqual(event.attempts, 1)
+        self.assertGreater(event.available_at, timezone.now())
+        self.assertIsNotNone(event.notification_id)
+        self.assertEqual(outbox.dispatch_batch(), (0, 0))
+
+        NotificationOutbox.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        self.assertEqual(outbox.dispatch_batch(), (1, 0))
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'dispatched')
+        self.assertEqual(ApplicationNotification.objects.filter(recipient=self.student).count(), 1)
+
+    def test_emails_are_sent_after_the_claim_commits(self):
+        self.review(self.application, 'approved')
+        depth = len(connection.atomic_blocks)
+        seen = {}
+
+        def send(events):
+            seen['depth'] = len(connection.atomic_blocks)
+            seen['event'] = NotificationOutbox.objects.get(recipient=self.student)
+            return {}
+
+        with mock.patch.object(outbox, '_send_emails', side_effect=send):
+            outbox.dispatch_batch()
+
+        self.assertEqual(seen['depth'], depth)
+        self.assertEqual(seen['event'].status, 'pending')
+        self.assertIsNotNone(seen['event'].notification_id)
+        self.assertGreater(seen['event'].available_at, timezone.now())
+        self.assertEqual(NotificationOutbox.objects.get(recipient=self.student).status, 'dispatched')
+
+    def test_prune_removes_only_old_dispatched_events(self):
+        self.review(self.application, 'approved')
+        outbox.dispatch_batch()
+        old = NotificationOutbox.objects.get(recipient=self.student)
+        NotificationOutbox.objects.filter(pk=old.pk).update(dispatched_at=timezone.now() - timedelta(days=8))
+        self.apply(self.students[1])
+        self.review(self.application_of(self.students[1]), 'approved')
+        failed = NotificationOutbox.objects.get(recipient=self.students[1])
+        NotificationOutbox.objects.filter(pk=failed.pk).update(status='failed')
+        recent = NotificationOutbox.objects.filter(status='dispatched').exclude(pk=old.pk).count()
+
+        self.assertEqual(outbox.prune_dispatched(days=7, batch_size=1), 1)
+
+        self.assertFalse(NotificationOutbox.objects.filter(pk=old.pk).exists())
+        self.assertTrue(NotificationOutbox.objects.filter(pk=failed.pk).exists())
+        self.assertEqual(NotificationOutbox.objects.filter(status='dispatched').count(), recent)
+        self.assertTrue(ApplicationNotification.objects.filter(recipient=self.student).exists())
+
+
+class AllocationTests(ApplicationTestCase):
+    """Asignación masiva: dry-run sin efectos y confirmación atada al plan revisado"""
+
+    def setUp(self):
+        super().setUp()
+        self.second = self.create_project(name='Segunda convocatoria', max_participants=1)
+        for student in self.students[:3]:
+            self.apply(student)
+            self.apply(student, self.second)
+
+    def allocate(self, **data):
+        return self.client_for(self.admin).post('/api/applications/allocation/', data, format='json')
+
+    def test_dry_run_respects_capacity_without_changes(self):
+        response = self.allocate()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_pending'], 6)
+        self.assertEqual(response.data['total_approved'], 2)
+        approved_users = [
+            entry['user'] for project in response.data['projects'] for entry in project['approve']
+        ]
+        self.assertEqual(len(set(approved_users)), 2)
+        self.assertFalse(Application.objects.exclude(status='pending').exists())
+
+    def test_apply_with_reviewed_plan(self):
+        plan = self.allocate().data['plan']
+
+        response = self.allocate(apply=True, plan=plan)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Application.objects.filter(status='approved').count(), 2)
+        for project in (self.project, self.second):
+            project.refresh_from_db()
+            self.assertEqual(project.current_participants, 1)
+
+    def test_stale_plan_is_rejected_with_conflict(self):
+        plan = self.allocate().data['plan']
+        self.review(self.application_of(self.students[0]), 'approved')
+
+        response = self.allocate(apply=True, plan=plan)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertNotEqual(response.data['plan'], plan)
+        self.assertEqual(Application.objects.filter(status='approved').count(), 1)
+
+    def test_apply_requires_a_plan(self):
+        response = self.allocate(apply=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Application.objects.exclude(status='pending').exists())
+
+    def test_only_admins_can_allocate(self):
+        response = self.client_for(self.students[0]).post('/api/applications/allocation/', {}, format='json')
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ApplicationCreateTests(ApplicationTestCase):
+    """Creación de aplicaciones en una sola transacción sobre la fila del proyecto"""
+
+    def test_duplicate_application_is_rejected(self):
+        self.assertEqual(self.apply(self.students[0]).status_code, 201)
+
+        response = self.apply(self.students[0])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Ya has aplicado a este proyecto.')
+        self.assertEqual(Application.objects.filter(user=self.students[0]).count(), 1)
+
+    def test_closed_convocatoria_is_rejected(self):
+        closed = self.create_project(end_date=timezone.now() - timedelta(days=1))
+
+        response = self.apply(self.students[0], closed)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Application.objects.filter(project=closed).exists())
+
+    def test_application_beyond_capacity_is_waitlisted(self):
+        self.project.current_participants = self.project.max_participants
+        self.project.save(update_fields=['current_participants'])
+
+        response = self.apply(self.students[0])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'waitlisted')
+        self.assertEqual(response.data['waitlist_position'], 1)
+
+
+class BulkReviewTests(ApplicationTestCase):
+    """Revisión masiva por conjuntos: solo cambia las pendientes y sincroniza miembros"""
+
+    def setUp(self):
+        super().setUp()
+        self.project.max_participants = 10
+        self.project.save(update_fields=['max_participants'])
+        for student in self.students[:3]:
+            self.apply(student)
+        self.applications = [self.application_of(student) for student in self.students[:3]]
+
+    def bulk_action(self, action, applications, user=None):
+        return self.client_for(user or self.admin).post('/api/applications/bulk-action/', {
+            'application_ids': [application.pk for application in applications],
+            'action': action,
+        }, format='json')
+
+    def test_bulk_approve_adds_members_and_events(self):
+        with self.assertNumQueries(7):
+            approved = bulk.bulk_review([application.pk for application in self.applications], 'approved', self.admin)
+
+        self.assertEqual(len(approved), 3)
+        self.assertEqual(Application.objects.filter(status='approved', reviewed_by=self.admin).count(), 3)
+        self.assertEqual(set(self.project.members.values_list('pk', flat=True)),
+                         {student.pk for student in self.students[:3]})
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_participants, 3)
+        self.assertEqual(NotificationOutbox.objects.filter(notification_type='application_approved').count(), 3)
+
+    def test_only_pending_applications_change(self):
+        self.review(self.applications[0], 'rejected')
+
+        response = self.bulk_action('approve', self.applications)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_count'], 2)
+        self.assertEqual(self.application_of(self.students[0]).status, 'rejected')
+        self.assertFalse(self.project.members.filter(pk=self.students[0].pk).exists())
+
+    def test_bulk_reject_does_not_add_members(self):
+        response = self.bulk_action('reject', self.applications)
+
+        self.assertEqual(response.data['updated_count'], 3)
+        self.assertFalse(self.project.members.exists())
+        self.assertEqual(NotificationOutbox.objects.filter(notification_type='application_rejected').count(), 3)
+
+    def test_only_admins_can_bulk_review(self):
+        response = self.bulk_action('approve', self.applications, user=self.students[0])
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Application.objects.exclude(status='pending').exists())
+
+
+class StatsTests(ApplicationTestCase):
+    """Conteos por estado con una consulta y cifras globales cacheadas"""
+
+    def setUp(self):
+        super().setUp()
+        cache.delete(stats.GLOBAL_STATS_CACHE_KEY)
+        self.addCleanup(cache.delete, stats.GLOBAL_STATS_CACHE_KEY)
+        self.apply(self.students[0])
+        self.review(self.application_of(self.students[0]), 'approved')
+        self.apply(self.students[1])
+        self.apply(self.students[2], self.create_project(name='Segunda convocatoria'))
+
+    def test_status_counts_include_every_status(self):
+        with self.assertNumQueries(1):
+            counts = stats.status_counts()
+
+        self.assertEqual(set(counts), set(stats.STATUSES))
+        self.assertEqual((counts['approved'], counts['waitlisted'], counts['pending']), (1, 1, 1))
+        self.assertEqual(counts['rejected'], 0)
+
+    def test_user_status_counts(self):
+        with self.assertNumQueries(1):
+            counts = stats.user_status_counts(self.students[0])
+
+        self.assertEqual(counts['total'], 1)
+        self.assertEqual(counts['approved'], 1)
+        self.assertEqual(counts['pending'], 0)
+
+    def test_global_stats_are_cached(self):
+        first = stats.global_stats()
+        self.assertEqual(first['total'], 3)
+        self.assertEqual(first['applications_by_project'][0], {'project__name': 'Convocatoria', 'count': 2})
+
+        self.apply(self.students[3])
+        with self.assertNumQueries(0):
+            self.assertEqual(stats.global_stats()['total'], 3)
+
+        cache.delete(stats.GLOBAL_STATS_CACHE_KEY)
+        self.assertEqual(stats.global_stats()['total'], 4)
+
+    def test_dashboard_uses_the_cached_counts(self):
+        response = self.client_for(self.admin).get('/api/applications/dashboard/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_applications'], 3)
+        self.assertEqual(response.data['waitlisted_applications'], 1)
+
+
+class NotificationStreamTests(ApplicationTestCase):
+    """El poller lleva a las conexiones del proceso lo que despacha cualquier otro proceso"""
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.broker = events.InProcessBroker()
+        patcher = mock.patch.object(events, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.poller = stream.NotificationPoller(self.broker)
+        self.student = self.students[0]
+
+    def subscribe(self, user):
+        async def subscribe():
+            return self.broker.subscribe(user.pk)
+        return self.loop.run_until_complete(subscribe())
+
+    def received(self, queue):
+        self.loop.run_until_complete(asyncio.sleep(0))
+        delivered = []
+        while not queue.empty():
+            delivered.append(queue.get_nowait())
+        return [(event['event'], event['data'].get('title', event['data'].get('unread_count')))
+                for event in delivered]
+
+    def approve_and_dispatch(self, student):
+        self.apply(student)
+        self.review(self.application_of(student), 'approved')
+        outbox.dispatch_batch()
+
+    def test_notifications_dispatched_elsewhere_reach_the_subscriber(self):
+        queue = self.subscribe(self.student)
+        self.poller.poll()
+        self.assertEqual(self.received(queue), [('unread_count', 0)])
+
+        self.approve_and_dispatch(self.student)
+        self.poller.poll()
+
+        self.assertEqual(self.received(queue), [
+            ('notification', 'Aplicación approved'), ('unread_count', 1)
+        ])
+        self.poller.poll()
+        self.assertEqual(self.received(queue), [])
+
+    def test_earlier_notifications_and_other_users_are_not_pushed(self):
+        self.approve_and_dispatch(self.student)
+        queue = self.subscribe(self.student)
+
+        self.poller.poll()
+        self.apply(self.students[1])
+        self.review(self.application_of(self.students[1]), 'rejected')
+        outbox.dispatch_batch()
+        self.poller.poll()
+
+        self.assertEqual(self.received(queue), [('unread_count', 1)])
+
+    def test_late_commits_inside_the_lookback_are_pushed(self):
+        queue = self.subscribe(self.student)
+        self.poller.poll()
+        self.poller.since[self.student.pk] -= timedelta(minutes=1)
+        self.received(queue)
+
+        self.approve_and_dispatch(self.student)
+        ApplicationNotification.objects.filter(recipient=self.student).update(
+            created_at=self.poller.polled_at - timedelta(seconds=1)
+        )
+        self.poller.poll()
+
+        self.assertEqual(self.received(queue)[0], ('notification', 'Aplicación approved'))
+
+    def test_counter_changes_from_other_processes_are_pushed(self):
+        self.approve_and_dispatch(self.student)
+        queue = self.subscribe(self.student)
+        self.poller.poll()
+        self.received(queue)
+
+        notifications.mark_read(self.student)
+        self.poller.poll()
+
+        self.assertEqual(self.received(queue), [('unread_count', 0)])
+
+
+class NotificationCounterTests(ApplicationTestCase):
+    """El contador de no leídas sigue a las notificaciones, también cuando se borran en cascada"""
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.students[0]
+        self.apply(self.student)
+        self.application = self.application_of(self.student)
+        self.review(self.application, 'approved')
+        self.client_for(self.admin).post(
+            f'/api/applications/{self.application.pk}/review/', {'status': 'rejected'}, format='json'
+        )
+        outbox.dispatch_batch()
+
+    def test_mark_read_discounts_once(self):
+        self.assertEqual(notifications.unread_count(self.student), 2)
+        first = ApplicationNotification.objects.filter(recipient=self.student).first()
+
+        self.assertEqual(notifications.mark_read(self.student, [first.pk]), 1)
+        self.assertEqual(notifications.mark_read(self.student, [first.pk]), 0)
+
+        self.assertEqual(notifications.unread_count(self.student), 1)
+
+    def test_deleting_an_application_discounts_its_unread_notifications(self):
+        notifications.mark_read(self.student, [ApplicationNotification.objects.filter(recipient=self.student).first().pk])
+
+        response = self.client_for(self.student).delete(f'/api/applications/{self.application.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(ApplicationNotification.objects.filter(recipient=self.student).exists())
+        self.assertEqual(notifications.unread_count(self.student), 0)
+
+    def test_deleting_a_project_discounts_cascaded_notifications(self):
+        other = self.students[1]
+        second = self.create_project(name='Segunda convocatoria')
+        self.apply(other, second)
+        self.review(self.application_of(other, second), 'rejected')
+        outbox.dispatch_batch()
+
+        self.project.delete()
+
+        self.assertEqual(notifications.unread_count(self.student), 0)
+        self.assertEqual(notifications.unread_count(other), 1)
+
+
+class RetentionTests(ApplicationTestCase):
+    """Archivo de notificaciones leídas y lectura paginada del archivo"""
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.students[0]
+        self.apply(self.student)
+        self.application = self.application_of(self.student)
+
+    def notify(self, days_ago, is_read=True, count=1):
+        created = ApplicationNotification.objects.bulk_create([
+            ApplicationNotification(
+                application=self.application, recipient=self.student, notification_type='info',
+                title=f'Aviso {days_ago}-{i}', message='Mensaje', is_read=is_read
+            )
+            for i in range(count)
+        ])
+        ApplicationNotification.objects.filter(pk__in=[n.pk for n in created]).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+        notifications.sync_counters([self.student.pk])
+        return created
+
+    def archive_all(self, queryset, batch_size=retention.BATCH_SIZE):
+        total = 0
+        while archived := retention.archive_batch(queryset, batch_size):
+            total += archived
+        return total
+
+    def test_archives_old_read_notifications_only(self):
+        old = self.notify(120, count=2)
+        old_unread = self.notify(120, is_read=False)
+        recent = self.notify(5)
+
+        self.assertEqual(self.archive_all(retention.archivable(days=90)), 2)
+
+        remaining = set(ApplicationNotification.objects.filter(recipient=self.student).values_list('pk', flat=True))
+        self.assertEqual(remaining, {old_unread[0].pk, recent[0].pk})
+        self.assertEqual(NotificationArchive.objects.get(user=self.student).notification_count, 2)
+        self.assertEqual(notifications.unread_count(self.student), 1)
+        self.assertNotIn(old[0].pk, remaining)
+
+    def test_keep_recent_archives_read_beyond_the_newest(self):
+        for days_ago in range(1, 6):
+            self.notify(days_ago)
+        unread = self.notify(10, is_read=False)
+
+        self.assertEqual(self.archive_all(retention.archivable(days=90, keep_recent=3)), 2)
+
+        titles = set(ApplicationNotification.objects.filter(recipient=self.student, is_read=True)
+                     .values_list('title', flat=True))
+        self.assertEqual(titles, {'Aviso 1-0', 'Aviso 2-0', 'Aviso 3-0'})
+        self.assertTrue(ApplicationNotification.objects.filter(pk=unread[0].pk).exists())
+
+    def test_pages_back_through_the_archive_with_the_cursor(self):
+        for days_ago in range(100, 110):
+            self.notify(days_ago)
+        self.archive_all(retention.archivable(days=90), batch_size=4)
+        self.assertEqual(NotificationArchive.objects.filter(user=self.student).count(), 3)
+
+        client = self.client_for(self.student)
+        titles, cursor, pages = [], None, 0
+        while True:
+            response = client.get('/api/applications/notifications/archive/',
+                                  {'limit': 3, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            titles += [row['title'] for row in response.data['results']]
+            pages += 1
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(titles, [f'Aviso {days_ago}-0' for days_ago in range(100, 110)])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client_for(self.student).get(
+            '/api/applications/notifications/archive/', {'cursor': '3:-1'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class EvaluationTests(ApplicationTestCase):
+    """Resúmenes de evaluaciones mantenidos al evaluar y preselección por cursor"""
+
+    def setUp(self):
+        super().setUp()
+        self.project.max_participants = 10
+        self.project.save(update_fields=['max_participants'])
+        self.evaluators = [self.admin] + [
+            User.objects.create_user(
+                username=f'evaluador{i}', password='admin12345', carnet=f'EVA{i}', user_type='admin'
+            )
+            for i in range(2)
+        ]
+        for student in self.students:
+            self.apply(student)
+
+    def evaluate(self, student, score, recommendation='approve', evaluator=None):
+        evaluator = evaluator or self.admin
+        application = self.application_of(student)
+        return self.client_for(evaluator).post(f'/api/applications/{application.pk}/evaluations/', {
+            'application': application.pk, 'evaluator': evaluator.pk, 'score': score,
+            'comments': 'Evaluación', 'recommendation': recommendation,
+        }, format='json')
+
+    def summary(self, student):
+        return EvaluationSummary.objects.get(application=self.application_of(student))
+
+    def shortlist(self, **params):
+        return self.client_for(self.admin).get(f'/api/applications/project/{self.project.pk}/shortlist/', params)
+
+    def test_each_evaluation_updates_mean_and_tallies(self):
+        self.assertEqual(self.evaluate(self.students[0], 7, 'approve', self.evaluators[0]).status_code, 201)
+        self.evaluate(self.students[0], 8, 'interview', self.evaluators[1])
+        self.evaluate(self.students[0], 6, 'approve', self.evaluators[2])
+
+        summary = self.summary(self.students[0])
+        self.assertEqual((summary.evaluation_count, summary.score_total), (3, 21))
+        self.assertAlmostEqual(summary.mean_score, 7.0)
+        self.assertEqual((summary.approve_count, summary.reject_count, summary.interview_count), (2, 0, 1))
+
+    def test_shortlist_pages_across_ties(self):
+        for student, score in zip(self.students, [9, 7, 9, 7, 9]):
+            self.evaluate(student, score)
+        self.evaluate(self.students[1], 8, evaluator=self.evaluators[1])
+        self.evaluate(self.students[3], 8, evaluator=self.evaluators[1])
+        self.evaluate(self.students[3], 8, evaluator=self.evaluators[2])
+
+        carnets, cursor = [], None
+        while True:
+            response = self.shortlist(k=2, **({'cursor': cursor} if cursor else {}))
+            self.assertEqual(response.status_code, 200)
+            carnets += [entry['user_carnet'] for entry in response.data['results']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(carnets, ['EST0', 'EST2', 'EST4', 'EST3', 'EST1'])
+        self.assertAlmostEqual(self.summary(self.students[3]).mean_score, 23 / 3)
+
+    def test_invalid_cursor_is_rejected(self):
+        self.assertEqual(self.shortlist(cursor='abc').status_code, 400)
+
+    def test_admin_edits_and_deletes_refresh_the_summary(self):
+        self.evaluate(self.students[0], 4, 'reject', self.evaluators[0])
+        self.evaluate(self.students[0], 8, 'approve', self.evaluators[1])
+        evaluation = ApplicationEvaluation.objects.get(evaluator=self.evaluators[0])
+        self.admin.is_staff = self.admin.is_superuser = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+
+        response = self.client.post(f'/admin/applications/applicationevaluation/{evaluation.pk}/change/', {
+            'application': evaluation.application_id, 'evaluator': evaluation.evaluator_id, 'score': 10,
+            'comments': 'Corregida', 'recommendation': 'approve',
+        })
+        self.assertEqual(response.status_code, 302)
+        summary = self.summary(self.students[0])
+        self.assertAlmostEqual(summary.mean_score, 9.0)
+        self.assertEqual((summary.approve_count, summary.reject_count), (2, 0))
+
+        self.client.post(f'/admin/applications/applicationevaluation/{evaluation.pk}/delete/', {'post': 'yes'})
+        summary = self.summary(self.students[0])
+        self.assertEqual((summary.evaluation_count, summary.score_total), (1, 8))
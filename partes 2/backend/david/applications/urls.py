@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import stream, views
 
 urlpatterns = [
     # Application endpoints
@@ -7,9 +7,11 @@ urlpatterns = [
     path('<int:pk>/', views.ApplicationDetailView.as_view(), name='application-detail'),
     path('<int:application_id>/review/', views.review_application, name='review-application'),
     path('<int:application_id>/cancel/', views.cancel_application, name='cancel-application'),
+    path('<int:application_id>/waitlist/', views.waitlist_position, name='application-waitlist-position'),
     
     # Project-specific applications
     path('project/<int:project_id>/', views.ProjectApplicationListView.as_view(), name='project-application-list'),
+    path('project/<int:project_id>/shortlist/', views.project_shortlist, name='project-shortlist'),
     
     # Student-specific applications
     path('student/<int:user_id>/', views.StudentApplicationListView.as_view(), name='student-application-list'),
@@ -17,6 +19,7 @@ urlpatterns = [
     
     # Bulk actions
     path('bulk-action/', views.bulk_action_applications, name='bulk-action-applications'),
+    path('allocation/', views.allocate_applications, name='allocate-applications'),
     
     # Statistics endpoints
     path('stats/', views.ApplicationStatsView.as_view(), name='application-stats'),
@@ -27,5 +30,9 @@ urlpatterns = [
     
     # Notification endpoints
     path('notifications/', views.ApplicationNotificationListView.as_view(), name='application-notification-list'),
+    path('notifications/read/', views.mark_notifications_read, name='mark-notifications-read'),
+    path('notifications/read-all/', views.mark_all_notifications_read, name='mark-all-notifications-read'),
+    path('notifications/archive/', views.notification_archive, name='notification-archive'),
+    path('notifications/stream/', stream.notification_stream, name='application-notification-stream'),
     path('notifications/<int:notification_id>/read/', views.mark_notification_read, name='mark-notification-read'),
 ]
@@ -1,17 +1,22 @@
-from rest_framework import generics, status, permissions, filters
+from rest_framework import generics, status, permissions, filters, serializers
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 
+from . import allocation, bulk, evaluations, events, notifications, outbox, retention, stats, waitlist
 from .models import Application, ApplicationDocument, ApplicationEvaluation, ApplicationNotification
+from projects import membership
 from projects.models import Project
 from .serializers import (
     ApplicationSerializer, ApplicationCreateSerializer, ApplicationUpdateSerializer,
     ApplicationListSerializer, ApplicationStatsSerializer, ProjectApplicationSerializer,
     StudentApplicationSerializer, ApplicationBulkActionSerializer, ApplicationEvaluationSerializer,
-    ApplicationNotificationSerializer
+    ApplicationNotificationSerializer, NotificationMarkReadSerializer, ShortlistEntrySerializer,
+    AllocationSerializer
 )
 
 
@@ -40,7 +45,7 @@ class ApplicationListView(generics.ListCreateAPIView):
         if self.request.user.user_type == 'student':
             queryset = queryset.filter(user=self.request.user)
         
-        return queryset.select_related('user', 'project', 'reviewed_by')
+        return queryset.select_related('user', 'project__manager', 'reviewed_by')
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -48,15 +53,21 @@ class ApplicationListView(generics.ListCreateAPIView):
             try:
                 application = serializer.save(user=request.user)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
+            except serializers.ValidationError as e:
+                # Errores detectados dentro de la transacción (cupo, duplicados)
+                return self.validation_error_response(e.detail)
             except Exception as e:
                 return Response(
                     {'error': f'Error al crear aplicación: {str(e)}'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
+        return self.validation_error_response(serializer.errors)
+    
+    def validation_error_response(self, detail):
         # Mejorar mensajes de error
         errors = {}
-        for field, error_list in serializer.errors.items():
+        for field, error_list in detail.items():
             if isinstance(error_list, list):
                 errors[field] = error_list[0] if error_list else 'Error de validación'
             else:
@@ -110,9 +121,9 @@ class ProjectApplicationListView(generics.ListAPIView):
             project = Project.objects.get(id=project_id)
             if (self.request.user.user_type != 'admin' and 
                 project.manager != self.request.user):
-                raise permissions.PermissionDenied("No tienes permisos para ver estas aplicaciones")
+                raise PermissionDenied("No tienes permisos para ver estas aplicaciones")
         except Project.DoesNotExist:
-            raise permissions.PermissionDenied("Proyecto no encontrado")
+            raise NotFound("Proyecto no encontrado")
         
         return Application.objects.filter(
             project_id=project_id
@@ -132,7 +143,7 @@ class StudentApplicationListView(generics.ListAPIView):
         # Solo el propio estudiante o admins pueden ver sus aplicaciones
         if (self.request.user.user_type != 'admin' and 
             self.request.user.id != user_id):
-            raise permissions.PermissionDenied("No tienes permisos para ver estas aplicaciones")
+            raise PermissionDenied("No tienes permisos para ver estas aplicaciones")
         
         return Application.objects.filter(
             user_id=user_id
@@ -148,17 +159,20 @@ class ApplicationStatsView(generics.ListAPIView):
     
     def get_queryset(self):
         if self.request.user.user_type != 'admin':
-            raise permissions.PermissionDenied("Solo los administradores pueden ver estadísticas")
+            raise PermissionDenied("Solo los administradores pueden ver estadísticas")
         
-        # Retornar estadísticas como un objeto único
+        # Retornar estadísticas como un objeto único (un solo GROUP BY, cacheado)
+        global_stats = stats.global_stats()
+        counts = global_stats['counts']
         return [{
-            'total_applications': Application.objects.count(),
-            'pending_applications': Application.objects.filter(status='pending').count(),
-            'approved_applications': Application.objects.filter(status='approved').count(),
-            'rejected_applications': Application.objects.filter(status='rejected').count(),
-            'in_progress_applications': Application.objects.filter(status='in_progress').count(),
-            'completed_applications': Application.objects.filter(status='completed').count(),
-            'cancelled_applications': Application.objects.filter(status='cancelled').count(),
+            'total_applications': global_stats['total'],
+            'pending_applications': counts['pending'],
+            'approved_applications': counts['approved'],
+            'rejected_applications': counts['rejected'],
+            'in_progress_applications': counts['in_progress'],
+            'completed_applications': counts['completed'],
+            'cancelled_applications': counts['cancelled'],
+            'waitlisted_applications': counts['waitlisted'],
         }]
 
 
@@ -179,9 +193,11 @@ class ApplicationEvaluationListView(generics.ListCreateAPIView):
         
         # Solo admins pueden evaluar aplicaciones
         if self.request.user.user_type != 'admin':
-            raise permissions.PermissionDenied("Solo los administradores pueden evaluar aplicaciones")
+            raise PermissionDenied("Solo los administradores pueden evaluar aplicaciones")
         
-        serializer.save(evaluator=self.request.user, application=application)
+        with transaction.atomic():
+            evaluation = serializer.save(evaluator=self.request.user, application=application)
+            evaluations.record_evaluation(evaluation)
 
 
 class ApplicationNotificationListView(generics.ListAPIView):
@@ -194,7 +210,52 @@ class ApplicationNotificationListView(generics.ListAPIView):
     def get_queryset(self):
         return ApplicationNotification.objects.filter(
             recipient=self.request.user
-        ).order_by('-created_at')
+        ).select_related('recipient', 'application__project').order_by('-created_at')
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def project_shortlist(request, project_id):
+    """
+    Preselección: las k aplicaciones mejor evaluadas de un proyecto (paginación por cursor)
+    """
+    try:
+        project = Project.objects.only('id', 'manager_id').get(id=project_id)
+    except Project.DoesNotExist:
+        return Response(
+            {'error': 'Proyecto no encontrado'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    # Solo el manager del proyecto o admins pueden ver la preselección
+    if request.user.user_type != 'admin' and project.manager_id != request.user.id:
+        return Response(
+            {'error': 'No tienes permisos para ver estas aplicaciones'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    statuses = request.query_params.getlist('status') or ['pending']
+    try:
+        k = min(max(int(request.query_params.get('k', 20)), 1), 100)
+        min_evaluations = int(request.query_params.get('min_evaluations', 1))
+        summaries, next_cursor = evaluations.shortlist(
+            project.id,
+            k=k,
+            cursor=request.query_params.get('cursor'),
+            statuses=statuses,
+            min_evaluations=min_evaluations
+        )
+    except ValueError:
+        return Response(
+            {'error': 'Parámetros de paginación inválidos'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    serializer = ShortlistEntrySerializer(summaries, many=True)
+    return Response({
+        'results': serializer.data,
+        'next_cursor': next_cursor
+    }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -229,39 +290,36 @@ def review_application(request, application_id):
     
     old_status = application.status
     
-    # Actualizar aplicación
-    application.status = new_status
-    application.reviewed_by = request.user
-    application.reviewed_at = timezone.now()
-    application.review_notes = review_notes
-    application.save()
-    
-    # Si se aprueba, agregar al estudiante como miembro del proyecto y actualizar contador
-    if new_status == 'approved' and old_status != 'approved':
-        project = application.project
-        # Agregar al estudiante como miembro si no está ya
-        if application.user not in project.members.all():
-            project.members.add(application.user)
-        # Actualizar contador de participantes
-        project.current_participants = project.members.count()
-        project.save()
-    
-    # Si se rechaza y estaba aprobada, remover del proyecto y actualizar contador
-    if new_status == 'rejected' and old_status == 'approved':
-        project = application.project
-        if application.user in project.members.all():
-            project.members.remove(application.user)
-        project.current_participants = project.members.count()
-        project.save()
-    
-    # Crear notificación
-    ApplicationNotification.objects.create(
-        application=application,
-        recipient=application.user,
-        notification_type=f'application_{new_status}',
-        title=f'Aplicación {new_status}',
-        message=f'Tu aplicación para el proyecto {application.project.name} ha sido {new_status}.'
-    )
+    with transaction.atomic():
+        # Si estaba en lista de espera, sale de la cola al ser revisada
+        if old_status == 'waitlisted':
+            waitlist.remove(application)
+        
+        # Actualizar aplicación
+        application.status = new_status
+        application.reviewed_by = request.user
+        application.reviewed_at = timezone.now()
+        application.review_notes = review_notes
+        application.save()
+        
+        # Si se aprueba, agregar al estudiante como miembro del proyecto (actualiza el contador)
+        if new_status == 'approved' and old_status != 'approved':
+            membership.add_member(application.project, application.user)
+        
+        # Si se rechaza y estaba aprobada, remover del proyecto y promover
+        # a la siguiente aplicación en lista de espera
+        if new_status == 'rejected' and old_status == 'approved':
+            if membership.remove_member(application.project, application.user):
+                waitlist.promote_waitlisted(application.project)
+        
+        # Registrar la notificación en la bandeja de salida (misma transacción)
+        outbox.publish(
+            application,
+            application.user,
+            f'application_{new_status}',
+            f'Aplicación {new_status}',
+            f'Tu aplicación para el proyecto {application.project.name} ha sido {new_status}.'
+        )
     
     # Recargar la aplicación desde la base de datos para obtener datos actualizados
     application.refresh_from_db()
@@ -289,8 +347,6 @@ def bulk_action_applications(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    applications = Application.objects.filter(id__in=application_ids)
-    
     if action == 'approve':
         new_status = 'approved'
     elif action == 'reject':
@@ -303,25 +359,9 @@ def bulk_action_applications(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Actualizar aplicaciones
-    updated_count = 0
-    for application in applications:
-        if application.status == 'pending':
-            application.status = new_status
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
-            application.review_notes = notes
-            application.save()
-            updated_count += 1
-            
-            # Crear notificación
-            ApplicationNotification.objects.create(
-                application=application,
-                recipient=application.user,
-                notification_type=f'application_{new_status}',
-                title=f'Aplicación {new_status}',
-                message=f'Tu aplicación para el proyecto {application.project.name} ha sido {new_status}.'
-            )
+    # Actualizar aplicaciones pendientes en una sola operación por conjuntos
+    updated = bulk.bulk_review(application_ids, new_status, request.user, notes)
+    updated_count = len(updated)
     
     return Response({
         'message': f'{updated_count} aplicaciones actualizadas',
@@ -329,6 +369,47 @@ def bulk_action_applications(request):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def allocate_applications(request):
+    """
+    Asignación masiva de aplicaciones pendientes a proyectos.
+    Por defecto solo calcula el plan (dry-run); con `apply` y el `plan` revisado lo aplica.
+    """
+    if request.user.user_type != 'admin':
+        return Response(
+            {'error': 'Solo los administradores pueden asignar aplicaciones'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    serializer = AllocationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    options = {
+        'project_ids': data.get('project_ids'),
+        'max_per_student': data['max_per_student'],
+        'min_score': data.get('min_score'),
+    }
+    
+    if not data['apply']:
+        return Response(allocation.build_plan(**options), status=status.HTTP_200_OK)
+    
+    try:
+        result = allocation.apply_plan(
+            reviewer=request.user,
+            plan=data['plan'],
+            notes=data.get('notes', ''),
+            **options
+        )
+    except allocation.PlanChanged as e:
+        return Response(
+            {'error': 'Las aplicaciones o los cupos cambiaron desde que se calculó el plan', 'plan': str(e)},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return Response(result, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def mark_notification_read(request, notification_id):
@@ -346,12 +427,76 @@ def mark_notification_read(request, notification_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    notification.is_read = True
-    notification.save()
+    notifications.mark_read(request.user, [notification.id])
+    events.publish_unread_count(request.user.id)
     
     return Response({'message': 'Notificación marcada como leída'}, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_notifications_read(request):
+    """
+    Marcar como leídas varias notificaciones del usuario (un solo UPDATE)
+    """
+    serializer = NotificationMarkReadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    updated_count = notifications.mark_read(request.user, serializer.validated_data['notification_ids'])
+    events.publish_unread_count(request.user.id)
+    
+    return Response({
+        'message': f'{updated_count} notificaciones marcadas como leídas',
+        'updated_count': updated_count
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_all_notifications_read(request):
+    """
+    Marcar como leídas todas las notificaciones del usuario (un solo UPDATE)
+    """
+    updated_count = notifications.mark_read(request.user)
+    events.publish_unread_count(request.user.id)
+    
+    return Response({
+        'message': f'{updated_count} notificaciones marcadas como leídas',
+        'updated_count': updated_count
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def notification_archive(request):
+    """
+    Consultar las notificaciones archivadas del usuario (paginación por `cursor`,
+    con el formato "<bloque>:<desplazamiento>" que devuelve `next_cursor`)
+    """
+    try:
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            chunk_id, offset = (int(part) for part in cursor.split(':'))
+            if offset < 0:
+                raise ValueError(cursor)
+            cursor = (chunk_id, offset)
+        else:
+            cursor = None
+        limit = min(int(request.query_params.get('limit', 20)), 100)
+    except ValueError:
+        return Response(
+            {'error': 'Parámetros de paginación inválidos'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    results, next_cursor = retention.read_archive(request.user, cursor=cursor, limit=max(limit, 1))
+    
+    return Response({
+        'results': results,
+        'next_cursor': f'{next_cursor[0]}:{next_cursor[1]}' if next_cursor else None
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def application_dashboard_stats(request):
@@ -361,39 +506,37 @@ def application_dashboard_stats(request):
     user = request.user
     
     if user.user_type == 'admin':
-        # Estadísticas para admin
-        stats = {
-            'total_applications': Application.objects.count(),
-            'pending_applications': Application.objects.filter(status='pending').count(),
-            'approved_applications': Application.objects.filter(status='approved').count(),
-            'rejected_applications': Application.objects.filter(status='rejected').count(),
-            'in_progress_applications': Application.objects.filter(status='in_progress').count(),
-            'completed_applications': Application.objects.filter(status='completed').count(),
-            'recent_applications': Application.objects.order_by('-applied_at')[:5].count(),
+        # Estadísticas para admin (un solo GROUP BY, cacheado)
+        global_stats = stats.global_stats()
+        counts = global_stats['counts']
+        dashboard = {
+            'total_applications': global_stats['total'],
+            'pending_applications': counts['pending'],
+            'approved_applications': counts['approved'],
+            'rejected_applications': counts['rejected'],
+            'in_progress_applications': counts['in_progress'],
+            'completed_applications': counts['completed'],
+            'waitlisted_applications': counts['waitlisted'],
+            'recent_applications': min(global_stats['total'], 5),
         }
         
         # Aplicaciones por proyecto
-        project_stats = Application.objects.values('project__name').annotate(
-            count=Count('id')
-        ).order_by('-count')[:5]
-        
-        stats['applications_by_project'] = list(project_stats)
+        dashboard['applications_by_project'] = global_stats['applications_by_project']
     
     else:
-        # Estadísticas para estudiante
-        stats = {
-            'my_applications': user.applications.count(),
-            'pending_applications': user.applications.filter(status='pending').count(),
-            'approved_applications': user.applications.filter(status='approved').count(),
-            'rejected_applications': user.applications.filter(status='rejected').count(),
-            'completed_applications': user.applications.filter(status='completed').count(),
-            'unread_notifications': ApplicationNotification.objects.filter(
-                recipient=user,
-                is_read=False
-            ).count(),
+        # Estadísticas para estudiante (una sola agregación condicional)
+        counts = stats.user_status_counts(user)
+        dashboard = {
+            'my_applications': counts['total'],
+            'pending_applications': counts['pending'],
+            'approved_applications': counts['approved'],
+            'rejected_applications': counts['rejected'],
+            'completed_applications': counts['completed'],
+            'waitlisted_applications': counts['waitlisted'],
+            'unread_notifications': notifications.unread_count(user),
         }
     
-    return Response(stats, status=status.HTTP_200_OK)
+    return Response(dashboard, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -413,24 +556,63 @@ def cancel_application(request, application_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Solo se puede cancelar si está pendiente o aprobada
-    if application.status not in ['pending', 'approved']:
+    # Solo se puede cancelar si está pendiente, aprobada o en lista de espera
+    if application.status not in ['pending', 'approved', 'waitlisted']:
         return Response(
             {'error': 'No se puede cancelar esta aplicación'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    application.status = 'cancelled'
-    application.save()
+    old_status = application.status
     
-    # Crear notificación para el manager del proyecto
-    ApplicationNotification.objects.create(
-        application=application,
-        recipient=application.project.manager,
-        notification_type='application_cancelled',
-        title='Aplicación cancelada',
-        message=f'{application.user.full_name} ha cancelado su aplicación para el proyecto {application.project.name}.'
-    )
+    with transaction.atomic():
+        if old_status == 'waitlisted':
+            waitlist.remove(application)
+        
+        application.status = 'cancelled'
+        application.save()
+        
+        # Si estaba aprobada, liberar la plaza y promover a la lista de espera
+        if old_status == 'approved':
+            if membership.remove_member(application.project, application.user):
+                waitlist.promote_waitlisted(application.project)
+        
+        # Notificar al manager del proyecto a través de la bandeja de salida
+        outbox.publish(
+            application,
+            application.project.manager_id,
+            'application_cancelled',
+            'Aplicación cancelada',
+            f'{application.user.full_name} ha cancelado su aplicación para el proyecto {application.project.name}.'
+        )
     
     serializer = ApplicationSerializer(application)
     return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def waitlist_position(request, application_id):
+    """
+    Consultar la posición de una aplicación en la lista de espera
+    """
+    try:
+        application = Application.objects.get(id=application_id)
+    except Application.DoesNotExist:
+        return Response(
+            {'error': 'Aplicación no encontrada'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    # Solo el propio estudiante o admins pueden consultar la posición
+    if request.user.user_type != 'admin' and application.user_id != request.user.id:
+        return Response(
+            {'error': 'No tienes permisos para ver esta aplicación'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    return Response({
+        'application_id': application.id,
+        'status': application.status,
+        'position': waitlist.get_position(application),
+    }, status=status.HTTP_200_OK)
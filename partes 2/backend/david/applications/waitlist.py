@@ -0,0 +1,136 @@
+"""
+Lista de espera de convocatorias.
+
+Cada proyecto tiene una cola FIFO persistente (ProjectWaitlist) con posiciones
+absolutas crecientes. Ninguna operación renumera: desencolar toma la menor
+posición después de `head` y quitar una entrada deja un hueco. Todas las
+operaciones bloquean la fila de la cola para serializar los cambios
+concurrentes sobre un mismo proyecto; la restricción única (waitlist, position)
+protege además contra posiciones duplicadas.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from projects import membership
+from projects.models import Project
+from . import outbox
+from .models import ProjectWaitlist, WaitlistEntry
+
+
+def _lock_waitlist(project_id):
+    """Obtiene (o crea) la cola del proyecto bloqueando su fila"""
+    ProjectWaitlist.objects.get_or_create(project_id=project_id)
+    return ProjectWaitlist.objects.select_for_update().get(project_id=project_id)
+
+
+def enqueue(application):
+    """
+    Agrega una aplicación al final de la lista de espera de su proyecto
+    """
+    with transaction.atomic():
+        waitlist = _lock_waitlist(application.project_id)
+        entry = WaitlistEntry.objects.create(
+            waitlist=waitlist,
+            application=application,
+            position=waitlist.tail + 1
+        )
+        ProjectWaitlist.objects.filter(pk=waitlist.pk).update(tail=F('tail') + 1, size=F('size') + 1)
+        waitlist.tail += 1
+        waitlist.size += 1
+
+        application.status = 'waitlisted'
+        application.save(update_fields=['status', 'updated_at'])
+
+    return entry
+
+
+def dequeue(project):
+    """
+    Saca la aplicación que está al frente de la cola.
+    Retorna None si no hay nadie esperando.
+    """
+    with transaction.atomic():
+        waitlist = _lock_waitlist(project.pk)
+        entry = WaitlistEntry.objects.filter(
+            waitlist=waitlist,
+            position__gt=waitlist.head
+        ).order_by('position').select_related('application__user', 'application__project').first()
+
+        if entry is None:
+            return None
+
+        entry.delete()
+        ProjectWaitlist.objects.filter(pk=waitlist.pk).update(head=entry.position, size=F('size') - 1)
+
+    return entry.application
+
+
+def remove(application):
+    """
+    Quita una aplicación de la cola (por ejemplo, al cancelarla o revisarla).
+    Las entradas que estaban detrás avanzan porque su posición se cuenta, sin
+    reescribirlas.
+    """
+    with transaction.atomic():
+        try:
+            entry = WaitlistEntry.objects.select_related('waitlist').get(application=application)
+        except WaitlistEntry.DoesNotExist:
+            return False
+
+        waitlist = _lock_waitlist(entry.waitlist.project_id)
+        # Otra transacción pudo desencolarla mientras se esperaba el bloqueo
+        if not WaitlistEntry.objects.filter(pk=entry.pk).delete()[0]:
+            return False
+        ProjectWaitlist.objects.filter(pk=waitlist.pk).update(size=F('size') - 1)
+
+    return True
+
+
+def get_position(application):
+    """
+    Posición de la aplicación en la cola (1 = la siguiente), o None si no está en espera
+    """
+    entry = WaitlistEntry.objects.filter(application=application).first()
+    if entry is None:
+        return None
+    return entry.get_position()
+
+
+def promote_waitlisted(project):
+    """
+    Llena las plazas libres del proyecto con las aplicaciones al frente de la cola.
+
+    Debe llamarse dentro de la misma transacción que libera la plaza.
+    Retorna la lista de aplicaciones promovidas.
+    """
+    promoted = []
+
+    with transaction.atomic():
+        project = Project.objects.select_for_update().get(pk=project.pk)
+        if not project.is_active:
+            return promoted
+
+        while project.current_participants < project.max_participants:
+            application = dequeue(project)
+            if application is None:
+                break
+
+            application.status = 'approved'
+            application.reviewed_at = timezone.now()
+            application.review_notes = 'Promovida automáticamente desde la lista de espera'
+            application.save(update_fields=['status', 'reviewed_at', 'review_notes', 'updated_at'])
+
+            membership.add_member(project, application.user)
+
+            outbox.publish(
+                application,
+                application.user,
+                'application_approved',
+                'Aplicación approved',
+                f'Se liberó un cupo en el proyecto {project.name} y tu aplicación ha sido approved.'
+            )
+            promoted.append(application)
+
+    return promoted
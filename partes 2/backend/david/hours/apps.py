@@ -5,3 +5,6 @@ class HoursConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hours'
     verbose_name = 'Horas'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_evaluation_summary'),
+        ('hours', '0001_initial'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hourlog',
+            index=models.Index(fields=['user', 'status', 'date'], name='hours_hourl_user_id_3fbddf_idx'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from users.models import User
 from projects.models import Project
@@ -16,6 +16,8 @@ class HourLog(models.Model):
         ('rejected', 'Rechazado'),
     ]
     
+    PROGRESS_FIELDS = ('status', 'hours', 'date', 'user_id')
+    
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -118,6 +120,10 @@ class HourLog(models.Model):
         verbose_name = 'Registro de Horas'
         verbose_name_plural = 'Registros de Horas'
         ordering = ['-date', '-created_at']
+        # Horas aprobadas de un estudiante en un rango de fechas (becas, cumplimiento)
+        indexes = [
+            models.Index(fields=['user', 'status', 'date']),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.project.name} - {self.hours}h ({self.date})"
@@ -132,7 +138,38 @@ class HourLog(models.Model):
     
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        from users import scholarships
+        
+        # El progreso de becas se ajusta en la misma transacción que el registro;
+        # la fila anterior se bloquea para que dos revisiones no cuenten doble
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = self.previous_progress_state()
+            super().save(*args, **kwargs)
+            scholarships.record_change(previous, self.progress_state())
+    
+    def delete(self, *args, **kwargs):
+        # La señal post_delete (hours/signals.py) descuenta el registro de las becas;
+        # aquí se bloquea la fila y se toman sus valores vigentes para que descuente lo guardado
+        with transaction.atomic():
+            previous = self.previous_progress_state()
+            if previous:
+                for field, value in previous.items():
+                    setattr(self, field, value)
+            return super().delete(*args, **kwargs)
+    
+    def previous_progress_state(self):
+        return HourLog.objects.select_for_update().filter(pk=self.pk).values(*self.PROGRESS_FIELDS).first()
+    
+    def progress_state(self):
+        """Campos que determinan el aporte del registro al progreso de becas"""
+        return {
+            'status': self.status,
+            'hours': self._meta.get_field('hours').to_python(self.hours),
+            'date': self._meta.get_field('date').to_python(self.date),
+            'user_id': self.user_id,
+        }
 
 
 class HourLogDocument(models.Model):
@@ -0,0 +1,19 @@
+"""
+Señales de la app de horas.
+
+Borrar un proyecto, una aplicación o un usuario borra sus HourLog en cascada
+sin pasar por HourLog.delete. El ajuste del progreso de becas se hace al
+recibir post_delete de cada registro, así cubre tanto HourLog.delete como las
+cascadas y los borrados por queryset.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from users import scholarships
+from .models import HourLog
+
+
+@receiver(post_delete, sender=HourLog)
+def discount_scholarship_hours(sender, instance, **kwargs):
+    scholarships.record_change(instance.progress_state(), None)
@@ -0,0 +1,213 @@
+import csv
+import io
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from applications.models import Application
+from projects.models import Project
+from users import compliance, scholarships
+from users.models import Scholarship, User, UserScholarship
+from .models import HourLog
+
+
+class HourLogTestCase(TestCase):
+    """Estudiante con una beca vigente y un proyecto donde registrar horas"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', password='admin12345', carnet='ADM1', user_type='admin'
+        )
+        self.student = User.objects.create_user(
+            username='estudiante', password='estudiante123', carnet='EST1', user_type='student'
+        )
+        now = timezone.now()
+        self.project = Project.objects.create(
+            name='Proyecto', description='Proyecto de prueba', manager=self.admin, max_hours=100,
+            start_date=now - timedelta(days=400), end_date=now + timedelta(days=60)
+        )
+        self.today = timezone.localdate()
+        self.scholarship = Scholarship.objects.create(
+            name='Beca', scholarship_type='merit', description='Beca de prueba', required_hours=100
+        )
+        self.user_scholarship = UserScholarship.objects.create(
+            user=self.student, scholarship=self.scholarship,
+            start_date=self.today - timedelta(days=730), end_date=self.today + timedelta(days=365)
+        )
+
+    def log(self, hours, day=None, status='pending', project=None, application=None):
+        return HourLog.objects.create(
+            user=self.student, project=project or self.project, application=application,
+            hours=Decimal(hours), date=day or self.today,
+            start_time=time(8), end_time=time(12), activity_description='Actividad',
+            supervisor_name='Supervisor', supervisor_contact='supervisor@example.com', status=status
+        )
+
+
+class ScholarshipProgressTests(HourLogTestCase):
+    """Las horas aprobadas se reflejan en las becas del estudiante al revisar, editar o borrar"""
+
+    def progress(self):
+        self.user_scholarship.refresh_from_db()
+        return self.user_scholarship.current_year_hours, self.user_scholarship.total_hours_completed
+
+    def test_approving_a_log_adds_its_hours(self):
+        hour_log = self.log('4.00')
+        self.assertEqual(self.progress(), (Decimal('0'), Decimal('0')))
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.patch(f'/api/hours/{hour_log.pk}/review/', {'status': 'approved'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.progress(), (Decimal('4.00'), Decimal('4.00')))
+
+    def test_edits_and_deletes_keep_progress_in_step(self):
+        hour_log = self.log('4.00', status='approved')
+
+        hour_log.hours = Decimal('2.50')
+        hour_log.save()
+        self.assertEqual(self.progress(), (Decimal('2.50'), Decimal('2.50')))
+
+        hour_log.status = 'rejected'
+        hour_log.save()
+        self.assertEqual(self.progress(), (Decimal('0'), Decimal('0')))
+
+        hour_log.status = 'approved'
+        hour_log.save()
+        hour_log.delete()
+        self.assertEqual(self.progress(), (Decimal('0'), Decimal('0')))
+
+    def test_delete_discounts_the_stored_values(self):
+        hour_log = self.log('4.00')
+        HourLog.objects.filter(pk=hour_log.pk).update(status='approved')
+        scholarships.recompute()
+
+        hour_log.delete()
+
+        self.assertEqual(self.progress(), (Decimal('0'), Decimal('0')))
+
+    def test_cascade_deletes_discount_the_hours(self):
+        other_project = Project.objects.create(
+            name='Otro', description='Proyecto de prueba', manager=self.admin, max_hours=100,
+            start_date=self.project.start_date, end_date=self.project.end_date
+        )
+        application = Application.objects.create(
+            user=self.student, project=other_project, motivation='Motivación', start_date_preference=self.today
+        )
+        self.log('4.00', status='approved')
+        self.log('2.00', status='approved', project=other_project, application=application)
+        self.log('1.00', status='approved', project=other_project)
+        self.assertEqual(self.progress(), (Decimal('7.00'), Decimal('7.00')))
+
+        application.delete()
+        self.assertEqual(self.progress(), (Decimal('5.00'), Decimal('5.00')))
+
+        other_project.delete()
+        self.assertEqual(self.progress(), (Decimal('4.00'), Decimal('4.00')))
+
+    def test_hours_outside_the_current_year_or_the_scholarship(self):
+        last_year = scholarships.academic_year_bounds(scholarships.current_academic_year())[0] - timedelta(days=1)
+        self.log('3.00', day=last_year, status='approved')
+        self.log('5.00', day=self.user_scholarship.start_date - timedelta(days=1), status='approved')
+
+        self.assertEqual(self.progress(), (Decimal('0'), Decimal('3.00')))
+
+    def test_recompute_matches_incremental_updates(self):
+        self.log('4.00', status='approved')
+        self.log('1.25', status='approved')
+        incremental = self.progress()
+
+        UserScholarship.objects.update(current_year_hours=0, total_hours_completed=0)
+        self.assertEqual(scholarships.recompute(), 1)
+
+        self.assertEqual(self.progress(), incremental)
+
+
+class ComplianceReportTests(HourLogTestCase):
+    """Reporte de cumplimiento: proyección, estudiantes en riesgo, CSV e invalidación del cache"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def report(self, **params):
+        return self.client.get('/api/auth/admin/scholarships/compliance/', params)
+
+    def row(self, approved, start_date, required=100):
+        return {
+            'id': 1, 'user_id': 1, 'user__carnet': 'EST1', 'user__first_name': '', 'user__last_name': '',
+            'user__username': 'estudiante', 'scholarship_id': 1, 'scholarship__name': 'Beca',
+            'scholarship__required_hours': required, 'start_date': start_date, 'end_date': date(2026, 12, 31),
+            'approved_hours': Decimal(approved),
+        }
+
+    def test_projection_extrapolates_the_elapsed_pace(self):
+        year_start = date(2025, 1, 1)
+        with mock.patch.object(scholarships, 'ACADEMIC_YEAR_START_MONTH', 1):
+            behind, on_track, recent = compliance.project([
+                self.row('30', year_start), self.row('60', year_start), self.row('0', date(2025, 6, 25)),
+            ], 2025, date(2025, 7, 2))
+
+        # 183 de 365 días transcurridos
+        self.assertEqual(behind['projected_hours'], round(30 * 365 / 183, 2))
+        self.assertTrue(behind['at_risk'])
+        self.assertEqual(behind['remaining_hours'], 70)
+        self.assertEqual(behind['weekly_hours_needed'], round(70 / (182 / 7), 2))
+        self.assertEqual(on_track['projected_hours'], round(60 * 365 / 183, 2))
+        self.assertFalse(on_track['at_risk'])
+        self.assertEqual(behind['full_name'], 'estudiante')
+        # Con menos de MIN_ELAPSED_DAYS de vigencia no hay proyección ni riesgo
+        self.assertIsNone(recent['projected_hours'])
+        self.assertFalse(recent['at_risk'])
+
+    @mock.patch.object(compliance, 'MIN_ELAPSED_DAYS', 1)
+    def test_at_risk_filter_and_csv_export(self):
+        Scholarship.objects.filter(pk=self.scholarship.pk).update(required_hours=4)
+        self.log('4.00', status='approved')
+        behind = User.objects.create_user(
+            username='atrasado', password='estudiante123', carnet='EST2', user_type='student'
+        )
+        UserScholarship.objects.create(
+            user=behind, scholarship=self.scholarship,
+            start_date=self.user_scholarship.start_date, end_date=self.user_scholarship.end_date
+        )
+
+        response = self.report()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], {'students': 2, 'at_risk': 1, 'completed': 1})
+
+        response = self.report(at_risk='true')
+        self.assertEqual([student['carnet'] for student in response.data['students']], ['EST2'])
+
+        response = self.report(export='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(response.content.decode())))
+        self.assertEqual(rows[0], compliance.REPORT_FIELDS)
+        exported = {row[rows[0].index('carnet')]: dict(zip(rows[0], row)) for row in rows[1:]}
+        self.assertEqual(exported['EST1']['approved_hours'], '4.0')
+        self.assertEqual(exported['EST1']['weekly_hours_needed'], '')
+        self.assertEqual(exported['EST2']['at_risk'], 'True')
+
+        self.assertEqual(self.report(export='pdf').status_code, 400)
+
+    def test_hour_review_invalidates_the_cached_report(self):
+        hour_log = self.log('4.00')
+        self.assertEqual(self.report().data['students'][0]['approved_hours'], 0)
+
+        # Un cambio que no pasa por HourLog.save no invalida: se sirve el reporte cacheado
+        HourLog.objects.filter(pk=hour_log.pk).update(hours=Decimal('5.00'))
+        self.assertEqual(self.report().data['students'][0]['approved_hours'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/hours/{hour_log.pk}/review/', {'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.report().data['students'][0]['approved_hours'], 5.0)
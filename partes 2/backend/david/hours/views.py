@@ -1,7 +1,9 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
 from django.db.models import Q, Sum, Count
+from django.db.models.functions import ExtractMonth
 from django.utils import timezone
 from datetime import datetime, timedelta
 
@@ -16,6 +18,22 @@ from .serializers import (
 )
 
 
+# Totales de un conjunto de registros en una sola consulta (aggregate o values().annotate())
+HOUR_TOTALS = {
+    'total_hours': Sum('hours'),
+    'approved_hours': Sum('hours', filter=Q(status='approved')),
+    'pending_hours': Sum('hours', filter=Q(status='pending')),
+    'rejected_hours': Sum('hours', filter=Q(status='rejected')),
+    'projects_count': Count('project', distinct=True, filter=Q(status='approved')),
+    'logs_count': Count('id'),
+}
+
+
+def hour_totals(row):
+    """Normaliza una fila de HOUR_TOTALS: las sumas sin registros son 0"""
+    return {key: row.get(key) or 0 for key in HOUR_TOTALS}
+
+
 class HourLogListView(generics.ListCreateAPIView):
     """
     Vista para listar y crear registros de horas
@@ -80,7 +98,7 @@ class HourLogReviewView(generics.UpdateAPIView):
     
     def get_queryset(self):
         if self.request.user.user_type != 'admin':
-            raise permissions.PermissionDenied("Solo los administradores pueden revisar registros de horas")
+            raise PermissionDenied("Solo los administradores pueden revisar registros de horas")
         
         return HourLog.objects.filter(status='pending')
     
@@ -103,7 +121,7 @@ class HourSummaryListView(generics.ListAPIView):
         
         # Si es estudiante, solo sus propios resúmenes
         if self.request.user.user_type == 'student' and user_id != self.request.user.id:
-            raise permissions.PermissionDenied("No tienes permisos para ver estos resúmenes")
+            raise PermissionDenied("No tienes permisos para ver estos resúmenes")
         
         return HourSummary.objects.filter(user_id=user_id).order_by('-year', '-month')
 
@@ -124,7 +142,7 @@ class HourGoalListView(generics.ListCreateAPIView):
         
         # Si es estudiante, solo sus propias metas
         if self.request.user.user_type == 'student' and user_id != self.request.user.id:
-            raise permissions.PermissionDenied("No tienes permisos para ver estas metas")
+            raise PermissionDenied("No tienes permisos para ver estas metas")
         
         return HourGoal.objects.filter(user_id=user_id).order_by('-created_at')
     
@@ -145,7 +163,7 @@ class HourGoalDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         # Si es estudiante, solo sus propias metas
         if self.request.user.user_type == 'student' and user_id != self.request.user.id:
-            raise permissions.PermissionDenied("No tienes permisos para ver estas metas")
+            raise PermissionDenied("No tienes permisos para ver estas metas")
         
         return HourGoal.objects.filter(user_id=user_id)
 
@@ -162,7 +180,7 @@ class UserHourSummaryView(generics.ListAPIView):
         
         # Si es estudiante, solo sus propios registros
         if self.request.user.user_type == 'student' and user_id != self.request.user.id:
-            raise permissions.PermissionDenied("No tienes permisos para ver estos registros")
+            raise PermissionDenied("No tienes permisos para ver estos registros")
         
         return HourLog.objects.filter(user_id=user_id).select_related('project').order_by('-date')
 
@@ -182,9 +200,9 @@ class ProjectHourSummaryView(generics.ListAPIView):
             project = Project.objects.get(id=project_id)
             if (self.request.user.user_type != 'admin' and 
                 project.manager != self.request.user):
-                raise permissions.PermissionDenied("No tienes permisos para ver estas horas")
+                raise PermissionDenied("No tienes permisos para ver estas horas")
         except Project.DoesNotExist:
-            raise permissions.PermissionDenied("Proyecto no encontrado")
+            raise NotFound("Proyecto no encontrado")
         
         return HourLog.objects.filter(
             project_id=project_id
@@ -294,22 +312,10 @@ def monthly_hour_report(request, year, month):
         date__month=month
     )
     
-    total_hours = hour_logs.aggregate(total=Sum('hours'))['total'] or 0
-    approved_hours = hour_logs.filter(status='approved').aggregate(total=Sum('hours'))['total'] or 0
-    pending_hours = hour_logs.filter(status='pending').aggregate(total=Sum('hours'))['total'] or 0
-    rejected_hours = hour_logs.filter(status='rejected').aggregate(total=Sum('hours'))['total'] or 0
-    projects_count = hour_logs.filter(status='approved').values('project').distinct().count()
-    logs_count = hour_logs.count()
-    
     report = {
         'month': month,
         'year': year,
-        'total_hours': total_hours,
-        'approved_hours': approved_hours,
-        'pending_hours': pending_hours,
-        'rejected_hours': rejected_hours,
-        'projects_count': projects_count,
-        'logs_count': logs_count,
+        **hour_totals(hour_logs.aggregate(**HOUR_TOTALS)),
     }
     
     return Response(report, status=status.HTTP_200_OK)
@@ -336,43 +342,18 @@ def yearly_hour_report(request, year):
         date__year=year
     )
     
-    total_hours = hour_logs.aggregate(total=Sum('hours'))['total'] or 0
-    approved_hours = hour_logs.filter(status='approved').aggregate(total=Sum('hours'))['total'] or 0
-    pending_hours = hour_logs.filter(status='pending').aggregate(total=Sum('hours'))['total'] or 0
-    rejected_hours = hour_logs.filter(status='rejected').aggregate(total=Sum('hours'))['total'] or 0
-    projects_count = hour_logs.filter(status='approved').values('project').distinct().count()
-    logs_count = hour_logs.count()
-    
-    # Desglose mensual
-    monthly_breakdown = []
-    for month in range(1, 13):
-        month_logs = hour_logs.filter(date__month=month)
-        month_total = month_logs.aggregate(total=Sum('hours'))['total'] or 0
-        month_approved = month_logs.filter(status='approved').aggregate(total=Sum('hours'))['total'] or 0
-        month_pending = month_logs.filter(status='pending').aggregate(total=Sum('hours'))['total'] or 0
-        month_rejected = month_logs.filter(status='rejected').aggregate(total=Sum('hours'))['total'] or 0
-        month_projects = month_logs.filter(status='approved').values('project').distinct().count()
-        month_logs_count = month_logs.count()
-        
-        monthly_breakdown.append({
-            'month': month,
-            'year': year,
-            'total_hours': month_total,
-            'approved_hours': month_approved,
-            'pending_hours': month_pending,
-            'rejected_hours': month_rejected,
-            'projects_count': month_projects,
-            'logs_count': month_logs_count,
-        })
+    # Un GROUP BY por mes para el desglose y un agregado para el año
+    rows = hour_logs.order_by().annotate(month=ExtractMonth('date')).values('month').annotate(**HOUR_TOTALS)
+    by_month = {row['month']: hour_totals(row) for row in rows}
+    empty_month = hour_totals({})
+    monthly_breakdown = [
+        {'month': month, 'year': year, **by_month.get(month, empty_month)}
+        for month in range(1, 13)
+    ]
     
     report = {
         'year': year,
-        'total_hours': total_hours,
-        'approved_hours': approved_hours,
-        'pending_hours': pending_hours,
-        'rejected_hours': rejected_hours,
-        'projects_count': projects_count,
-        'logs_count': logs_count,
+        **hour_totals(hour_logs.aggregate(**HOUR_TOTALS)),
         'monthly_breakdown': monthly_breakdown,
     }
     
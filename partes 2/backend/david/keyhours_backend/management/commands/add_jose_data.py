@@ -7,6 +7,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from users.models import User
+from projects import membership
 from projects.models import Project
 from applications.models import Application
 from hours.models import HourLog
@@ -97,10 +98,7 @@ class Command(BaseCommand):
 
         # Agregar jose como miembro de los proyectos
         for project in created_projects:
-            if jose not in project.members.all():
-                project.members.add(jose)
-                project.current_participants = project.members.count()
-                project.save()
+            if membership.add_member(project, jose):
                 self.stdout.write(self.style.SUCCESS(f'✅ {jose.username} agregado como miembro de: {project.name}'))
 
         # Crear registros de horas aprobadas (50 horas por proyecto)
@@ -0,0 +1,171 @@
+"""
+Comando de gestión para medir el costo del login
+Ejecutar con: python manage.py benchmark_login --base-url http://127.0.0.1:8000
+Calibrar los hashers con: python manage.py benchmark_login --budget-ms 50 --hashers-only
+
+Primero mide cuánto tarda un hash con cada perfil de users.hashers (y, con
+--budget-ms, qué parámetros caben en ese presupuesto). Después siembra
+estudiantes con hashes del perfil --seed-profile y lanza la ráfaga de logins
+contra el servidor en tres fases: primer login (rehash al perfil preferido),
+segundo login (hash ya actualizado) y logins mezclados con un atacante que
+prueba contraseñas desde una sola IP.
+
+El servidor debe estar corriendo contra la misma base de datos. La IP de cada
+cliente se envía en X-Forwarded-For, que DRF usa para los throttles.
+"""
+
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from keyhours_backend.management.commands.loadtest_convocatoria import http_request, percentile
+from users import hashers
+from users.models import User
+
+
+USERNAME_PREFIX = 'loginbench_'
+ATTACKER_IP = '203.0.113.66'
+
+
+class Command(BaseCommand):
+    help = 'Mide el costo de los hashers y el throughput de /api/auth/login/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='URL del servidor a probar')
+        parser.add_argument('--students', type=int, default=200, help='Estudiantes que inician sesión')
+        parser.add_argument('--concurrency', type=int, default=50, help='Peticiones simultáneas como máximo')
+        parser.add_argument('--password', default='keyhours123', help='Contraseña de los estudiantes sembrados')
+        parser.add_argument('--seed-profile', choices=sorted(hashers.HASHERS), default='pbkdf2',
+                            help='Perfil de los hashes sembrados (los distintos al preferido se actualizan al entrar)')
+        parser.add_argument('--attempts', type=int, default=200,
+                            help='Intentos fallidos del atacante en la fase mezclada')
+        parser.add_argument('--budget-ms', type=float, default=None,
+                            help='Presupuesto por hash para calibrar los parámetros de cada perfil')
+        parser.add_argument('--hashers-only', action='store_true', help='Solo medir los hashers, sin servidor')
+        parser.add_argument('--keep', action='store_true', help='No borrar los estudiantes sembrados al terminar')
+
+    def handle(self, *args, **options):
+        self.measure_hashers(options['budget_ms'])
+        if options['hashers_only']:
+            return
+
+        url = urlsplit(options['base_url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Solo se soportan URLs http://host[:puerto]')
+
+        usernames = self.seed(options)
+        self.stdout.write(f"\nSembrados {len(usernames)} estudiantes con hashes {options['seed_profile']}")
+        try:
+            preferred = get_hasher().algorithm
+            for label, attack in [
+                ('Primer login (rehash)', False),
+                ('Login con hash actualizado', False),
+                ('Login durante un ataque', True),
+            ]:
+                started = time.perf_counter()
+                results = asyncio.run(self.run_burst(url.hostname, url.port or 80, usernames, options, attack))
+                self.report(label, results, time.perf_counter() - started)
+
+            upgraded = sum(
+                1 for password in User.objects.filter(username__in=usernames).values_list('password', flat=True)
+                if identify_hasher(password).algorithm == preferred
+            )
+            self.stdout.write(f'\nHashes con el perfil preferido ({preferred}): {upgraded}/{len(usernames)}')
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def measure_hashers(self, budget_ms):
+        """Milisegundos por hash de cada perfil con los parámetros configurados"""
+        profile = getattr(settings, 'PASSWORD_HASH_PROFILE', None)
+        self.stdout.write(f'{"perfil":<10}{"ms/hash":>10}{"hash/s/core":>13}  parámetros')
+        for name, hasher_class in hashers.HASHERS.items():
+            try:
+                hasher = hasher_class()
+                elapsed = hashers.measure(hasher)
+            except ValueError as e:
+                # Argon2 sin argon2-cffi instalado
+                self.stdout.write(f'{name:<10}{"-":>10}{"-":>13}  {e}')
+                continue
+            params = getattr(settings, 'PASSWORD_HASH_PARAMS', {}).get(name, {})
+            marker = ' (preferido)' if name == profile else ''
+            self.stdout.write(f'{name:<10}{elapsed:>10.1f}{1000 / elapsed:>13.1f}  {params}{marker}')
+
+            if budget_ms:
+                tuned, tuned_ms = hashers.calibrate(name, budget_ms)
+                self.stdout.write(f'{"":<10}{tuned_ms:>10.1f}{1000 / tuned_ms:>13.1f}  {tuned} (≤ {budget_ms:g} ms)')
+
+    def seed(self, options):
+        """Crea los estudiantes con un mismo hash del perfil sembrado (calcularlo uno por uno tomaría minutos)"""
+        self.cleanup()
+        algorithm = hashers.HASHERS[options['seed_profile']]().algorithm
+        password = make_password(options['password'], hasher=algorithm)
+        User.objects.bulk_create([
+            User(
+                username=f'{USERNAME_PREFIX}{i:05d}',
+                carnet=f'LB{i:06d}',
+                first_name='Login',
+                last_name=f'{i:05d}',
+                user_type='student',
+                password=password,
+            )
+            for i in range(options['students'])
+        ], batch_size=1000)
+        return [f'{USERNAME_PREFIX}{i:05d}' for i in range(options['students'])]
+
+    async def run_burst(self, host, port, usernames, options, attack):
+        """Un login por estudiante y, con `attack`, los intentos fallidos del atacante"""
+        results = {'estudiantes': [], 'atacante': []}
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def login(group, username, password, ip):
+            async with semaphore:
+                begin = time.perf_counter()
+                try:
+                    status_code, _ = await http_request(
+                        host, port, 'POST', '/api/auth/login/',
+                        payload={'username': username, 'password': password},
+                        extra_headers={'X-Forwarded-For': ip}
+                    )
+                except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                    status_code = None
+                results[group].append((status_code, time.perf_counter() - begin))
+
+        requests = [
+            login('estudiantes', username, options['password'], f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}')
+            for i, username in enumerate(usernames)
+        ]
+        if attack:
+            rng = random.Random(42)
+            requests += [
+                login('atacante', rng.choice(usernames), f'intento-{i}', ATTACKER_IP)
+                for i in range(options['attempts'])
+            ]
+            rng.shuffle(requests)
+        await asyncio.gather(*requests)
+        return results
+
+    def report(self, label, results, elapsed):
+        """Throughput, latencias y códigos de respuesta por grupo"""
+        total = sum(len(samples) for samples in results.values())
+        self.stdout.write(f'\n{label}: {total} peticiones en {elapsed:.2f}s ({total / elapsed:.1f} req/s)')
+        for group, samples in results.items():
+            if not samples:
+                continue
+            latencies = sorted(latency * 1000 for _, latency in samples)
+            codes = {}
+            for code, _ in samples:
+                codes[code] = codes.get(code, 0) + 1
+            self.stdout.write(
+                f'  {group:<12}{len(samples):>6}  p50 {percentile(latencies, 50):.1f} ms'
+                f'  p95 {percentile(latencies, 95):.1f} ms  {json.dumps(codes)}'
+            )
+
+    def cleanup(self):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
@@ -0,0 +1,319 @@
+"""
+Comando de gestión que verifica el presupuesto de consultas de cada endpoint
+Ejecutar con: python manage.py check_query_budget
+
+Siembra un conjunto de datos dentro de una transacción (que se revierte al
+final), hace GET a cada URL de keyhours_backend/urls.py como administrador y
+como estudiante, agrega más datos y repite. Un endpoint falla si supera su
+presupuesto de consultas o si sus consultas crecen con la cantidad de filas
+(un patrón N+1); en ese caso se muestra el SQL repetido. Termina con error si
+algún endpoint falla, por lo que sirve como verificación en CI.
+"""
+
+import logging
+import re
+from collections import Counter
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import Scholarship, User, UserScholarship
+from projects.models import Project, ProjectCategory, ProjectDocument, ProjectRequirement
+from applications.models import Application, ApplicationEvaluation, ApplicationNotification
+from hours.models import HourGoal, HourLog, HourSummary
+
+
+DEFAULT_BUDGET = 10
+
+# Presupuestos específicos por nombre de URL (los endpoints de reportes agregan varias cifras)
+BUDGETS = {
+    'user-dashboard': 15,
+    'project-dashboard': 15,
+    'hour-dashboard': 15,
+    'hour-stats': 15,
+    'monthly-hour-report': 15,
+    'yearly-hour-report': 15,
+}
+
+# Endpoints que no se pueden medir con un GET simple
+SKIPPED = {
+    'application-notification-stream',  # stream SSE, no termina
+    'user-logout',
+}
+
+# Respuestas 4xx esperadas además del 403 de estudiante en endpoints de administración;
+# cualquier otro 4xx o 5xx es una falla (la medición no habría probado nada)
+EXPECTED_STATUSES = {
+    ('hour-goal-detail', 'admin'): 404,  # las metas ajenas se piden con ?user_id=
+}
+
+# Valores por defecto para los parámetros de URL por nombre de parámetro
+PARAMETER_FIXTURES = {
+    'project_id': 'project',
+    'user_id': 'student',
+    'student_id': 'student',
+    'application_id': 'application',
+    'notification_id': 'notification',
+}
+
+# Objeto usado para `pk` según el nombre de la URL
+PK_FIXTURES = {
+    'student-detail': 'student',
+    'scholarship-detail': 'scholarship',
+    'user-scholarship-detail': 'user_scholarship',
+    'project-detail': 'project',
+    'project-category-detail': 'category',
+    'project-requirement-detail': 'requirement',
+    'project-document-detail': 'document',
+    'hour-log-detail': 'hour_log',
+    'hour-log-review': 'hour_log',
+    'hour-goal-detail': 'hour_goal',
+    'application-detail': 'application',
+}
+
+
+class Command(BaseCommand):
+    help = 'Verifica que ningún endpoint exceda su presupuesto de consultas ni crezca con los datos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=6,
+                            help='Lotes de datos (iguales al inicial) presentes en la segunda medición')
+        parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET,
+                            help='Presupuesto por defecto de consultas por request')
+        parser.add_argument('--only', help='Medir solo las URLs cuyo nombre contenga este texto')
+
+    def handle(self, *args, **options):
+        failures = []
+
+        with transaction.atomic():
+            fixtures = self.seed(batch=0)
+            endpoints = list(self.endpoints(fixtures, options['only']))
+            first = self.measure(endpoints, fixtures)
+
+            for batch in range(1, options['scale']):
+                self.seed(batch=batch)
+            second = self.measure(endpoints, fixtures)
+
+            transaction.set_rollback(True)
+
+        for key, (status_code, queries) in second.items():
+            name, role = key
+            before = len(first[key][1])
+            after = len(queries)
+            budget = BUDGETS.get(name, options['budget'])
+            problems = []
+            if not self.expected_status(name, role, status_code):
+                problems.append(f'respuesta inesperada {status_code}')
+            if after > budget:
+                problems.append(f'{after} consultas > presupuesto {budget}')
+            if after > before:
+                problems.append(f'crece con los datos ({before} -> {after})')
+
+            line = f'{name:40} {role:8} {status_code}  {before:3} -> {after:3}  (máx {budget})'
+            if problems:
+                failures.append((name, role, problems, queries))
+                self.stdout.write(self.style.ERROR(f'✗ {line}  {"; ".join(problems)}'))
+            else:
+                self.stdout.write(f'✓ {line}')
+
+        for name, role, problems, queries in failures:
+            self.stdout.write(self.style.ERROR(f'\n{name} ({role}): {"; ".join(problems)}'))
+            for sql, count in Counter(normalize_sql(q['sql']) for q in queries).most_common():
+                marker = f'{count}x' if count > 1 else '  '
+                self.stdout.write(f'  {marker:>5} {sql[:300]}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} mediciones fuera del presupuesto o con respuesta inesperada')
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(second)} mediciones dentro del presupuesto'))
+
+    def expected_status(self, name, role, status_code):
+        if status_code < 400:
+            return True
+        if role == 'student' and status_code == 403:
+            return True
+        return EXPECTED_STATUSES.get((name, role)) == status_code
+
+    def endpoints(self, fixtures, only=None):
+        """Recorre las URLs del proyecto (sin el admin de Django) resolviendo sus parámetros"""
+        def walk(patterns):
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver):
+                    if pattern.app_name == 'admin':
+                        continue
+                    yield from walk(pattern.url_patterns)
+                elif isinstance(pattern, URLPattern) and pattern.name:
+                    yield pattern
+
+        seen = set()
+        for pattern in walk(get_resolver().url_patterns):
+            name = pattern.name
+            if name in SKIPPED or name in seen or (only and only not in name):
+                continue
+            seen.add(name)
+
+            kwargs = {}
+            for parameter in pattern.pattern.converters:
+                if parameter == 'pk':
+                    kwargs[parameter] = fixtures[PK_FIXTURES[name]].pk
+                elif parameter == 'year':
+                    kwargs[parameter] = fixtures['today'].year
+                elif parameter == 'month':
+                    kwargs[parameter] = fixtures['today'].month
+                else:
+                    kwargs[parameter] = fixtures[PARAMETER_FIXTURES[parameter]].pk
+            yield name, reverse(name, kwargs=kwargs)
+
+    def measure(self, endpoints, fixtures):
+        results = {}
+        # Los 4xx (405, 403 de estudiante) se evalúan aparte y no deben ensuciar la salida
+        request_logger = logging.getLogger('django.request')
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            # APIClient envía Host: testserver; sin esto cada request sería un 400 sin consultas
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for role in ('admin', 'student'):
+                    client = APIClient(raise_request_exception=False)
+                    client.force_authenticate(fixtures[role])
+                    for name, url in endpoints:
+                        cache.clear()
+                        with CaptureQueriesContext(connection) as context:
+                            response = client.get(url)
+                        if response.status_code == 405:
+                            continue
+                        results[(name, role)] = (response.status_code, context.captured_queries)
+        finally:
+            request_logger.setLevel(previous_level)
+        return results
+
+    def seed(self, batch):
+        """
+        Crea un lote de datos realista: administradores, estudiantes, proyectos con
+        miembros, categorías, requisitos y documentos, aplicaciones en varios estados,
+        evaluaciones, notificaciones, horas, resúmenes, metas y becas.
+        """
+        today = timezone.now().date()
+        now = timezone.now()
+        prefix = f'qb{batch}'
+
+        admins = User.objects.bulk_create([
+            User(username=f'{prefix}admin{i}', carnet=f'QB{batch}A{i}', user_type='admin',
+                 first_name='Admin', last_name=str(i), email=f'{prefix}admin{i}@example.com')
+            for i in range(2)
+        ])
+        students = User.objects.bulk_create([
+            User(username=f'{prefix}student{i}', carnet=f'QB{batch}S{i}', user_type='student',
+                 first_name='Estudiante', last_name=str(i), email=f'{prefix}student{i}@example.com')
+            for i in range(5)
+        ])
+
+        categories = ProjectCategory.objects.bulk_create([
+            ProjectCategory(name=f'{prefix} categoría {i}', description='Categoría de prueba')
+            for i in range(2)
+        ])
+        projects = Project.objects.bulk_create([
+            Project(
+                name=f'{prefix} proyecto {i}', description='Proyecto de prueba', manager=admins[i % 2],
+                max_hours=100, visibility=['convocatoria', 'published'][i % 2],
+                start_date=now - timedelta(days=30), end_date=now + timedelta(days=90),
+                max_participants=10
+            )
+            for i in range(3)
+        ])
+        requirements = ProjectRequirement.objects.bulk_create([
+            ProjectRequirement(project=project, title=f'Requisito {i}', description='Requisito de prueba')
+            for project in projects for i in range(2)
+        ])
+        documents = ProjectDocument.objects.bulk_create([
+            ProjectDocument(project=project, title='Documento', file='project_documents/prueba.pdf',
+                            description='Documento de prueba')
+            for project in projects
+        ])
+
+        statuses = ['approved', 'pending', 'rejected', 'completed']
+        applications = Application.objects.bulk_create([
+            Application(
+                user=student, project=projects[(i + j) % len(projects)], motivation='Motivación',
+                start_date_preference=today, status=statuses[(i + j) % len(statuses)],
+                reviewed_by=admins[0]
+            )
+            for i, student in enumerate(students) for j in range(2)
+        ])
+        Project.members.through.objects.bulk_create([
+            Project.members.through(project_id=application.project_id, user_id=application.user_id)
+            for application in applications if application.status in ('approved', 'completed')
+        ])
+        for project in projects:
+            project.current_participants = project.members.count()
+        Project.objects.bulk_update(projects, ['current_participants'])
+
+        ApplicationEvaluation.objects.bulk_create([
+            ApplicationEvaluation(application=application, evaluator=admin, score=7,
+                                  comments='Evaluación', recommendation='approve')
+            for application in applications for admin in admins
+        ])
+        notifications = ApplicationNotification.objects.bulk_create([
+            ApplicationNotification(application=application, recipient=application.user,
+                                    notification_type='application_approved', title='Aplicación',
+                                    message='Notificación de prueba')
+            for application in applications
+        ])
+
+        hour_logs = HourLog.objects.bulk_create([
+            HourLog(
+                user=application.user, project=application.project, application=application,
+                hours=Decimal('2.5'), date=today - timedelta(days=k), start_time=time(9), end_time=time(11, 30),
+                activity_description='Actividad', supervisor_name='Supervisor',
+                status=['approved', 'pending'][k % 2], reviewed_by=admins[0]
+            )
+            for application in applications for k in range(3)
+        ])
+        HourSummary.objects.bulk_create([
+            HourSummary(user=student, year=today.year, month=month, total_hours=10, approved_hours=5)
+            for student in students for month in range(1, 4)
+        ], ignore_conflicts=True)
+        hour_goals = HourGoal.objects.bulk_create([
+            HourGoal(user=student, goal_type='annual', target_hours=100,
+                     start_date=today - timedelta(days=30), end_date=today + timedelta(days=300))
+            for student in students
+        ])
+
+        scholarships = Scholarship.objects.bulk_create([
+            Scholarship(name=f'{prefix} beca', scholarship_type='excellence', description='Beca', required_hours=100)
+        ])
+        user_scholarships = UserScholarship.objects.bulk_create([
+            UserScholarship(user=student, scholarship=scholarships[0], start_date=today - timedelta(days=30),
+                            end_date=today + timedelta(days=335))
+            for student in students
+        ])
+
+        return {
+            'today': today,
+            'admin': admins[0],
+            'student': students[0],
+            'category': categories[0],
+            'project': projects[0],
+            'requirement': requirements[0],
+            'document': documents[0],
+            'application': applications[0],
+            'notification': notifications[0],
+            'hour_log': hour_logs[0],
+            'hour_goal': hour_goals[0],
+            'scholarship': scholarships[0],
+            'user_scholarship': user_scholarships[0],
+        }
+
+
+def normalize_sql(sql):
+    """Reemplaza literales por ? para agrupar las consultas repetidas"""
+    sql = re.sub(r"'[^']*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    return re.sub(r'\(\?(, \?)+\)', '(...)', sql)
@@ -0,0 +1,367 @@
+"""
+Comando de gestión para generar un conjunto de datos sintético a escala
+Ejecutar con: python manage.py generate_dataset --scale 0.05 --seed 42
+
+A escala 1 genera 20.000 estudiantes, 500 proyectos, 200.000 aplicaciones y
+5.000.000 registros de horas (más administradores, evaluaciones y becas), como
+base compartida para los benchmarks. A diferencia de add_jose_data inserta con
+bulk_create en lotes grandes y calcula el hash de la contraseña una sola vez.
+Con la misma semilla y escala el resultado es siempre el mismo.
+
+Todos los usuarios generados tienen username con prefijo `gen_` y la
+contraseña indicada en --password; --flush borra los datos generados antes.
+"""
+
+import itertools
+import math
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users import search
+from users.scholarships import recompute as recompute_scholarships
+from users.models import Scholarship, User, UserScholarship
+from projects import membership
+from projects.models import Project, ProjectCategory
+from applications import evaluations
+from applications.models import Application, ApplicationEvaluation
+from hours.models import HourLog
+
+
+PREFIX = 'gen_'
+
+# Tamaños a escala 1
+STUDENTS = 20_000
+ADMINS = 50
+PROJECTS = 500
+APPLICATIONS = 200_000
+HOUR_LOGS = 5_000_000
+
+BATCH_SIZE = 5000
+
+ACTIVITIES = [
+    'Tutoría a estudiantes de primer ingreso',
+    'Apoyo en laboratorio',
+    'Preparación de material didáctico',
+    'Organización de evento institucional',
+    'Atención en biblioteca',
+    'Voluntariado comunitario',
+    'Asistencia en investigación',
+]
+
+FIRST_NAMES = ['Ana', 'Luis', 'María', 'José', 'Sofía', 'Carlos', 'Lucía', 'Diego', 'Valeria', 'Andrés',
+               'Camila', 'Jorge', 'Daniela', 'Pablo', 'Gabriela', 'Marco', 'Fernanda', 'David', 'Paula', 'Elena']
+LAST_NAMES = ['Romero', 'García', 'López', 'Martínez', 'Hernández', 'Pérez', 'González', 'Rodríguez',
+              'Sánchez', 'Ramírez', 'Torres', 'Flores', 'Rivera', 'Gómez', 'Díaz', 'Morales', 'Castillo']
+
+
+class Command(BaseCommand):
+    help = 'Genera un conjunto de datos sintético reproducible para benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.05,
+                            help='Factor de escala (1 = 20k estudiantes, 500 proyectos, 200k aplicaciones, 5M horas)')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla para reproducir el mismo conjunto')
+        parser.add_argument('--password', default='keyhours123', help='Contraseña de todos los usuarios generados')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Filas por INSERT')
+        parser.add_argument('--flush', action='store_true', help='Borrar los datos generados anteriormente')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        scale = options['scale']
+
+        if options['flush']:
+            self.step('Borrando datos generados', self.flush)
+        elif User.objects.filter(username__startswith=PREFIX).exists():
+            self.stdout.write(self.style.ERROR('❌ Ya existen datos generados; use --flush para regenerarlos'))
+            return
+
+        sizes = {
+            'students': max(int(STUDENTS * scale), 1),
+            'admins': max(int(ADMINS * scale), 1),
+            'projects': max(int(PROJECTS * scale), 1),
+            'applications': max(int(APPLICATIONS * scale), 1),
+            'hour_logs': int(HOUR_LOGS * scale),
+        }
+        password = make_password(options['password'])
+
+        started = perf_counter()
+        admin_ids, student_ids = self.step('Usuarios', self.create_users, sizes, password)
+        projects = self.step('Proyectos', self.create_projects, sizes['projects'], admin_ids)
+        applications = self.step('Aplicaciones', self.create_applications, sizes['applications'], student_ids, projects, admin_ids)
+        self.step('Evaluaciones', self.create_evaluations, applications, admin_ids)
+        self.step('Registros de horas', self.create_hour_logs, sizes['hour_logs'], applications, projects, admin_ids)
+        self.step('Becas', self.create_scholarships, student_ids)
+        self.step('Índice de búsqueda', search.rebuild)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Conjunto generado en {perf_counter() - started:.1f}s '
+            f'(escala {scale}, semilla {options["seed"]})'
+        ))
+
+    def step(self, label, function, *args):
+        started = perf_counter()
+        with transaction.atomic():
+            result = function(*args)
+        self.stdout.write(f'{label}: {perf_counter() - started:.1f}s')
+        return result
+
+    def flush(self):
+        generated = User.objects.filter(username__startswith=PREFIX)
+        HourLog.objects.filter(user__in=generated).delete()
+        Project.objects.filter(manager__in=generated).delete()
+        generated.delete()
+        Scholarship.objects.filter(name__startswith=PREFIX).delete()
+
+    def create_users(self, sizes, password):
+        rng = self.rng
+
+        def user(index, user_type, carnet):
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = rng.choice(LAST_NAMES)
+            return User(
+                username=f'{PREFIX}{user_type}{index:06d}',
+                password=password,
+                first_name=first_name,
+                last_name=f'{last_name} {rng.choice(LAST_NAMES)}',
+                email=f'{PREFIX}{user_type}{index:06d}@example.com',
+                user_type=user_type,
+                carnet=carnet,
+                scholarship_type='KEY EXCELLENCE',
+            )
+
+        admins = [user(i, 'admin', f'GENA{i:06d}') for i in range(sizes['admins'])]
+        User.objects.bulk_create(admins, batch_size=self.batch_size)
+
+        for start in range(0, sizes['students'], self.batch_size):
+            stop = min(start + self.batch_size, sizes['students'])
+            User.objects.bulk_create([user(i, 'student', f'GEN{2020 + i % 6}{i:06d}') for i in range(start, stop)])
+
+        generated = User.objects.filter(username__startswith=PREFIX).order_by('id')
+        return (
+            list(generated.filter(user_type='admin').values_list('id', flat=True)),
+            list(generated.filter(user_type='student').values_list('id', flat=True)),
+        )
+
+    def create_projects(self, count, admin_ids):
+        rng = self.rng
+        categories = ['Docencia', 'Investigación', 'Comunidad', 'Laboratorios', 'Eventos']
+        ProjectCategory.objects.bulk_create(
+            [ProjectCategory(name=f'{PREFIX}{name}', description=f'Proyectos de {name.lower()}') for name in categories],
+            ignore_conflicts=True
+        )
+
+        rows = []
+        for i in range(count):
+            # Proyectos repartidos en los últimos dos años; la mayoría de semestre
+            start = self.now - timedelta(days=rng.randint(0, 730))
+            duration = rng.choice([120, 120, 120, 180, 365])
+            rows.append(Project(
+                name=f'{PREFIX}{rng.choice(ACTIVITIES)} {i:04d}',
+                description='Proyecto generado para pruebas de rendimiento',
+                manager_id=rng.choice(admin_ids),
+                max_hours=rng.choice([20, 40, 50, 80, 100, 150]),
+                hour_assignment=rng.choice(['automatic', 'manual']),
+                visibility=rng.choices(['unpublished', 'convocatoria', 'published'], weights=[1, 3, 6])[0],
+                start_date=start,
+                end_date=start + timedelta(days=duration),
+                # Cupos con cola larga: muchos proyectos pequeños, pocos grandes
+                max_participants=min(int(rng.paretovariate(1.5) * 8), 200),
+                is_active=rng.random() > 0.05,
+            ))
+        Project.objects.bulk_create(rows, batch_size=self.batch_size)
+
+        return list(Project.objects.filter(name__startswith=PREFIX).order_by('id').values(
+            'id', 'max_participants', 'max_hours', 'start_date', 'end_date'
+        ))
+
+    def create_applications(self, count, student_ids, projects, admin_ids):
+        """
+        Aplicaciones con popularidad tipo Zipf por proyecto y estados coherentes
+        con los cupos: solo se aprueban mientras el proyecto tenga plazas.
+        """
+        rng = self.rng
+        popularity = [1 / (rank + 1) ** 0.8 for rank in range(len(projects))]
+        rng.shuffle(popularity)
+        cumulative = list(itertools.accumulate(popularity))
+        indexes = range(len(projects))
+        per_student = max(min(math.ceil(count / len(student_ids)), len(projects)), 1)
+
+        seats = {project['id']: project['max_participants'] for project in projects}
+        rows = []
+        pairs = set()
+        for student_id in student_ids:
+            if len(rows) >= count:
+                break
+            wanted = min(rng.randint(1, per_student * 2 - 1), len(projects), count - len(rows))
+            chosen = set()
+            while len(chosen) < wanted:
+                chosen.add(rng.choices(indexes, cum_weights=cumulative)[0])
+
+            for index in sorted(chosen):
+                project = projects[index]
+                status = rng.choices(
+                    ['pending', 'approved', 'in_progress', 'completed', 'rejected', 'cancelled'],
+                    weights=[30, 20, 15, 15, 15, 5]
+                )[0]
+                if status in ('approved', 'in_progress', 'completed'):
+                    if seats[project['id']] > 0:
+                        seats[project['id']] -= 1
+                    else:
+                        status = 'rejected'
+                reviewed = status != 'pending'
+                rows.append(Application(
+                    user_id=student_id,
+                    project_id=project['id'],
+                    status=status,
+                    motivation='Quiero aportar al proyecto y completar mis horas de beca',
+                    available_hours_per_week=rng.choice([2, 4, 5, 6, 8, 10, 12, 15, 20]),
+                    start_date_preference=(project['start_date'] + timedelta(days=rng.randint(-15, 30))).date(),
+                    reviewed_by_id=rng.choice(admin_ids) if reviewed else None,
+                    reviewed_at=project['start_date'] if reviewed else None,
+                    hours_completed=project['max_hours'] if status == 'completed' else 0,
+                    completion_date=project['end_date'] if status == 'completed' else None,
+                ))
+                if status in ('approved', 'in_progress', 'completed'):
+                    pairs.add((project['id'], student_id))
+
+            if len(rows) >= self.batch_size:
+                Application.objects.bulk_create(rows)
+                rows = []
+        Application.objects.bulk_create(rows, batch_size=self.batch_size)
+
+        membership.add_memberships(pairs)
+
+        return list(Application.objects.filter(
+            user__username__startswith=PREFIX
+        ).order_by('id').values('id', 'user_id', 'project_id', 'status'))
+
+    def create_evaluations(self, applications, admin_ids):
+        rng = self.rng
+        rows = []
+        for application in applications:
+            if rng.random() > 0.5:
+                continue
+            for evaluator_id in rng.sample(admin_ids, min(len(admin_ids), rng.randint(1, 3))):
+                score = max(1, min(10, round(rng.gauss(6.5, 1.8))))
+                rows.append(ApplicationEvaluation(
+                    application_id=application['id'],
+                    evaluator_id=evaluator_id,
+                    score=score,
+                    comments='Evaluación generada',
+                    recommendation='approve' if score >= 7 else rng.choice(['interview', 'reject']),
+                ))
+            if len(rows) >= self.batch_size:
+                ApplicationEvaluation.objects.bulk_create(rows)
+                rows = []
+        ApplicationEvaluation.objects.bulk_create(rows)
+
+        evaluations.refresh_summaries()
+
+    def create_hour_logs(self, count, applications, projects, admin_ids):
+        """
+        Registros repartidos entre las aplicaciones activas o completadas, con
+        fechas dentro del periodo del proyecto y la mayoría ya aprobados.
+
+        Es la tabla más grande (5M filas a escala 1), así que se inserta con
+        executemany sin instanciar modelos: compilar el INSERT de bulk_create
+        por cada fila domina el tiempo. Los valores se adaptan una vez por valor
+        distinto (fechas, horas, duraciones) en lugar de una vez por fila.
+        """
+        rng = self.rng
+        active = [a for a in applications if a['status'] in ('approved', 'in_progress', 'completed')]
+        if not active or not count:
+            return
+
+        ops = connection.ops
+        periods = {}
+        for project in projects:
+            first_day = project['start_date'].date()
+            last_day = min(project['end_date'], self.now).date()
+            periods[project['id']] = (first_day, max((last_day - first_day).days, 0))
+
+        adapted_dates = {}
+        durations = [(ops.adapt_decimalfield_value(Decimal(str(hours)), 5, 2), hours)
+                     for hours in (1, 1.5, 2, 2, 3, 4)]
+        shifts = {
+            (begin, hours): (ops.adapt_timefield_value(time(begin, 0)),
+                             ops.adapt_timefield_value((datetime(2000, 1, 1, begin) + timedelta(hours=hours)).time()))
+            for begin in range(7, 17) for _, hours in durations
+        }
+        now = ops.adapt_datetimefield_value(self.now)
+
+        fields = [
+            'user_id', 'project_id', 'application_id', 'hours', 'date', 'start_time', 'end_time',
+            'activity_description', 'skills_developed', 'impact_description', 'supervisor_name',
+            'supervisor_contact', 'status', 'reviewed_by_id', 'review_notes', 'reviewed_at',
+            'created_at', 'updated_at',
+        ]
+        rows = []
+        for i in range(count):
+            application = active[i] if i < len(active) else rng.choice(active)
+            first_day, span = periods[application['project_id']]
+            offset = rng.randint(0, span)
+            key = (first_day, offset)
+            if key not in adapted_dates:
+                adapted_dates[key] = ops.adapt_datefield_value(first_day + timedelta(days=offset))
+            hours, raw_hours = rng.choice(durations)
+            start_time, end_time = shifts[(rng.randint(7, 16), raw_hours)]
+            status = rng.choices(['approved', 'pending', 'rejected'], weights=[85, 10, 5])[0]
+            reviewed = status != 'pending'
+            rows.append((
+                application['user_id'], application['project_id'], application['id'],
+                hours, adapted_dates[key], start_time, end_time,
+                rng.choice(ACTIVITIES), '', '', 'Supervisor del Proyecto', '',
+                status, rng.choice(admin_ids) if reviewed else None, '', now if reviewed else None,
+                now, now,
+            ))
+            if len(rows) >= self.batch_size:
+                insert_rows(HourLog, fields, rows)
+                rows = []
+        insert_rows(HourLog, fields, rows)
+
+    def create_scholarships(self, student_ids):
+        Scholarship.objects.bulk_create([
+            Scholarship(name=f'{PREFIX}KEY EXCELLENCE', scholarship_type='excellence',
+                        description='Beca de excelencia', required_hours=100, duration_years=4),
+            Scholarship(name=f'{PREFIX}MERIT', scholarship_type='merit',
+                        description='Beca por mérito', required_hours=60, duration_years=4),
+            Scholarship(name=f'{PREFIX}NECESIDAD', scholarship_type='need',
+                        description='Beca por necesidad', required_hours=40, duration_years=4),
+        ])
+        scholarships = list(Scholarship.objects.filter(name__startswith=PREFIX).order_by('id'))
+
+        today = self.now.date()
+        rows = []
+        for student_id in student_ids:
+            start = today - timedelta(days=self.rng.randint(0, 3 * 365))
+            rows.append(UserScholarship(
+                user_id=student_id,
+                scholarship=self.rng.choices(scholarships, weights=[6, 3, 1])[0],
+                start_date=start,
+                end_date=start + timedelta(days=4 * 365),
+            ))
+        UserScholarship.objects.bulk_create(rows, batch_size=self.batch_size)
+        # bulk_create no pasa por UserScholarship.save: el progreso se calcula aparte
+        recompute_scholarships(batch_size=self.batch_size)
+
+
+def insert_rows(model, fields, rows):
+    """INSERT de tuplas ya adaptadas a la base de datos, en el orden de `fields`"""
+    if not rows:
+        return
+    columns = ', '.join(connection.ops.quote_name(model._meta.get_field(name).column) for name in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})',
+            rows
+        )
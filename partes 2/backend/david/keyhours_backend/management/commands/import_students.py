@@ -0,0 +1,67 @@
+"""
+Comando de gestión para dar de alta estudiantes en lote desde un CSV
+Ejecutar con: python manage.py import_students estudiantes.csv --output credenciales.csv
+
+Columnas: carnet (requerido), first_name, last_name, username, email, password,
+scholarship_type, scholarship_percentage. Con errores no crea nada, salvo que
+se use --skip-invalid. Las credenciales (carnet, username, contraseña temporal)
+se escriben en --output o en la salida estándar.
+"""
+
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users import onboarding
+
+
+class Command(BaseCommand):
+    help = 'Da de alta estudiantes en lote desde un archivo CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo CSV con encabezados')
+        parser.add_argument('--output', help='Archivo CSV donde escribir las credenciales generadas')
+        parser.add_argument('--dry-run', action='store_true', help='Validar sin crear usuarios')
+        parser.add_argument('--skip-invalid', action='store_true', help='Crear las filas válidas aunque otras tengan errores')
+        parser.add_argument('--workers', type=int, default=None, help='Procesos para calcular los hashes (por defecto ONBOARDING_HASH_WORKERS o los núcleos)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as file:
+                result = onboarding.import_students(
+                    file,
+                    dry_run=options['dry_run'],
+                    skip_invalid=options['skip_invalid'],
+                    workers=options['workers'] or onboarding.default_workers()
+                )
+        except (OSError, onboarding.OnboardingError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stdout.write(self.style.ERROR(f"Línea {error['line']} ({error['carnet']}): {error['error']}"))
+
+        if result['errors'] and not result['students']:
+            raise CommandError(f"{len(result['errors'])} fila(s) con errores; no se creó ningún estudiante")
+
+        if result['students']:
+            if options['output']:
+                with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                    self.write_credentials(output, result['students'])
+                self.stdout.write(f"Credenciales escritas en {options['output']}")
+            else:
+                self.write_credentials(sys.stdout, result['students'])
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(result['students'])} estudiantes válidos (sin crear)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {result['created']} estudiantes creados en {time.perf_counter() - started:.1f}s"
+            ))
+
+    def write_credentials(self, output, students):
+        writer = csv.DictWriter(output, fieldnames=['carnet', 'username', 'temp_password'])
+        writer.writeheader()
+        writer.writerows(students)
@@ -44,9 +44,11 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'django_filters',
     
     # Local apps
+    'keyhours_backend',
     'users',
     'projects',
     'hours',
@@ -114,6 +116,40 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# Perfil preferido: 'scrypt', 'argon2' (requiere argon2-cffi) o 'pbkdf2'. Los
+# hashes de otros perfiles se rehacen con el preferido en el siguiente login.
+# Calibrar los parámetros con: python manage.py benchmark_login --budget-ms 50
+
+PASSWORD_HASH_PROFILE = config('PASSWORD_HASH_PROFILE', default='scrypt')
+
+PASSWORD_HASH_PARAMS = {
+    'scrypt': {
+        'work_factor': config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int),
+        'block_size': config('SCRYPT_BLOCK_SIZE', default=8, cast=int),
+        'parallelism': config('SCRYPT_PARALLELISM', default=1, cast=int),
+    },
+    'argon2': {
+        'time_cost': config('ARGON2_TIME_COST', default=2, cast=int),
+        'memory_cost': config('ARGON2_MEMORY_COST', default=65536, cast=int),
+        'parallelism': config('ARGON2_PARALLELISM', default=2, cast=int),
+    },
+    'pbkdf2': {
+        'iterations': config('PBKDF2_ITERATIONS', default=1_000_000, cast=int),
+    },
+}
+
+PASSWORD_HASH_PROFILES = {
+    'scrypt': 'users.hashers.ProfileScryptPasswordHasher',
+    'argon2': 'users.hashers.ProfileArgon2PasswordHasher',
+    'pbkdf2': 'users.hashers.ProfilePBKDF2PasswordHasher',
+}
+
+PASSWORD_HASHERS = [PASSWORD_HASH_PROFILES[PASSWORD_HASH_PROFILE]] + [
+    path for profile, path in PASSWORD_HASH_PROFILES.items() if profile != PASSWORD_HASH_PROFILE
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -146,7 +182,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -157,6 +193,11 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    # Token buckets del login (users.throttling): capacidad/recarga por período
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('LOGIN_THROTTLE_IP', default='60/min'),
+        'login_username': config('LOGIN_THROTTLE_USERNAME', default='5/min'),
+    },
 }
 
 # JWT Configuration
@@ -179,6 +220,7 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
     'TOKEN_TYPE_CLAIM': 'token_type',
     'JTI_CLAIM': 'jti',
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
@@ -0,0 +1,19 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Corre check_query_budget dentro de la suite: falla si algún endpoint excede
+    su presupuesto, crece con los datos o responde con un código inesperado
+    """
+
+    def test_endpoints_within_budget(self):
+        output = StringIO()
+        try:
+            call_command('check_query_budget', scale=3, stdout=output)
+        except CommandError as e:
+            self.fail(f'{e}\n{output.getvalue()}')
+        self.assertIn('dentro del presupuesto', output.getvalue())
@@ -61,10 +61,11 @@ class UserScholarshipAdmin(admin.ModelAdmin):
     fieldsets = (
         ('Información Básica', {'fields': ('user', 'scholarship', 'status')}),
         ('Fechas', {'fields': ('start_date', 'end_date')}),
-        ('Progreso', {'fields': ('current_year_hours', 'total_hours_completed')}),
+        ('Progreso', {'fields': ('current_year_hours', 'total_hours_completed', 'academic_year')}),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    # Calculados desde las horas aprobadas (users.scholarships)
+    readonly_fields = ('current_year_hours', 'total_hours_completed', 'academic_year', 'created_at', 'updated_at')
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user', 'scholarship')
@@ -0,0 +1,99 @@
+"""
+Autenticación JWT sin consultar la tabla de usuarios en cada request.
+
+Los tokens emitidos con tokens_for_user llevan en sus claims user_type,
+is_active y token_version. ClaimsJWTAuthentication construye request.user
+(AuthenticatedUser) desde esos claims y solo compara token_version con la
+versión actual del usuario, guardada en el cache de Django; la base se consulta
+cuando la versión no está en cache y cuando la vista lee otros campos del usuario.
+
+Cambiar user_type o is_active (User.save) incrementa token_version y borra la
+versión del cache, así que los tokens emitidos antes dejan de aceptarse. Con un
+cache compartido (Redis, Memcached) el efecto es inmediato en todos los
+procesos; con el LocMemCache por defecto cada proceso conserva su copia hasta
+TOKEN_VERSION_CACHE_TTL segundos.
+
+Los tokens sin estos claims (emitidos antes de este cambio) se validan como en
+JWTAuthentication, cargando el usuario.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.base import DEFERRED
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .blacklist import RefreshToken
+from .models import AuthenticatedUser, User
+
+
+# Campos de User cuyo cambio invalida los tokens emitidos
+TOKEN_VERSION_FIELDS = frozenset(['user_type', 'is_active'])
+
+TOKEN_CLAIMS = ('user_type', 'is_active', 'token_version')
+
+TOKEN_VERSION_CACHE_TTL = getattr(settings, 'TOKEN_VERSION_CACHE_TTL', 60)
+
+
+def _cache_key(user_id):
+    return f'users:token-version:{user_id}'
+
+
+def tokens_for_user(user):
+    """RefreshToken con los claims de autorización; el access token derivado los hereda"""
+    refresh = RefreshToken.for_user(user)
+    for claim in TOKEN_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    return refresh
+
+
+def current_token_version(user_id):
+    """Versión vigente de los tokens del usuario (None si ya no existe)"""
+    version = cache.get(_cache_key(user_id))
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is not None:
+            cache.set(_cache_key(user_id), version, TOKEN_VERSION_CACHE_TTL)
+    return version
+
+
+def invalidate_token_version(user_id):
+    """Borra la versión cacheada al confirmar la transacción en curso"""
+    transaction.on_commit(lambda: cache.delete(_cache_key(user_id)))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que arma el usuario desde los claims del token
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in TOKEN_CLAIMS):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('El token no contiene identificación de usuario')
+
+        if not validated_token['is_active']:
+            raise AuthenticationFailed('Usuario inactivo', code='user_inactive')
+
+        if current_token_version(user_id) != validated_token['token_version']:
+            raise AuthenticationFailed(
+                'El token ya no es válido; inicia sesión de nuevo',
+                code='token_outdated'
+            )
+
+        claims = {
+            api_settings.USER_ID_FIELD: user_id,
+            **{claim: validated_token[claim] for claim in TOKEN_CLAIMS},
+        }
+        fields = AuthenticatedUser._meta.concrete_fields
+        return AuthenticatedUser.from_db(
+            User.objects.db,
+            [field.attname for field in fields],
+            [claims.get(field.attname, DEFERRED) for field in fields]
+        )
@@ -0,0 +1,176 @@
+"""
+Blacklist de refresh tokens con un filtro de Bloom en memoria.
+
+Con ROTATE_REFRESH_TOKENS y BLACKLIST_AFTER_ROTATION cada refresh agrega una
+fila a OutstandingToken y otra a BlacklistedToken. RefreshToken.check_blacklist
+consulta primero un filtro de Bloom con los jti en la blacklist: si el jti no
+está (el caso normal), no hace falta buscarlo en la tabla; si puede estar, se
+confirma con la consulta de simplejwt.
+
+El filtro se construye al primer uso en cada proceso. Los tokens que este
+proceso pone en la blacklist (rotación y logout) se agregan al filtro en el
+momento; lo que agregan otros procesos se lee como mucho cada SYNC_INTERVAL
+segundos, solo las filas nuevas de BlacklistedToken (un rango sobre la llave
+primaria). Entre dos lecturas no se consulta la base de datos: un token que
+otro proceso puso en la blacklist puede aceptarse aquí durante hasta
+SYNC_INTERVAL segundos (más lo que tarde en confirmarse su transacción). Los
+ids que quedan sin confirmar entre dos lecturas se vuelven a pedir durante
+GAP_TIMEOUT segundos, por si eran transacciones que aún no confirmaban.
+
+prune_expired borra en lotes los tokens vencidos: un token vencido ya no pasa
+la verificación, esté o no en la blacklist.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+
+BATCH_SIZE = 5000
+
+# Tasa de falsos positivos del filtro y capacidad mínima al construirlo
+ERROR_RATE = getattr(settings, 'TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.01)
+MIN_CAPACITY = 100_000
+
+# Segundos entre lecturas de las filas que agregaron otros procesos
+SYNC_INTERVAL = getattr(settings, 'TOKEN_BLACKLIST_SYNC_INTERVAL', 5)
+
+GAP_TIMEOUT = 60
+
+# Ids sin confirmar que se siguen como máximo por lectura
+MAX_GAPS = 500
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray con doble hashing (blake2b)"""
+
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BlacklistIndex:
+    """Filtro de los jti en BlacklistedToken, sincronizado por id"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filter = None
+        self.last_id = 0
+        self.gaps = {}
+        self.synced_at = 0
+
+    def rebuild(self):
+        """Carga todos los jti de la blacklist en un filtro nuevo"""
+        total = BlacklistedToken.objects.count()
+        bloom = BloomFilter(max(MIN_CAPACITY, 2 * total))
+        last_id = 0
+        rows = BlacklistedToken.objects.order_by('id').values_list('id', 'token__jti')
+        for row_id, jti in rows.iterator(chunk_size=BATCH_SIZE):
+            bloom.add(jti)
+            last_id = row_id
+        self.filter, self.last_id, self.gaps = bloom, last_id, {}
+
+    def sync(self):
+        """Agrega las filas nuevas y las de ids que faltaban en la lectura anterior"""
+        if self.filter is None or self.filter.count > self.filter.capacity:
+            self.rebuild()
+            return
+
+        now = time.monotonic()
+        self.gaps = {gap: seen for gap, seen in self.gaps.items() if now - seen < GAP_TIMEOUT}
+        condition = Q(id__gt=self.last_id)
+        if self.gaps:
+            condition |= Q(id__in=list(self.gaps))
+
+        rows = BlacklistedToken.objects.filter(condition).order_by('id').values_list('id', 'token__jti')
+        for row_id, jti in rows:
+            self.filter.add(jti)
+            self.gaps.pop(row_id, None)
+            if row_id > self.last_id:
+                self.gaps.update(dict.fromkeys(range(max(self.last_id + 1, row_id - MAX_GAPS), row_id), now))
+                self.last_id = row_id
+
+    def might_contain(self, jti):
+        if self.filter is None or time.monotonic() - self.synced_at >= SYNC_INTERVAL:
+            with self.lock:
+                # Otro hilo pudo sincronizar mientras se esperaba el lock
+                if self.filter is None or time.monotonic() - self.synced_at >= SYNC_INTERVAL:
+                    self.sync()
+                    self.synced_at = time.monotonic()
+        return jti in self.filter
+
+    def add(self, jti):
+        """Agrega un jti que este proceso acaba de poner en la blacklist"""
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(jti)
+
+    def reset(self):
+        with self.lock:
+            self.filter = None
+
+
+index = BlacklistIndex()
+
+
+class RefreshToken(BaseRefreshToken):
+    """RefreshToken de simplejwt que consulta el filtro antes que la tabla"""
+
+    def check_blacklist(self):
+        # Solo una posible coincidencia del filtro se confirma en la tabla
+        if index.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        index.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
+
+
+def prune_expired(batch_size=BATCH_SIZE, now=None):
+    """
+    Borra los tokens vencidos (y su fila de blacklist) en lotes de `batch_size`,
+    cada uno en su propia transacción. Retorna (outstanding, blacklisted) borrados.
+    """
+    now = now or timezone.now()
+    outstanding = blacklisted = 0
+    while True:
+        # Los vencidos son los más antiguos: recorrer por id los encuentra primero
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+            outstanding += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+
+    index.reset()
+    return outstanding, blacklisted
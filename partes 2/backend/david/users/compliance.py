@@ -0,0 +1,166 @@
+"""
+Reporte de cumplimiento de becas por año académico.
+
+Para cada UserScholarship activa en el año: horas aprobadas del año dentro de
+la vigencia de la beca contra Scholarship.required_hours, en una sola consulta
+agrupada sobre HourLog unido a UserScholarship y Scholarship. La proyección
+extrapola el ritmo de lo transcurrido al período del año en que la beca está
+vigente; quien queda por debajo de required_hours está en riesgo.
+
+El reporte se guarda en cache por año académico. Los cambios de horas
+aprobadas (users.scholarships) invalidan el año del registro; recompute y los
+cambios de becas invalidan todos los años. Los nombres de estudiantes pueden
+quedar desactualizados hasta COMPLIANCE_CACHE_TTL segundos.
+
+La invalidación solo llega a otros procesos con un cache compartido (Redis,
+Memcached, base de datos). Con el LocMemCache por defecto cada worker guarda su
+copia y la invalidación solo limpia la del proceso que aprobó las horas, así
+que el reporte se guarda como mucho LOCAL_CACHE_TTL segundos.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import DecimalField, F, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import scholarships
+from .models import UserScholarship
+
+
+REPORT_FIELDS = [
+    'user_scholarship_id', 'student_id', 'carnet', 'full_name', 'scholarship_id',
+    'scholarship_name', 'start_date', 'end_date', 'required_hours', 'approved_hours',
+    'progress_percentage', 'projected_hours', 'remaining_hours', 'weekly_hours_needed', 'at_risk',
+]
+
+COMPLIANCE_CACHE_TTL = getattr(settings, 'COMPLIANCE_CACHE_TTL', 3600)
+
+# Tope del TTL cuando el cache es por proceso
+LOCAL_CACHE_TTL = getattr(settings, 'COMPLIANCE_LOCAL_CACHE_TTL', 60)
+
+# Antes de estos días de vigencia transcurridos la proyección no es confiable
+MIN_ELAPSED_DAYS = 14
+
+VERSION_KEY = 'users:compliance:version'
+
+
+def _cache_key(year):
+    version = cache.get_or_set(VERSION_KEY, 1, None)
+    return f'users:compliance:{version}:{year}'
+
+
+def cache_ttl():
+    """Segundos que se guarda el reporte según el backend del cache por defecto"""
+    if isinstance(caches['default'], LocMemCache):
+        return min(COMPLIANCE_CACHE_TTL, LOCAL_CACHE_TTL)
+    return COMPLIANCE_CACHE_TTL
+
+
+def invalidate(year=None):
+    """Descarta el reporte cacheado de `year` (o de todos los años) al confirmar"""
+    def clear():
+        if year is None:
+            try:
+                cache.incr(VERSION_KEY)
+            except ValueError:
+                cache.set(VERSION_KEY, 1, None)
+        else:
+            cache.delete(_cache_key(year))
+    transaction.on_commit(clear)
+
+
+def _rows(year):
+    """Una fila por beca activa en el año, con las horas aprobadas agrupadas"""
+    start, end = scholarships.academic_year_bounds(year)
+    hours_field = DecimalField(max_digits=8, decimal_places=2)
+    return UserScholarship.objects.filter(
+        status='active', start_date__lt=end, end_date__gte=start
+    ).annotate(
+        # Solo se unen los registros que cuentan, no toda la historia del estudiante
+        year_logs=FilteredRelation('user__hour_logs', condition=Q(
+            user__hour_logs__status='approved',
+            user__hour_logs__date__gte=start,
+            user__hour_logs__date__lt=end,
+        ) & Q(
+            user__hour_logs__date__gte=F('start_date'),
+            user__hour_logs__date__lte=F('end_date'),
+        )),
+    ).values(
+        'id', 'user_id', 'user__carnet', 'user__first_name', 'user__last_name', 'user__username',
+        'scholarship_id', 'scholarship__name', 'scholarship__required_hours', 'start_date', 'end_date',
+    ).annotate(
+        approved_hours=Coalesce(Sum('year_logs__hours'), Value(Decimal('0')), output_field=hours_field),
+    ).order_by('user__last_name', 'user__first_name', 'id')
+
+
+def project(rows, year, today):
+    """
+    Agrega a cada fila la proyección al final de su período en el año, el
+    faltante, las horas por semana necesarias y si está en riesgo
+    """
+    start, end = scholarships.academic_year_bounds(year)
+    last_day = end - timedelta(days=1)
+    report = []
+    for row in rows:
+        window_start = max(start, row['start_date'])
+        window_end = min(last_day, row['end_date'])
+        total_days = (window_end - window_start).days + 1
+        elapsed_days = min(max((min(today, window_end) - window_start).days + 1, 0), total_days)
+
+        required = row['scholarship__required_hours']
+        approved = float(row['approved_hours'])
+        projected = None
+        if elapsed_days >= min(MIN_ELAPSED_DAYS, total_days):
+            projected = round(approved * total_days / elapsed_days, 2)
+        remaining = max(required - approved, 0)
+        weeks_left = (total_days - elapsed_days) / 7
+
+        report.append({
+            'user_scholarship_id': row['id'],
+            'student_id': row['user_id'],
+            'carnet': row['user__carnet'],
+            'full_name': f"{row['user__first_name']} {row['user__last_name']}".strip() or row['user__username'],
+            'scholarship_id': row['scholarship_id'],
+            'scholarship_name': row['scholarship__name'],
+            'start_date': row['start_date'],
+            'end_date': row['end_date'],
+            'required_hours': required,
+            'approved_hours': approved,
+            'progress_percentage': round(approved / required * 100, 1) if required else 100.0,
+            'projected_hours': projected,
+            'remaining_hours': remaining,
+            'weekly_hours_needed': round(remaining / weeks_left, 2) if remaining and weeks_left else None,
+            'at_risk': projected is not None and projected < required,
+        })
+    return report
+
+
+def compliance_report(year=None):
+    """
+    Reporte del año académico `year` (por defecto el actual):
+    {'academic_year', 'generated_at', 'summary', 'students'}
+    """
+    year = scholarships.current_academic_year() if year is None else year
+    key = _cache_key(year)
+    report = cache.get(key)
+    if report is None:
+        today = timezone.localdate()
+        students = project(_rows(year), year, today)
+        report = {
+            'academic_year': year,
+            'generated_at': timezone.now(),
+            'summary': {
+                'students': len(students),
+                'at_risk': sum(1 for student in students if student['at_risk']),
+                'completed': sum(1 for student in students if not student['remaining_hours']),
+            },
+            'students': students,
+        }
+        cache.set(key, report, cache_ttl())
+    return report
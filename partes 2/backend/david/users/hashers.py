@@ -0,0 +1,107 @@
+"""
+Perfiles de hashing de contraseñas.
+
+PASSWORD_HASH_PROFILE elige el hasher preferido ('scrypt', 'argon2' o
+'pbkdf2') entre PASSWORD_HASH_PROFILES y PASSWORD_HASH_PARAMS fija sus
+parámetros. Los demás hashers siguen en PASSWORD_HASHERS para verificar los
+hashes existentes: Django los rehace con el perfil preferido en el siguiente
+login exitoso (check_password), sin que los usuarios cambien su contraseña.
+
+Los parámetros se eligen para un presupuesto de latencia por login con
+`python manage.py benchmark_login --budget-ms 50`, que mide cada perfil en la
+máquina donde corre el servidor.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+from django.utils.crypto import get_random_string
+
+
+# Parámetro que calibrate() duplica hasta agotar el presupuesto, con su mínimo
+TUNED_PARAMS = {
+    'scrypt': ('work_factor', 2 ** 10),
+    'argon2': ('time_cost', 1),
+    'pbkdf2': ('iterations', 100_000),
+}
+
+
+class ProfileHasherMixin:
+    """Toma los parámetros de PASSWORD_HASH_PARAMS[profile] en lugar de los de clase"""
+
+    profile = None
+
+    def __init__(self, **params):
+        configured = getattr(settings, 'PASSWORD_HASH_PARAMS', {}).get(self.profile, {})
+        for name, value in {**configured, **params}.items():
+            if not hasattr(type(self), name):
+                raise ValueError(f'Parámetro desconocido para {self.profile}: {name}')
+            setattr(self, name, value)
+
+
+class ProfileScryptPasswordHasher(ProfileHasherMixin, ScryptPasswordHasher):
+    """
+    scrypt con parallelism=1 por defecto: Django usa 5, que en OpenSSL se
+    calcula en serie y multiplica el tiempo por cinco sin ganar memoria.
+    """
+
+    profile = 'scrypt'
+    parallelism = 1
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        # maxmem=0 deja el límite de OpenSSL (32 MB), insuficiente desde n=2**15
+        n = n or self.work_factor
+        r = r or self.block_size
+        self.maxmem = 2 * 128 * n * r + 1024 * 1024
+        return super().encode(password, salt, n, r, p)
+
+
+class ProfileArgon2PasswordHasher(ProfileHasherMixin, Argon2PasswordHasher):
+    """Argon2id; requiere argon2-cffi instalado"""
+
+    profile = 'argon2'
+
+
+class ProfilePBKDF2PasswordHasher(ProfileHasherMixin, PBKDF2PasswordHasher):
+    """PBKDF2-SHA256; mantiene el algoritmo 'pbkdf2_sha256' de los hashes existentes"""
+
+    profile = 'pbkdf2'
+
+
+HASHERS = {
+    hasher.profile: hasher
+    for hasher in (ProfileScryptPasswordHasher, ProfileArgon2PasswordHasher, ProfilePBKDF2PasswordHasher)
+}
+
+
+def measure(hasher, rounds=3):
+    """Milisegundos por hash (la mediana de `rounds` hashes)"""
+    salt = get_random_string(22)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.encode('benchmark-password', salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate(profile, budget_ms, rounds=3):
+    """
+    Parámetros del perfil con el mayor costo que cabe en `budget_ms`, duplicando
+    el parámetro de costo desde su mínimo. Retorna (parámetros, ms por hash).
+    """
+    hasher_class = HASHERS[profile]
+    name, value = TUNED_PARAMS[profile]
+
+    best = ({name: value}, measure(hasher_class(**{name: value}), rounds))
+    while True:
+        value *= 2
+        elapsed = measure(hasher_class(**{name: value}), rounds)
+        if elapsed > budget_ms:
+            return best
+        best = ({name: value}, elapsed)
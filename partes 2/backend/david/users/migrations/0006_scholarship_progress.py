@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:34
+
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def seed_progress(apps, schema_editor):
+    # Copia de users.scholarships.recompute para no depender del código actual
+    UserScholarship = apps.get_model('users', 'UserScholarship')
+    HourLog = apps.get_model('hours', 'HourLog')
+    start_month = getattr(settings, 'ACADEMIC_YEAR_START_MONTH', 1)
+    today = timezone.localdate()
+    year = today.year if today.month >= start_month else today.year - 1
+    hours_field = DecimalField(max_digits=8, decimal_places=2)
+
+    def approved(*filters):
+        logs = HourLog.objects.filter(
+            *filters,
+            user_id=OuterRef('user_id'),
+            status='approved',
+            date__gte=OuterRef('start_date'),
+            date__lte=OuterRef('end_date'),
+        ).order_by().values('user_id').annotate(total=Sum('hours')).values('total')
+        return Coalesce(Subquery(logs, output_field=hours_field), Value(Decimal('0')), output_field=hours_field)
+
+    year_range = models.Q(date__gte=date(year, start_month, 1), date__lt=date(year + 1, start_month, 1))
+    UserScholarship.objects.update(
+        academic_year=year,
+        current_year_hours=approved(year_range),
+        total_hours_completed=approved(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hours', '0001_initial'),
+        ('users', '0005_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userscholarship',
+            name='academic_year',
+            field=models.PositiveIntegerField(blank=True, help_text='Año académico al que corresponden las horas del año actual', null=True, verbose_name='Año Académico'),
+        ),
+        migrations.AlterField(
+            model_name='userscholarship',
+            name='current_year_hours',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Horas del Año Actual'),
+        ),
+        migrations.AlterField(
+            model_name='userscholarship',
+            name='total_hours_completed',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Total de Horas Completadas'),
+        ),
+        migrations.RunPython(seed_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+"""
+Progreso de horas de los estudiantes calculado en la base de datos.
+
+Las horas aprobadas y los proyectos completados se anotan en el queryset de
+usuarios con subconsultas correlacionadas (una por métrica), así un listado
+completo cuesta una sola consulta y se puede ordenar y filtrar por esos valores
+en SQL. Se usan subconsultas en lugar de JOIN + GROUP BY para que las filas de
+horas y de aplicaciones no se multipliquen entre sí.
+
+Para un solo estudiante, student_progress arma el desglose por proyecto con un
+número fijo de consultas (horas aprobadas agrupadas por proyecto y aplicaciones),
+sin importar en cuántos proyectos participe.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from applications.models import Application
+from hours.models import HourLog
+
+
+HOURS_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+def approved_hours():
+    """Expresión con la suma de horas aprobadas del usuario de la fila externa"""
+    total = HourLog.objects.filter(
+        user_id=OuterRef('pk'),
+        status='approved'
+    ).order_by().values('user_id').annotate(total=Sum('hours')).values('total')
+    return Coalesce(Subquery(total, output_field=HOURS_FIELD), Value(Decimal('0')), output_field=HOURS_FIELD)
+
+
+def completed_projects():
+    """Expresión con la cantidad de aplicaciones completadas del usuario de la fila externa"""
+    count = Application.objects.filter(
+        user_id=OuterRef('pk'),
+        status='completed'
+    ).order_by().values('user_id').annotate(count=Count('id')).values('count')
+    return Coalesce(Subquery(count, output_field=IntegerField()), Value(0))
+
+
+def with_progress(queryset):
+    """Anota `total_hours` y `completed_projects` en un queryset de usuarios"""
+    return queryset.annotate(
+        total_hours=approved_hours(),
+        completed_projects=completed_projects()
+    )
+
+
+def student_progress(user):
+    """
+    Horas aprobadas por proyecto, estado de cada aplicación y totales del usuario.
+
+    Retorna {'projects': [...], 'total_hours': float, 'completed_projects': int};
+    cada proyecto tiene project_id, project_name, status, hours_completed y applied_at.
+    `total_hours` incluye horas aprobadas en proyectos sin aplicación, igual que
+    User.get_total_hours().
+    """
+    hours_by_project = dict(
+        HourLog.objects.filter(user=user, status='approved').order_by().values('project_id').annotate(
+            total=Sum('hours')
+        ).values_list('project_id', 'total')
+    )
+
+    applications = Application.objects.filter(user=user).order_by('id').values(
+        'project_id', 'project__name', 'status', 'applied_at'
+    )
+    projects = [
+        {
+            'project_id': application['project_id'],
+            'project_name': application['project__name'],
+            'status': application['status'],
+            'hours_completed': float(hours_by_project.get(application['project_id'], 0)),
+            'applied_at': application['applied_at'],
+        }
+        for application in applications
+    ]
+
+    return {
+        'projects': projects,
+        'total_hours': float(sum(hours_by_project.values(), Decimal('0'))),
+        'completed_projects': sum(1 for project in projects if project['status'] == 'completed'),
+    }
@@ -0,0 +1,120 @@
+"""
+Búsqueda de estudiantes por prefijo (typeahead).
+
+Cada estudiante tiene en StudentSearchToken un token por palabra de su carnet,
+nombre y apellido, normalizado en minúsculas y sin tildes. Un prefijo se busca
+como un rango del índice (token >= "ana" AND token < "ana\\uffff"), que a
+diferencia de LIKE '%ana%' usa el índice en cualquier base de datos; se lee por
+páginas y se detiene al llenar el límite. Con varias palabras, todas deben ser
+prefijo de algún token del mismo estudiante.
+
+El índice se actualiza al guardar un usuario (User.save) y se reconstruye con
+rebuild() después de cargas masivas con bulk_create.
+"""
+
+import re
+import unicodedata
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import StudentSearchToken, User
+
+
+# Campos de User que alteran los tokens
+INDEXED_FIELDS = frozenset(['first_name', 'last_name', 'carnet', 'user_type'])
+
+MAX_WORDS = 4
+BATCH_SIZE = 2000
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    """Minúsculas y sin tildes: 'Ñúñez' -> 'nunez'"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokens_for(user):
+    words = ' '.join([user.carnet or '', user.first_name or '', user.last_name or ''])
+    return {token[:150] for token in _WORD.findall(normalize(words))}
+
+
+def _prefix(word):
+    return {'token__gte': word, 'token__lt': word + '\uffff'}
+
+
+def index_users(users):
+    """Reemplaza los tokens de los usuarios dados; los que no son estudiantes quedan sin tokens"""
+    users = list(users)
+    StudentSearchToken.objects.filter(user_id__in=[user.pk for user in users]).delete()
+    StudentSearchToken.objects.bulk_create([
+        StudentSearchToken(user_id=user.pk, token=token)
+        for user in users if user.user_type == 'student'
+        for token in tokens_for(user)
+    ], batch_size=BATCH_SIZE)
+
+
+def rebuild():
+    """Reconstruye el índice completo; retorna cuántos estudiantes se indexaron"""
+    StudentSearchToken.objects.all().delete()
+    students = User.objects.filter(user_type='student').only('id', 'user_type', 'carnet', 'first_name', 'last_name')
+    batch = []
+    count = 0
+    for student in students.iterator(chunk_size=BATCH_SIZE):
+        batch.extend(StudentSearchToken(user_id=student.pk, token=token) for token in tokens_for(student))
+        count += 1
+        if len(batch) >= BATCH_SIZE:
+            StudentSearchToken.objects.bulk_create(batch)
+            batch = []
+    StudentSearchToken.objects.bulk_create(batch)
+    return count
+
+
+def search_students(query, limit=10):
+    """
+    Hasta `limit` estudiantes cuyo carnet o nombre tenga palabras que empiecen con
+    cada palabra de `query`. El orden es el del token que coincide con la palabra
+    más larga de la consulta (coincidencias exactas y cortas primero).
+    Retorna filas con id, full_name, carnet y email.
+    """
+    words = sorted(set(_WORD.findall(normalize(query))), key=len, reverse=True)[:MAX_WORDS]
+    if not words:
+        return []
+
+    matches = StudentSearchToken.objects.filter(**_prefix(words[0]))
+    for word in words[1:]:
+        # EXISTS correlacionado: se evalúa por el índice de user solo para las filas
+        # recorridas, y el recorrido se detiene al completar el límite
+        matches = matches.filter(Exists(
+            StudentSearchToken.objects.filter(user_id=OuterRef('user_id'), **_prefix(word))
+        ))
+
+    # Un estudiante puede coincidir con varios tokens, así que `limit` filas no
+    # alcanzan para `limit` estudiantes: se leen páginas por rango de (token, user_id)
+    # hasta juntar `limit` estudiantes distintos o agotar las coincidencias
+    user_ids = []
+    rows = matches.order_by('token', 'user_id').values_list('token', 'user_id')
+    page_size = limit * MAX_WORDS
+    page = list(rows[:page_size])
+    while page:
+        for token, user_id in page:
+            if user_id not in user_ids:
+                user_ids.append(user_id)
+                if len(user_ids) == limit:
+                    break
+        if len(user_ids) == limit or len(page) < page_size:
+            break
+        last_token, last_user_id = page[-1]
+        page = list(rows.filter(
+            Q(token__gt=last_token) | Q(token=last_token, user_id__gt=last_user_id)
+        )[:page_size])
+
+    rows = User.objects.filter(id__in=user_ids).values('id', 'username', 'first_name', 'last_name', 'carnet', 'email')
+    order = {user_id: index for index, user_id in enumerate(user_ids)}
+    results = []
+    for row in sorted(rows, key=lambda row: order[row['id']]):
+        username = row.pop('username')
+        row['full_name'] = f"{row['first_name']} {row['last_name']}".strip() or username
+        results.append(row)
+    return results
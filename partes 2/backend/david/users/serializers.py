@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from . import progress, usernames
+from .blacklist import RefreshToken
 from .models import User, Scholarship, UserScholarship
 
 
@@ -24,9 +27,19 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_joined', 'created_at', 'updated_at']
     
     def get_total_hours(self, obj):
+        # El contexto puede traer el resultado de progress.student_progress ya calculado
+        if 'progress' in self.context:
+            return self.context['progress']['total_hours']
+        # Anotado por users.progress.with_progress (p. ej. los miembros de un proyecto)
+        if hasattr(obj, 'total_hours'):
+            return float(obj.total_hours)
         return obj.get_total_hours()
     
     def get_completed_projects(self, obj):
+        if 'progress' in self.context:
+            return self.context['progress']['completed_projects']
+        if hasattr(obj, 'completed_projects'):
+            return obj.completed_projects
         return obj.get_completed_projects()
 
 
@@ -57,8 +70,10 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
-        return user
+        try:
+            return usernames.create_user(**validated_data)
+        except usernames.UsernameTaken:
+            raise serializers.ValidationError({"username": "Ya existe un usuario con este nombre de usuario."})
 
 
 class SimpleStudentRegistrationSerializer(serializers.ModelSerializer):
@@ -74,6 +89,8 @@ class SimpleStudentRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'first_name', 'last_name', 'carnet', 'password', 'password_confirm', 'scholarship_type', 'scholarship_percentage']
+        # Sin username se genera uno en validate()
+        extra_kwargs = {'username': {'required': False, 'allow_blank': True}}
     
     
     def validate_carnet(self, value):
@@ -101,33 +118,13 @@ class SimpleStudentRegistrationSerializer(serializers.ModelSerializer):
         if attrs.get('password') != attrs.get('password_confirm'):
             raise serializers.ValidationError({"password_confirm": "Las contraseñas no coinciden."})
         
-        # Si no hay username, generar uno automáticamente
+        # Si no hay username, generar uno automáticamente (nombre.apellido o el carnet);
+        # el sufijo libre se elige al crear (ver users/usernames.py)
         if not attrs.get('username'):
-            first_name = attrs.get('first_name', '').strip()
-            last_name = attrs.get('last_name', '').strip()
-            carnet = attrs.get('carnet', '').strip().lower()
-            
-            if first_name and last_name:
-                # Generar username basado en nombre y apellido
-                first = ''.join(c for c in first_name.lower() if c.isalnum())
-                last = ''.join(c for c in last_name.lower() if c.isalnum())
-                if first and last:
-                    base_username = f"{first}.{last}"[:30]
-                    username = base_username
-                    counter = 1
-                    # Asegurar que sea único
-                    while User.objects.filter(username=username).exists():
-                        username = f"{base_username}{counter}"[:30]
-                        counter += 1
-                    attrs['username'] = username
-                elif carnet:
-                    attrs['username'] = carnet
-                else:
-                    raise serializers.ValidationError({"username": "Se requiere nombre y apellido, o un nombre de usuario."})
-            elif carnet:
-                attrs['username'] = carnet
-            else:
+            base = usernames.derive_base(attrs.get('first_name'), attrs.get('last_name'), attrs.get('carnet'))
+            if not base:
                 raise serializers.ValidationError({"username": "Se requiere nombre y apellido, o un nombre de usuario."})
+            attrs['username_base'] = base
         
         return attrs
     
@@ -151,8 +148,11 @@ class SimpleStudentRegistrationSerializer(serializers.ModelSerializer):
         if 'scholarship_percentage' not in validated_data or validated_data['scholarship_percentage'] is None:
             validated_data['scholarship_percentage'] = 100.0
         
-        user = User.objects.create_user(password=password, **validated_data)
-        return user
+        base = validated_data.pop('username_base', None)
+        try:
+            return usernames.create_user(password=password, base=base, **validated_data)
+        except usernames.UsernameTaken:
+            raise serializers.ValidationError({"username": "Ya existe un usuario con este nombre de usuario."})
 
 
 class UserLoginSerializer(serializers.Serializer):
@@ -290,6 +290,9 @@ class UserScholarshipSerializer(serializers.ModelSerializer):
     scholarship_name = serializers.CharField(source='scholarship.name', read_only=True)
     scholarship_type = serializers.CharField(source='scholarship.scholarship_type', read_only=True)
     required_hours = serializers.IntegerField(source='scholarship.required_hours', read_only=True)
+    # Calculados por users.scholarships desde las horas aprobadas
+    current_year_hours = serializers.FloatField(read_only=True)
+    total_hours_completed = serializers.FloatField(read_only=True)
     progress_percentage = serializers.SerializerMethodField()
     remaining_hours = serializers.SerializerMethodField()
     
@@ -298,10 +301,10 @@ class UserScholarshipSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'scholarship', 'scholarship_name', 'scholarship_type',
             'status', 'start_date', 'end_date', 'current_year_hours',
-            'total_hours_completed', 'required_hours', 'progress_percentage',
+            'total_hours_completed', 'academic_year', 'required_hours', 'progress_percentage',
             'remaining_hours', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'academic_year', 'created_at', 'updated_at']
     
     def get_progress_percentage(self, obj):
         return obj.get_progress_percentage()
@@ -347,40 +350,32 @@ class UserProfileSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Este carnet ya está en uso.")
         return value
     
+    def get_progress(self, obj):
+        """Progreso del usuario, calculado una sola vez por objeto serializado"""
+        if not hasattr(self, '_progress'):
+            self._progress = {}
+        if obj.pk not in self._progress:
+            self._progress[obj.pk] = progress.student_progress(obj)
+        return self._progress[obj.pk]
+    
     def get_total_hours(self, obj):
-        return obj.get_total_hours()
+        return self.get_progress(obj)['total_hours']
     
     def get_completed_projects(self, obj):
-        return obj.get_completed_projects()
+        return self.get_progress(obj)['completed_projects']
     
     def get_projects(self, obj):
         """Obtener proyectos del estudiante con información de horas"""
         if obj.user_type != 'student':
             return []
         
-        from applications.models import Application
-        from hours.models import HourLog
-        from django.db.models import Sum
-        
-        applications = Application.objects.filter(user=obj).select_related('project')
-        projects_data = []
-        for app in applications:
-            # Obtener horas por proyecto
-            project_hours = HourLog.objects.filter(
-                user=obj,
-                project=app.project,
-                status='approved'
-            ).aggregate(total=Sum('hours'))['total'] or 0
-            
-            projects_data.append({
-                'project_id': app.project.id,
-                'project_name': app.project.name,
-                'status': app.status,
-                'hours_completed': float(project_hours),
-                'applied_at': app.applied_at.isoformat() if app.applied_at else None,
-            })
-        
-        return projects_data
+        return [
+            {
+                **project,
+                'applied_at': project['applied_at'].isoformat() if project['applied_at'] else None,
+            }
+            for project in self.get_progress(obj)['projects']
+        ]
 
 
 class StudentListSerializer(serializers.ModelSerializer):
@@ -389,17 +384,26 @@ class StudentListSerializer(serializers.ModelSerializer):
     """
     full_name = serializers.ReadOnlyField()
     total_hours = serializers.SerializerMethodField()
+    completed_projects = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = [
             'id', 'full_name', 'carnet', 'email', 'user_type',
             'scholarship_type', 'scholarship_percentage',
-            'total_hours', 'is_active', 'date_joined'
+            'total_hours', 'completed_projects', 'is_active', 'date_joined'
         ]
     
     def get_total_hours(self, obj):
+        # Anotado por users.progress.with_progress; sin anotación se consulta por fila
+        if hasattr(obj, 'total_hours'):
+            return float(obj.total_hours)
         return obj.get_total_hours()
+    
+    def get_completed_projects(self, obj):
+        if hasattr(obj, 'completed_projects'):
+            return obj.completed_projects
+        return obj.get_completed_projects()
 
 
 class AdminListSerializer(serializers.ModelSerializer):
@@ -417,4 +421,14 @@ class AdminListSerializer(serializers.ModelSerializer):
         ]
     
     def get_managed_projects_count(self, obj):
+        # Anotado por AdminListView; sin anotación se consulta por fila
+        if hasattr(obj, 'managed_projects_count'):
+            return obj.managed_projects_count
         return obj.managed_projects.count()
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Serializer de /api/token/refresh/ que revisa la blacklist con el filtro de users.blacklist
+    """
+    token_class = RefreshToken
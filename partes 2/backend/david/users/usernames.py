@@ -0,0 +1,93 @@
+"""
+Asignación de usernames únicos.
+
+El username derivado (nombre.apellido o el carnet) puede estar tomado. En lugar
+de probar base, base1, base2... con una consulta cada uno, se leen de una vez
+los usernames que empiezan con la base (un rango sobre el índice único) y se
+elige en memoria el primer sufijo libre. Entre esa lectura y el INSERT otra
+transacción puede tomar el mismo nombre: la restricción única lo detecta y se
+vuelve a asignar.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import User
+
+
+MAX_LENGTH = 30
+
+# Sufijos de hasta 4 dígitos recortan la base; el prefijo consultado debe cubrirlos
+SUFFIX_DIGITS = 4
+
+MAX_ATTEMPTS = 5
+
+
+class UsernameTaken(Exception):
+    """El username pedido explícitamente ya existe"""
+
+
+def derive_base(first_name='', last_name='', carnet=''):
+    """nombre.apellido (solo caracteres alfanuméricos) o, sin ambos, el carnet"""
+    first = ''.join(c for c in (first_name or '').strip().lower() if c.isalnum())
+    last = ''.join(c for c in (last_name or '').strip().lower() if c.isalnum())
+    if first and last:
+        return f"{first}.{last}"[:MAX_LENGTH]
+    return (carnet or '').strip().lower()[:MAX_LENGTH]
+
+
+def _prefix(base):
+    return base[:MAX_LENGTH - SUFFIX_DIGITS] if len(base) > MAX_LENGTH - SUFFIX_DIGITS else base
+
+
+def taken(bases):
+    """Usernames existentes que podrían chocar con alguna de las bases (una consulta)"""
+    prefixes = {_prefix(base) for base in bases if base}
+    if not prefixes:
+        return set()
+    # Rango sobre el índice único en lugar de LIKE 'base%', que en SQLite no lo usa
+    condition = reduce(or_, (Q(username__gte=prefix, username__lt=prefix + '\uffff') for prefix in prefixes))
+    return set(User.objects.filter(condition).values_list('username', flat=True))
+
+
+def next_free(base, taken_usernames):
+    """base, base1, base2... el primero que no esté en `taken_usernames`"""
+    username = base
+    counter = 1
+    while username in taken_usernames:
+        suffix = str(counter)
+        username = f"{base[:MAX_LENGTH - len(suffix)]}{suffix}"
+        counter += 1
+    return username
+
+
+def allocate(base, exclude=()):
+    """Primer username libre para `base` con una sola consulta"""
+    return next_free(base, taken([base]) | set(exclude))
+
+
+def create_user(username=None, base=None, **fields):
+    """
+    User.objects.create_user con un username único.
+
+    Con `username` se usa tal cual y, si ya existe, lanza UsernameTaken. Con
+    `base` se asigna el primer libre y, si otra transacción lo toma antes del
+    INSERT, se reintenta con el siguiente.
+    """
+    tried = set()
+    for _ in range(MAX_ATTEMPTS):
+        candidate = username or allocate(base, exclude=tried)
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(username=candidate, **fields)
+        except IntegrityError:
+            # La violación puede ser de otra restricción (por ejemplo el carnet)
+            if not User.objects.filter(username=candidate).exists():
+                raise
+            if username:
+                raise UsernameTaken(candidate)
+            tried.add(candidate)
+    raise IntegrityError(f'No se pudo asignar un username libre para {base}')
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+El stream SSE de notificaciones (/api/applications/notifications/stream/) es
+una vista asíncrona; en producción se sirve con un servidor ASGI, por ejemplo:
+    uvicorn keyhours_backend.asgi:application
 """
 
 import os
@@ -0,0 +1,85 @@
+"""
+Comando de gestión para asignar en lote las aplicaciones pendientes a proyectos
+Ejecutar con: python manage.py allocate_applications            (dry-run)
+              python manage.py allocate_applications --apply --plan <hash>
+
+Sin --apply muestra el plan (qué se aprobaría en cada proyecto) y su hash.
+Con --apply recalcula el plan con los proyectos bloqueados y, si coincide con
+el hash revisado, aprueba, agrega miembros y notifica en una sola transacción.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from applications import allocation
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Asigna las aplicaciones pendientes a proyectos respetando los cupos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help='Aplicar el plan (por defecto solo se muestra)')
+        parser.add_argument('--plan', help='Hash del plan revisado en el dry-run (requerido con --apply)')
+        parser.add_argument('--project', type=int, action='append', dest='project_ids',
+                            help='Limitar a estos proyectos (se puede repetir)')
+        parser.add_argument('--max-per-student', type=int, default=1, help='Proyectos por estudiante como máximo')
+        parser.add_argument('--min-score', type=float, default=None, help='Puntuación promedio mínima')
+        parser.add_argument('--reviewer', help='Username del administrador que figura como revisor')
+        parser.add_argument('--notes', default='', help='Notas de revisión para las aprobaciones')
+        parser.add_argument('--verbose-plan', action='store_true', help='Listar cada aplicación del plan')
+
+    def handle(self, *args, **options):
+        plan_options = {
+            'project_ids': options['project_ids'],
+            'max_per_student': options['max_per_student'],
+            'min_score': options['min_score'],
+        }
+
+        started = time.perf_counter()
+        if not options['apply']:
+            result = allocation.build_plan(**plan_options)
+            self.report(result, options['verbose_plan'])
+            self.stdout.write(f'Calculado en {time.perf_counter() - started:.2f}s')
+            self.stdout.write(f'Para aplicarlo: --apply --plan {result["plan"]}')
+            return
+
+        if not options['plan']:
+            raise CommandError('Con --apply se debe indicar --plan con el hash revisado')
+
+        reviewer = None
+        if options['reviewer']:
+            try:
+                reviewer = User.objects.get(username=options['reviewer'], user_type='admin')
+            except User.DoesNotExist:
+                raise CommandError(f'No existe el administrador "{options["reviewer"]}"')
+
+        try:
+            result = allocation.apply_plan(
+                reviewer=reviewer,
+                plan=options['plan'],
+                notes=options['notes'],
+                **plan_options
+            )
+        except allocation.PlanChanged as e:
+            raise CommandError(f'El plan cambió desde el dry-run (nuevo hash: {e}); revíselo de nuevo')
+
+        self.report(result, options['verbose_plan'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {result["total_approved"]} aplicaciones aprobadas en {time.perf_counter() - started:.2f}s'
+        ))
+
+    def report(self, result, verbose):
+        for project in result['projects']:
+            self.stdout.write(
+                f'#{project["project"]} {project["project_name"]}: aprobar {len(project["approve"])}'
+                f'/{project["available_spots"]} plazas, {project["pending_left"]} quedan pendientes'
+            )
+            if verbose:
+                for entry in project['approve']:
+                    self.stdout.write(f'    + aplicación #{entry["application"]} ({entry["user_carnet"]}) peso {entry["weight"]:.3f}')
+        self.stdout.write(
+            f'Total: {result["total_approved"]} de {result["total_pending"]} pendientes, '
+            f'peso {result["total_weight"]:.3f}, plan {result["plan"]}'
+        )
@@ -0,0 +1,46 @@
+"""
+Comando de gestión para archivar notificaciones leídas antiguas
+Ejecutar con: python manage.py archive_notifications --days 90 --keep-recent 50
+
+Mueve por lotes las notificaciones leídas a NotificationArchive (JSON comprimido)
+y las borra de la tabla activa. También borra los eventos de NotificationOutbox
+ya despachados hace más de --outbox-days días. Pensado para correr
+periódicamente (cron).
+"""
+
+from django.core.management.base import BaseCommand
+
+from applications import outbox, retention
+
+
+class Command(BaseCommand):
+    help = 'Archiva las notificaciones leídas antiguas en bloques comprimidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Archivar leídas con más de N días')
+        parser.add_argument('--keep-recent', type=int, default=None,
+                            help='Archivar también las leídas que excedan las N más recientes de cada usuario')
+        parser.add_argument('--batch-size', type=int, default=retention.BATCH_SIZE, help='Notificaciones por lote')
+        parser.add_argument('--outbox-days', type=int, default=outbox.RETENTION_DAYS,
+                            help='Borrar los eventos de la bandeja de salida despachados hace más de N días')
+        parser.add_argument('--dry-run', action='store_true', help='Solo contar lo que se archivaría')
+
+    def handle(self, *args, **options):
+        queryset = retention.archivable(options['days'], options['keep_recent'])
+
+        if options['dry_run']:
+            self.stdout.write(f'Se archivarían {queryset.count()} notificaciones')
+            return
+
+        total = 0
+        while True:
+            archived = retention.archive_batch(queryset, options['batch_size'])
+            if not archived:
+                break
+            total += archived
+            self.stdout.write(f'Lote: {archived} notificaciones archivadas')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} notificaciones archivadas'))
+
+        pruned = outbox.prune_dispatched(options['outbox_days'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {pruned} eventos despachados borrados de la bandeja de salida'))
@@ -0,0 +1,48 @@
+"""
+Comando de gestión que despacha la bandeja de salida de notificaciones
+Ejecutar con: python manage.py dispatch_notifications
+
+Por defecto corre como proceso en segundo plano, drenando lotes y esperando
+--interval segundos cuando no hay eventos. Con --once drena lo pendiente y termina
+(útil para cron). Se pueden correr varios despachadores a la vez: cada lote se
+toma con SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications import outbox
+
+
+class Command(BaseCommand):
+    help = 'Convierte los eventos de NotificationOutbox en notificaciones y correos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drenar los eventos pendientes y terminar')
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE, help='Eventos por lote')
+        parser.add_argument('--interval', type=float, default=2.0, help='Segundos de espera cuando no hay eventos')
+
+    def handle(self, *args, **options):
+        total_dispatched = 0
+        total_failed = 0
+
+        try:
+            while True:
+                dispatched, failed = outbox.dispatch_batch(options['batch_size'])
+                total_dispatched += dispatched
+                total_failed += failed
+
+                if dispatched or failed:
+                    self.stdout.write(f'Lote: {dispatched} despachados, {failed} con error')
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total_dispatched} notificaciones despachadas, {total_failed} con error'
+        ))
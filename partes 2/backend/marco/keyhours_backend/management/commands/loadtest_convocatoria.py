@@ -0,0 +1,243 @@
+"""
+Comando de gestión para reproducir la apertura de una convocatoria popular
+Ejecutar con: python manage.py loadtest_convocatoria --base-url http://127.0.0.1:8000
+
+El servidor (runserver, uvicorn/daphne sobre keyhours_backend.asgi, etc.) debe
+estar corriendo contra la misma base de datos que este comando. El comando
+siembra estudiantes y un proyecto, publica la convocatoria como su manager y
+dispara la ráfaga de POST a /api/applications/ y /api/projects/<id>/join/.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from datetime import timedelta
+
+from users.authentication import tokens_for_user
+from users.models import User
+from projects.models import Project
+from applications.models import Application, ProjectWaitlist, WaitlistEntry
+
+
+USERNAME_PREFIX = 'loadtest_'
+PROJECT_NAME = 'Convocatoria de prueba de carga'
+
+
+async def http_request(host, port, method, path, token=None, payload=None, timeout=30, extra_headers=None):
+    """
+    Cliente HTTP/1.1 mínimo sobre asyncio (una conexión por petición).
+    Retorna (status_code, cuerpo).
+    """
+    body = json.dumps(payload).encode() if payload is not None else b''
+    headers = [
+        f'{method} {path} HTTP/1.1',
+        f'Host: {host}:{port}',
+        'Accept: application/json',
+        'Connection: close',
+        f'Content-Length: {len(body)}',
+    ]
+    if payload is not None:
+        headers.append('Content-Type: application/json')
+    if token:
+        headers.append(f'Authorization: Bearer {token}')
+    for name, value in (extra_headers or {}).items():
+        headers.append(f'{name}: {value}')
+    request = ('\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(request)
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+
+    head, _, response_body = raw.partition(b'\r\n\r\n')
+    status_line = head.split(b'\r\n', 1)[0].decode('latin-1')
+    return int(status_line.split()[1]), response_body
+
+
+def percentile(sorted_values, q):
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Prueba de carga: apertura de una convocatoria con cientos de estudiantes aplicando a la vez'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='URL del servidor a probar')
+        parser.add_argument('--students', type=int, default=300, help='Cantidad de estudiantes en la ráfaga')
+        parser.add_argument('--capacity', type=int, default=25, help='max_participants del proyecto')
+        parser.add_argument('--concurrency', type=int, default=100, help='Peticiones simultáneas como máximo')
+        parser.add_argument('--spread', type=float, default=0.0,
+                            help='Segundos en los que se reparten las llegadas (0 = todas a la vez)')
+        parser.add_argument('--visibility', choices=['convocatoria', 'published'], default='convocatoria',
+                            help='Visibilidad a la que se cambia el proyecto al abrir la ráfaga')
+        parser.add_argument('--no-join', action='store_true', help='No llamar a join_project después de aplicar')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla para el orden de llegada')
+        parser.add_argument('--keep', action='store_true', help='No borrar los datos sembrados al terminar')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['base_url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Solo se soportan URLs http://host[:puerto]')
+
+        admin_user, project, students = self.seed(options)
+        tokens = {student.id: str(tokens_for_user(student).access_token) for student in students}
+        self.stdout.write(f'Sembrados {len(students)} estudiantes y el proyecto #{project.id} (cupo {project.max_participants})')
+
+        try:
+            started = time.perf_counter()
+            results = asyncio.run(self.run_burst(url.hostname, url.port or 80, options, admin_user, project, students, tokens))
+            elapsed = time.perf_counter() - started
+
+            self.report(results, elapsed)
+            violations = self.check_invariants(project)
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+        if violations:
+            for violation in violations:
+                self.stdout.write(self.style.ERROR(f'❌ {violation}'))
+            raise CommandError('Se violaron invariantes de capacidad')
+        self.stdout.write(self.style.SUCCESS('✅ Invariantes de capacidad respetadas'))
+
+    def seed(self, options):
+        """Crea el admin, el proyecto sin publicar y los estudiantes (sin hashear contraseñas)"""
+        self.cleanup()
+
+        admin_user = User(username=f'{USERNAME_PREFIX}admin', carnet='LTADMIN', user_type='admin')
+        admin_user.set_unusable_password()
+        admin_user.save()
+
+        project = Project.objects.create(
+            name=PROJECT_NAME,
+            description='Proyecto generado por loadtest_convocatoria',
+            manager=admin_user,
+            max_hours=40,
+            hour_assignment='manual',
+            visibility='unpublished',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=90),
+            max_participants=options['capacity'],
+        )
+
+        students = []
+        for i in range(options['students']):
+            student = User(
+                username=f'{USERNAME_PREFIX}{i:05d}',
+                carnet=f'LT{i:06d}',
+                first_name='Carga',
+                last_name=f'{i:05d}',
+                user_type='student',
+            )
+            student.set_unusable_password()
+            students.append(student)
+        User.objects.bulk_create(students, batch_size=1000)
+        students = list(User.objects.filter(username__startswith=USERNAME_PREFIX, user_type='student'))
+
+        return admin_user, project, students
+
+    async def run_burst(self, host, port, options, admin_user, project, students, tokens):
+        """Abre la convocatoria y lanza la ráfaga de aplicaciones"""
+        results = defaultdict(list)
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        start_date = (timezone.now().date() + timedelta(days=7)).isoformat()
+
+        async def timed(name, method, path, token, payload=None):
+            async with semaphore:
+                begin = time.perf_counter()
+                try:
+                    status_code, _ = await http_request(host, port, method, path, token, payload)
+                except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                    status_code = None
+                results[name].append((status_code, time.perf_counter() - begin))
+
+        async def student_flow(student, delay):
+            await asyncio.sleep(delay)
+            await timed('POST /api/applications/', 'POST', '/api/applications/', tokens[student.id], {
+                'project': project.id,
+                'motivation': 'Quiero participar en este proyecto',
+                'available_hours_per_week': 5,
+                'start_date_preference': start_date,
+            })
+            if not options['no_join']:
+                await timed('POST /api/projects/<id>/join/', 'POST', f'/api/projects/{project.id}/join/', tokens[student.id])
+
+        await timed('POST /api/projects/<id>/publish/', 'POST', f'/api/projects/{project.id}/publish/',
+                    str(tokens_for_user(admin_user).access_token), {'visibility': options['visibility']})
+
+        rng = random.Random(options['seed'])
+        arrivals = list(students)
+        rng.shuffle(arrivals)
+        await asyncio.gather(*(
+            student_flow(student, rng.uniform(0, options['spread'])) for student in arrivals
+        ))
+        return results
+
+    def report(self, results, elapsed):
+        """Imprime latencias p50/p95/p99 y tasas de error por endpoint"""
+        total = sum(len(samples) for samples in results.values())
+        self.stdout.write(f'\n{total} peticiones en {elapsed:.2f}s ({total / elapsed:.1f} req/s)\n')
+        self.stdout.write(f'{"endpoint":<34}{"n":>6}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}{"4xx":>7}{"5xx/err":>9}')
+        for name, samples in results.items():
+            latencies = sorted(latency * 1000 for _, latency in samples)
+            client_errors = sum(1 for code, _ in samples if code is not None and 400 <= code < 500)
+            server_errors = sum(1 for code, _ in samples if code is None or code >= 500)
+            self.stdout.write(
+                f'{name:<34}{len(samples):>6}'
+                f'{percentile(latencies, 50):>9.1f}{percentile(latencies, 95):>9.1f}'
+                f'{percentile(latencies, 99):>9.1f}{latencies[-1]:>9.1f}'
+                f'{client_errors / len(samples):>7.1%}{server_errors / len(samples):>9.1%}'
+            )
+
+    def check_invariants(self, project):
+        """Verifica en la base de datos que la ráfaga no rompió los cupos"""
+        violations = []
+        project.refresh_from_db()
+        members = project.members.count()
+
+        if project.current_participants != members:
+            violations.append(f'current_participants={project.current_participants} pero hay {members} miembros')
+        if members > project.max_participants:
+            violations.append(f'{members} miembros exceden max_participants={project.max_participants}')
+
+        duplicated = Application.objects.filter(project=project).values('user').annotate(
+            n=Count('id')
+        ).filter(n__gt=1).count()
+        if duplicated:
+            violations.append(f'{duplicated} estudiantes con aplicaciones duplicadas')
+
+        waitlist = ProjectWaitlist.objects.filter(project=project).first()
+        if waitlist:
+            positions = sorted(WaitlistEntry.objects.filter(waitlist=waitlist).values_list('position', flat=True))
+            if len(set(positions)) != len(positions):
+                violations.append('Hay posiciones repetidas en la lista de espera')
+            if positions and (positions[0] <= waitlist.head or positions[-1] > waitlist.tail):
+                violations.append('Hay posiciones de la lista de espera fuera de (head, tail]')
+            if waitlist.size != len(positions):
+                violations.append(f'La cola dice tener {waitlist.size} en espera pero tiene {len(positions)} entradas')
+            waitlisted = Application.objects.filter(project=project, status='waitlisted').count()
+            if waitlisted != len(positions):
+                violations.append(f'{waitlisted} aplicaciones en espera pero {len(positions)} entradas en la cola')
+
+        by_status = dict(Application.objects.filter(project=project).values_list('status').annotate(n=Count('id')))
+        self.stdout.write(f'\nMiembros: {members}/{project.max_participants} - aplicaciones por estado: {by_status}')
+        return violations
+
+    def cleanup(self):
+        """Borra los datos sembrados por corridas anteriores"""
+        Project.objects.filter(name=PROJECT_NAME, manager__username__startswith=USERNAME_PREFIX).delete()
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
@@ -0,0 +1,60 @@
+"""
+Comando de gestión para medir la memoria por conexión SSE inactiva
+Ejecutar con: python manage.py measure_notification_stream --connections 1000
+
+Abre N streams de notificaciones en memoria (sin sockets), los deja esperando
+en su cola como una conexión inactiva real y mide con tracemalloc la memoria
+Python retenida. No incluye los buffers del socket ni del servidor ASGI.
+Al final publica un evento a cada usuario para comprobar la entrega.
+"""
+
+import asyncio
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from applications import events
+from applications.stream import notification_events
+
+
+class Command(BaseCommand):
+    help = 'Mide la memoria por conexión inactiva del stream SSE de notificaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=1000, help='Conexiones simultáneas a abrir')
+        parser.add_argument('--users', type=int, default=0,
+                            help='Usuarios distintos (por defecto uno por conexión)')
+
+    def handle(self, *args, **options):
+        asyncio.run(self.measure(options['connections'], options['users'] or options['connections']))
+
+    async def measure(self, connections, users):
+        broker = events.get_broker()
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        streams = []
+        for i in range(connections):
+            stream = notification_events(i % users, 0, heartbeat=3600)
+            await stream.__anext__()  # contador inicial
+            streams.append(stream)
+
+        # Cada conexión queda bloqueada esperando su próximo evento
+        waiters = [asyncio.ensure_future(stream.__anext__()) for stream in streams]
+        await asyncio.sleep(0)
+
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        per_connection = (current - baseline) / connections
+
+        for user_id in range(users):
+            broker.publish(user_id, {'event': 'ping', 'data': {}})
+        delivered = await asyncio.gather(*waiters)
+
+        for stream in streams:
+            await stream.aclose()
+
+        self.stdout.write(f'Conexiones: {connections} ({users} usuarios)')
+        self.stdout.write(f'Memoria retenida: {(current - baseline) / 1024:.1f} KiB (pico {(peak - baseline) / 1024:.1f} KiB)')
+        self.stdout.write(self.style.SUCCESS(f'✅ {per_connection:.0f} bytes por conexión inactiva'))
+        self.stdout.write(f'Eventos entregados: {sum(1 for chunk in delivered if chunk.startswith("event: ping"))}/{connections}')
@@ -0,0 +1,32 @@
+"""
+Comando de gestión para borrar los refresh tokens vencidos
+Ejecutar con: python manage.py prune_tokens --batch-size 5000
+
+Borra de OutstandingToken los tokens con expires_at vencido y sus filas de
+BlacklistedToken, en lotes de --batch-size por transacción para no bloquear
+las tablas mientras los refresh siguen escribiendo. Pensado para cron.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users import blacklist
+
+
+class Command(BaseCommand):
+    help = 'Borra en lotes los refresh tokens vencidos y su blacklist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=blacklist.BATCH_SIZE, help='Tokens por DELETE')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor que 0')
+
+        started = time.perf_counter()
+        outstanding, blacklisted = blacklist.prune_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {outstanding} tokens vencidos borrados ({blacklisted} en la blacklist) '
+            f'en {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,36 @@
+"""
+Comando de gestión para el cierre del año académico de las becas
+Ejecutar con: python manage.py rollover_scholarships --year 2026
+
+Para cada UserScholarship fija academic_year, recalcula current_year_hours con
+las horas aprobadas de ese año (cero al empezar) y total_hours_completed con
+todas las horas aprobadas dentro de la vigencia de la beca. Se ejecuta por lotes
+de ids, un UPDATE por lote; también corrige el progreso después de cargas
+masivas de horas.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users import scholarships
+
+
+class Command(BaseCommand):
+    help = 'Reinicia las horas del año académico de las becas y recalcula los totales'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=None,
+                            help='Año académico que empieza (por defecto el actual)')
+        parser.add_argument('--batch-size', type=int, default=scholarships.BATCH_SIZE, help='Becas por UPDATE')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor que 0')
+
+        year = options['year'] or scholarships.current_academic_year()
+        started = time.perf_counter()
+        updated = scholarships.recompute(year=year, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {updated} becas actualizadas al año académico {year} en {time.perf_counter() - started:.1f}s'
+        ))
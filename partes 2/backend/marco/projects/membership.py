@@ -0,0 +1,85 @@
+"""
+Membresía de proyectos.
+
+Todas las consultas y cambios de miembros pasan por la tabla intermedia de
+Project.members, que tiene un índice único sobre (project_id, user_id): las
+verificaciones son un `exists()` indexado y nunca cargan la lista de miembros.
+Las altas y bajas son idempotentes y recalculan `current_participants` con un
+único UPDATE, de modo que el contador no se desincroniza con los miembros.
+"""
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Project
+
+
+Membership = Project.members.through
+
+BATCH_SIZE = 1000
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
+
+
+def is_member(project, user):
+    """Verifica si el usuario es miembro del proyecto"""
+    return Membership.objects.filter(project_id=_pk(project), user_id=_pk(user)).exists()
+
+
+def sync_participants(project_ids):
+    """
+    Recalcula `current_participants` de los proyectos indicados en un solo UPDATE
+    """
+    members_count = Membership.objects.filter(
+        project_id=OuterRef('pk')
+    ).values('project_id').annotate(total=Count('id')).values('total')
+
+    Project.objects.filter(id__in=project_ids).update(
+        current_participants=Coalesce(Subquery(members_count), 0)
+    )
+
+
+def add_memberships(pairs):
+    """
+    Agrega miembros en lote a partir de pares (proyecto, usuario).
+    Los pares que ya existen se ignoran.
+    """
+    rows = [Membership(project_id=_pk(project), user_id=_pk(user)) for project, user in pairs]
+    if not rows:
+        return
+    Membership.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    sync_participants({row.project_id for row in rows})
+
+
+def add_member(project, user):
+    """
+    Agrega un miembro al proyecto si no lo es ya.
+    Retorna True si se agregó y actualiza el contador de `project` en memoria.
+    """
+    if is_member(project, user):
+        return False
+
+    add_memberships([(project, user)])
+    _refresh_participants(project)
+    return True
+
+
+def remove_member(project, user):
+    """
+    Quita un miembro del proyecto si lo es.
+    Retorna True si se quitó y actualiza el contador de `project` en memoria.
+    """
+    deleted, _ = Membership.objects.filter(project_id=_pk(project), user_id=_pk(user)).delete()
+    if not deleted:
+        return False
+
+    sync_participants([_pk(project)])
+    _refresh_participants(project)
+    return True
+
+
+def _refresh_participants(project):
+    if isinstance(project, Project):
+        project.refresh_from_db(fields=['current_participants'])
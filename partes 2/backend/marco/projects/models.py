@@ -107,13 +107,19 @@ class Project(models.Model):
         """Calcula las plazas disponibles"""
         return max(0, self.max_participants - self.current_participants)
     
-    def is_accepting_applications(self):
-        """Verifica si el proyecto está aceptando aplicaciones"""
+    def is_convocatoria_open(self):
+        """Verifica si la convocatoria está abierta, aunque ya no queden plazas"""
         from django.utils import timezone
         return (
             self.visibility == 'convocatoria' and
             self.is_active and
-            timezone.now() <= self.end_date and
+            timezone.now() <= self.end_date
+        )
+    
+    def is_accepting_applications(self):
+        """Verifica si el proyecto está aceptando aplicaciones"""
+        return (
+            self.is_convocatoria_open() and
             self.get_available_spots() > 0
         )
     
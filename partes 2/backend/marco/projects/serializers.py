@@ -57,6 +57,9 @@ class ProjectListSerializer(serializers.ModelSerializer):
         return obj.is_accepting_applications()
     
     def get_applications_count(self, obj):
+        # Anotado por las vistas de listado; sin anotación se cuenta por fila
+        if hasattr(obj, 'applications_count'):
+            return obj.applications_count
         return obj.applications.count()
 
 
@@ -211,7 +214,8 @@ class ConvocatoriaSerializer(serializers.ModelSerializer):
         return obj.get_duration_days()
     
     def get_requirements_count(self, obj):
-        return obj.requirements.count()
+        # Usa los requisitos precargados por ConvocatoriaListView
+        return len(obj.requirements.all())
 
 
 class ProjectStatsSerializer(serializers.ModelSerializer):
@@ -235,26 +239,21 @@ class ProjectStatsSerializer(serializers.ModelSerializer):
             'total_hours_logged', 'is_active'
         ]
     
+    # Los conteos y las horas los anota ProjectStatsView
     def get_applications_count(self, obj):
-        return obj.applications.count()
+        return obj.applications_count
     
     def get_approved_applications_count(self, obj):
-        return obj.applications.filter(status='approved').count()
+        return obj.approved_applications_count
     
     def get_pending_applications_count(self, obj):
-        return obj.applications.filter(status='pending').count()
+        return obj.pending_applications_count
     
     def get_completed_applications_count(self, obj):
-        return obj.applications.filter(status='completed').count()
+        return obj.completed_applications_count
     
     def get_total_hours_logged(self, obj):
-        from hours.models import HourLog
-        return HourLog.objects.filter(
-            project=obj,
-            status='approved'
-        ).aggregate(
-            total=models.Sum('hours')
-        )['total'] or 0
+        return obj.total_hours_logged
 
 
 class ProjectMemberSerializer(serializers.ModelSerializer):
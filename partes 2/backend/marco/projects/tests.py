@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from . import membership
+from .models import Project
+
+
+class MembershipTests(TestCase):
+    """Altas y bajas idempotentes que mantienen current_participants igual a los miembros"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', password='admin12345', carnet='ADM1', user_type='admin'
+        )
+        self.students = [
+            User.objects.create_user(
+                username=f'estudiante{i}', password='estudiante123', carnet=f'EST{i}', user_type='student'
+            )
+            for i in range(3)
+        ]
+        now = timezone.now()
+        self.projects = [
+            Project.objects.create(
+                name=f'Proyecto {i}', description='Proyecto de prueba', manager=self.admin, max_hours=40,
+                start_date=now, end_date=now + timedelta(days=60)
+            )
+            for i in range(2)
+        ]
+
+    def participants(self, project):
+        project.refresh_from_db(fields=['current_participants'])
+        return project.current_participants
+
+    def test_add_memberships_ignores_existing_pairs(self):
+        first, second = self.projects
+        membership.add_member(first, self.students[0])
+
+        membership.add_memberships([
+            (first, self.students[0]), (first, self.students[1]), (second.pk, self.students[2].pk)
+        ])
+
+        self.assertEqual(self.participants(first), 2)
+        self.assertEqual(self.participants(second), 1)
+        self.assertTrue(membership.is_member(second, self.students[2]))
+
+    def test_add_and_remove_are_idempotent(self):
+        project = self.projects[0]
+
+        self.assertTrue(membership.add_member(project, self.students[0]))
+        self.assertFalse(membership.add_member(project, self.students[0]))
+        self.assertEqual(project.current_participants, 1)
+
+        self.assertTrue(membership.remove_member(project, self.students[0]))
+        self.assertFalse(membership.remove_member(project, self.students[0]))
+        self.assertEqual(project.current_participants, 0)
+
+    def test_sync_participants_recounts_from_members(self):
+        project = self.projects[0]
+        project.members.add(*self.students)
+        Project.objects.filter(pk=project.pk).update(current_participants=10)
+
+        with self.assertNumQueries(1):
+            membership.sync_participants([project.pk, self.projects[1].pk])
+
+        self.assertEqual(self.participants(project), 3)
+        self.assertEqual(self.participants(self.projects[1]), 0)
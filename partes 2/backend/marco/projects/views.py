@@ -1,11 +1,18 @@
+from decimal import Decimal
+
 from rest_framework import generics, status, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.db.models import Count, DecimalField, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
 
+from . import membership
 from .models import Project, ProjectCategory, ProjectRequirement, ProjectDocument
+from hours.models import HourLog
+from users import progress
 from users.models import User
 from .serializers import (
     ProjectListSerializer, ProjectDetailSerializer, ProjectCreateSerializer,
@@ -48,7 +55,7 @@ class ProjectListView(generics.ListCreateAPIView):
                 is_active=True
             )
         
-        return queryset.select_related('manager').prefetch_related('applications')
+        return queryset.select_related('manager').annotate(applications_count=Count('applications'))
 
 
 class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -72,8 +79,10 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
                 is_active=True
             )
         
+        # Los miembros se serializan con sus horas y proyectos completados
         return queryset.select_related('manager').prefetch_related(
-            'members', 'requirements', 'documents', 'applications'
+            Prefetch('members', queryset=progress.with_progress(User.objects.all())),
+            'requirements', 'documents'
         )
     
     def update(self, request, *args, **kwargs):
@@ -124,7 +133,7 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     def perform_destroy(self, instance):
         # Solo admins o el manager del proyecto pueden eliminar
         if self.request.user.user_type != 'admin' and instance.manager != self.request.user:
-            raise permissions.PermissionDenied("No tienes permisos para eliminar este proyecto")
+            raise PermissionDenied("No tienes permisos para eliminar este proyecto")
         instance.delete()
 
 
@@ -138,7 +147,7 @@ class ProjectCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         # Solo admins pueden crear proyectos
         if self.request.user.user_type != 'admin':
-            raise permissions.PermissionDenied("Solo los administradores pueden crear proyectos")
+            raise PermissionDenied("Solo los administradores pueden crear proyectos")
         
         serializer.save(manager=self.request.user)
 
@@ -170,9 +179,21 @@ class ProjectStatsView(generics.ListAPIView):
     
     def get_queryset(self):
         if self.request.user.user_type != 'admin':
-            raise permissions.PermissionDenied("Solo los administradores pueden ver estadísticas")
+            raise PermissionDenied("Solo los administradores pueden ver estadísticas")
         
-        return Project.objects.all().select_related('manager').prefetch_related('applications')
+        # Horas en subconsulta para que las filas de horas no multipliquen los conteos;
+        # con agregados Meta.ordering no se aplica, así que se ordena explícitamente
+        total_hours = HourLog.objects.filter(
+            project_id=OuterRef('pk'),
+            status='approved'
+        ).order_by().values('project_id').annotate(total=Sum('hours')).values('total')
+        return Project.objects.all().select_related('manager').annotate(
+            applications_count=Count('applications'),
+            approved_applications_count=Count('applications', filter=Q(applications__status='approved')),
+            pending_applications_count=Count('applications', filter=Q(applications__status='pending')),
+            completed_applications_count=Count('applications', filter=Q(applications__status='completed')),
+            total_hours_logged=Coalesce(Subquery(total_hours), Value(Decimal('0')), output_field=DecimalField()),
+        ).order_by('-created_at')
 
 
 class ProjectCategoryListView(generics.ListCreateAPIView):
@@ -186,7 +207,7 @@ class ProjectCategoryListView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         # Solo admins pueden crear categorías
         if self.request.user.user_type != 'admin':
-            raise permissions.PermissionDenied("Solo los administradores pueden crear categorías")
+            raise PermissionDenied("Solo los administradores pueden crear categorías")
         
         serializer.save()
 
@@ -217,7 +238,7 @@ class ProjectRequirementListView(generics.ListCreateAPIView):
         
         # Solo el manager del proyecto puede agregar requisitos
         if project.manager != self.request.user:
-            raise permissions.PermissionDenied("Solo el manager del proyecto puede agregar requisitos")
+            raise PermissionDenied("Solo el manager del proyecto puede agregar requisitos")
         
         serializer.save(project=project)
 
@@ -257,7 +278,7 @@ class ProjectDocumentListView(generics.ListCreateAPIView):
         
         # Solo el manager del proyecto puede agregar documentos
         if project.manager != self.request.user:
-            raise permissions.PermissionDenied("Solo el manager del proyecto puede agregar documentos")
+            raise PermissionDenied("Solo el manager del proyecto puede agregar documentos")
         
         serializer.save(project=project)
 
@@ -300,7 +321,7 @@ def project_dashboard_stats(request):
         }
         
         # Proyectos más populares (con más aplicaciones)
-        popular_projects = Project.objects.annotate(
+        popular_projects = Project.objects.select_related('manager').annotate(
             applications_count=Count('applications')
         ).order_by('-applications_count')[:5]
         
@@ -372,17 +393,19 @@ def add_project_member(request, project_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Verificar que no exceda el máximo de participantes
-    if project.current_participants >= project.max_participants:
-        return Response(
-            {'error': 'El proyecto ha alcanzado el máximo de participantes'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Agregar miembro
-    project.members.add(user)
-    project.current_participants += 1
-    project.save()
+    with transaction.atomic():
+        project = Project.objects.select_for_update().get(pk=project.pk)
+        
+        # Verificar que no exceda el máximo de participantes
+        if (not membership.is_member(project, user) and
+                project.current_participants >= project.max_participants):
+            return Response(
+                {'error': 'El proyecto ha alcanzado el máximo de participantes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Agregar miembro (no hace nada si ya lo es)
+        membership.add_member(project, user)
     
     serializer = ProjectDetailSerializer(project)
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -403,11 +426,14 @@ def remove_project_member(request, project_id, user_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Remover miembro
-    project.members.remove(user)
-    project.current_participants = max(0, project.current_participants - 1)
-    project.save()
+    from applications.waitlist import promote_waitlisted
     
+    with transaction.atomic():
+        # Remover miembro y ocupar la plaza liberada con la lista de espera
+        if membership.remove_member(project, user):
+            promote_waitlisted(project)
+    
+    project.refresh_from_db()
     serializer = ProjectDetailSerializer(project)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -500,27 +526,31 @@ def join_project(request, project_id):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    if project.current_participants >= project.max_participants:
-        return Response(
-            {'error': 'El proyecto ya tiene el máximo de participantes'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
     # Verificar si el usuario ya es miembro
-    if project.members.filter(id=request.user.id).exists():
+    if membership.is_member(project, request.user):
         return Response(
             {'error': 'Ya estás inscrito en este proyecto'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Verificar si hay una aplicación aprobada
+    # Verificar si hay una aplicación aprobada (o ya en lista de espera)
     from applications.models import Application
+    from applications import waitlist
     application = Application.objects.filter(
         user=request.user,
         project=project,
-        status='approved'
+        status__in=['approved', 'waitlisted']
     ).first()
     
+    if application and application.status == 'waitlisted':
+        return Response(
+            {
+                'error': 'Ya estás en la lista de espera de este proyecto',
+                'waitlist_position': waitlist.get_position(application)
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     # Si no hay aplicación aprobada, verificar si el proyecto permite unirse directamente
     if not application and project.visibility != 'published':
         return Response(
@@ -528,10 +558,26 @@ def join_project(request, project_id):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Agregar miembro al proyecto
-    project.members.add(request.user)
-    project.current_participants += 1
-    project.save()
+    with transaction.atomic():
+        # Bloquear el proyecto para que dos inscripciones simultáneas no superen el cupo
+        project = Project.objects.select_for_update().get(pk=project.pk)
+        
+        if project.current_participants >= project.max_participants:
+            # Con una aplicación aprobada, el estudiante pasa a la lista de espera
+            if application:
+                waitlist.enqueue(application)
+                return Response({
+                    'message': 'El proyecto está lleno, has sido agregado a la lista de espera',
+                    'waitlist_position': waitlist.get_position(application)
+                }, status=status.HTTP_202_ACCEPTED)
+            
+            return Response(
+                {'error': 'El proyecto ya tiene el máximo de participantes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Agregar miembro al proyecto
+        membership.add_member(project, request.user)
     
     return Response({
         'message': 'Te has unido al proyecto exitosamente',
@@ -560,17 +606,20 @@ def leave_project(request, project_id):
         )
     
     # Verificar si el usuario es miembro
-    if not project.members.filter(id=request.user.id).exists():
+    if not membership.is_member(project, request.user):
         return Response(
             {'error': 'No estás inscrito en este proyecto'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Remover miembro del proyecto
-    project.members.remove(request.user)
-    project.current_participants = max(0, project.current_participants - 1)
-    project.save()
+    from applications.waitlist import promote_waitlisted
+    
+    with transaction.atomic():
+        # Remover miembro del proyecto y ocupar la plaza liberada con la lista de espera
+        if membership.remove_member(project, request.user):
+            promote_waitlisted(project)
     
+    project.refresh_from_db()
     return Response({
         'message': 'Has salido del proyecto exitosamente',
         'project': ProjectDetailSerializer(project).data
@@ -591,7 +640,7 @@ def is_member(request, project_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    is_member = project.members.filter(id=request.user.id).exists()
+    is_member = membership.is_member(project, request.user)
     
     return Response({
         'is_member': is_member,
@@ -610,12 +659,12 @@ def my_projects(request):
         projects = Project.objects.filter(
             members=request.user,
             is_active=True
-        ).select_related('manager').prefetch_related('members', 'applications')
+        ).select_related('manager').annotate(applications_count=Count('applications')).order_by('-created_at')
     else:
         # Proyectos que el admin gestiona
         projects = Project.objects.filter(
             manager=request.user
-        ).select_related('manager').prefetch_related('members', 'applications')
+        ).select_related('manager').annotate(applications_count=Count('applications')).order_by('-created_at')
     
     serializer = ProjectListSerializer(projects, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -631,7 +680,9 @@ def public_projects(request):
     projects = Project.objects.filter(
         Q(visibility='published') | Q(visibility='convocatoria'),
         is_active=True
-    ).select_related('manager').prefetch_related('members')[:6]  # Limitar a 6 proyectos
+    ).select_related('manager').annotate(
+        applications_count=Count('applications')
+    ).order_by('-created_at')[:6]  # Limitar a 6 proyectos
     
     serializer = ProjectListSerializer(projects, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:15
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_tokens(apps, schema_editor):
+    # Copia de users.search.tokens_for para no depender del código actual
+    User = apps.get_model('users', 'User')
+    StudentSearchToken = apps.get_model('users', 'StudentSearchToken')
+    tokens = []
+    for user in User.objects.filter(user_type='student').iterator():
+        words = ' '.join([user.carnet or '', user.first_name or '', user.last_name or ''])
+        words = ''.join(
+            char for char in unicodedata.normalize('NFKD', words) if not unicodedata.combining(char)
+        ).lower()
+        tokens.extend(
+            StudentSearchToken(user_id=user.pk, token=token)
+            for token in {word[:150] for word in re.findall(r'[^\W_]+', words)}
+        )
+    StudentSearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_scholarship_percentage_user_scholarship_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=150, verbose_name='Token')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Token de Búsqueda',
+                'verbose_name_plural': 'Tokens de Búsqueda',
+                'unique_together': {('token', 'user')},
+            },
+        ),
+        migrations.RunPython(seed_tokens, migrations.RunPython.noop),
+    ]
@@ -89,6 +89,12 @@ class User(AbstractUser):
         verbose_name='Activo'
     )
     
+    token_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Versión de Tokens',
+        help_text='Se incrementa al cambiar el tipo o el estado del usuario; invalida los tokens emitidos antes'
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -108,6 +114,39 @@ class User(AbstractUser):
             return f"{self.first_name} {self.last_name}".strip()
         return self.username
     
+    def save(self, *args, **kwargs):
+        from .authentication import TOKEN_VERSION_FIELDS, invalidate_token_version
+        from .search import INDEXED_FIELDS, index_users
+        update_fields = kwargs.get('update_fields')
+        
+        # Cambiar el tipo o desactivar al usuario invalida sus tokens (ver users/authentication.py)
+        version_changed = False
+        if self.pk and not self._state.adding and (
+            update_fields is None or TOKEN_VERSION_FIELDS.intersection(update_fields)
+        ):
+            previous = User.objects.filter(pk=self.pk).values(*TOKEN_VERSION_FIELDS, 'token_version').first()
+            if previous and any(previous[field] != getattr(self, field) for field in TOKEN_VERSION_FIELDS):
+                self.token_version = previous['token_version'] + 1
+                version_changed = True
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | {'token_version'}
+        
+        super().save(*args, **kwargs)
+        
+        if version_changed:
+            invalidate_token_version(self.pk)
+        
+        # Mantener el índice de búsqueda de estudiantes (ver users/search.py)
+        if update_fields is None or INDEXED_FIELDS.intersection(update_fields):
+            index_users([self])
+    
+    def delete(self, *args, **kwargs):
+        from .authentication import invalidate_token_version
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_token_version(user_id)
+        return result
+    
     def get_total_hours(self):
         """Obtiene el total de horas del usuario"""
         from hours.models import HourLog
@@ -133,6 +172,23 @@ class User(AbstractUser):
         ).count()
 
 
+class AuthenticatedUser(User):
+    """
+    Usuario autenticado construido desde los claims del token (id, user_type,
+    is_active) sin consultar la base de datos. Al leer cualquier otro campo se
+    cargan de una vez todos los campos diferidos.
+    """
+    
+    class Meta:
+        proxy = True
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred:
+            fields = set(fields) | deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
 class Scholarship(models.Model):
     """
     Modelo para becas como KEY EXCELLENCE
@@ -183,6 +239,17 @@ class Scholarship(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.scholarship_type})"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # required_hours y el nombre aparecen en el reporte de cumplimiento
+        from .compliance import invalidate
+        invalidate()
+    
+    def delete(self, *args, **kwargs):
+        from .compliance import invalidate
+        invalidate()
+        return super().delete(*args, **kwargs)
 
 
 class UserScholarship(models.Model):
@@ -225,16 +292,28 @@ class UserScholarship(models.Model):
         verbose_name='Fecha de Fin'
     )
     
-    current_year_hours = models.PositiveIntegerField(
+    # Mantenidos por users.scholarships desde las horas aprobadas (HourLog)
+    current_year_hours = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
         default=0,
         verbose_name='Horas del Año Actual'
     )
     
-    total_hours_completed = models.PositiveIntegerField(
+    total_hours_completed = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
         default=0,
         verbose_name='Total de Horas Completadas'
     )
     
+    academic_year = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name='Año Académico',
+        help_text='Año académico al que corresponden las horas del año actual'
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -247,12 +326,51 @@ class UserScholarship(models.Model):
     def __str__(self):
         return f"{self.user.full_name} - {self.scholarship.name}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Las fechas de vigencia definen qué horas cuentan: recalcular desde HourLog
+        from .scholarships import recompute
+        recompute(UserScholarship.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['current_year_hours', 'total_hours_completed', 'academic_year'])
+    
+    def delete(self, *args, **kwargs):
+        from .compliance import invalidate
+        invalidate()
+        return super().delete(*args, **kwargs)
+    
     def get_progress_percentage(self):
         """Calcula el porcentaje de progreso de la beca"""
         if self.scholarship.required_hours == 0:
             return 0
-        return (self.current_year_hours / self.scholarship.required_hours) * 100
+        return (float(self.current_year_hours) / self.scholarship.required_hours) * 100
     
     def get_remaining_hours(self):
         """Calcula las horas restantes para completar la beca"""
-        return max(0, self.scholarship.required_hours - self.current_year_hours)
+        return max(0, self.scholarship.required_hours - float(self.current_year_hours))
+
+
+class StudentSearchToken(models.Model):
+    """
+    Token normalizado (carnet o palabra del nombre) para la búsqueda por prefijo de estudiantes
+    """
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name='Usuario'
+    )
+    
+    token = models.CharField(
+        max_length=150,
+        verbose_name='Token'
+    )
+    
+    class Meta:
+        verbose_name = 'Token de Búsqueda'
+        verbose_name_plural = 'Tokens de Búsqueda'
+        # El índice único (token, user) sirve para recorrer un rango de prefijo en orden
+        unique_together = ['token', 'user']
+    
+    def __str__(self):
+        return f"{self.token} ({self.user_id})"
@@ -0,0 +1,310 @@
+"""
+Alta masiva de estudiantes desde un CSV.
+
+El CSV lleva encabezados con los mismos campos que el alta individual:
+carnet (requerido), first_name, last_name, username, email, password,
+scholarship_type y scholarship_percentage. Sin password se genera una
+contraseña temporal; sin username se deriva de nombre y apellido (o del carnet)
+como en SimpleStudentRegistrationSerializer.
+
+Todo el lote se valida antes de escribir: los carnets contra un conjunto
+precargado con una consulta por lote, los usernames se asignan con
+users.usernames (una consulta de prefijos por lote) y las filas se insertan con
+bulk_create en una transacción.
+
+Los hashes usan el hasher preferido de PASSWORD_HASHERS (scrypt con el perfil
+por defecto de users.hashers), que cuesta CPU y memoria por contraseña. El
+comando import_students los calcula en un pool de procesos; desde la vista web
+se calculan en el mismo proceso (no se bifurca el worker) y el archivo se
+limita a MAX_REQUEST_ROWS filas.
+"""
+
+import csv
+import io
+import os
+import re
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from . import search, usernames
+from .models import User
+
+
+BATCH_SIZE = 500
+
+# Con menos contraseñas que esto no compensa levantar procesos
+MIN_PARALLEL_PASSWORDS = 50
+
+# Filas aceptadas en una carga desde la web; archivos más grandes van por el comando
+MAX_REQUEST_ROWS = getattr(settings, 'ONBOARDING_MAX_REQUEST_ROWS', 500)
+
+CARNET_PATTERN = re.compile(r'^[A-Z0-9]+$')
+
+COLUMNS = [
+    'carnet', 'first_name', 'last_name', 'username', 'email', 'password',
+    'scholarship_type', 'scholarship_percentage',
+]
+
+
+class OnboardingError(Exception):
+    """El archivo no se puede leer como CSV de estudiantes"""
+
+
+def read_rows(file):
+    """Filas del CSV (bytes o texto) como diccionarios con las columnas conocidas"""
+    content = file.read()
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise OnboardingError('El archivo debe estar codificado en UTF-8')
+
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames or 'carnet' not in [name.strip() for name in reader.fieldnames]:
+        raise OnboardingError('El CSV debe tener encabezados y al menos la columna carnet')
+
+    return [
+        {column: (row.get(column) or '').strip() for column in COLUMNS}
+        for row in ({(key or '').strip(): value for key, value in raw.items()} for raw in reader)
+    ]
+
+
+def _init_worker():
+    # Con spawn (macOS/Windows) los procesos hijos arrancan sin Django configurado
+    import django
+    django.setup()
+
+
+def default_workers():
+    """Procesos para los hashes del comando import_students"""
+    return getattr(settings, 'ONBOARDING_HASH_WORKERS', None) or os.cpu_count() or 1
+
+
+def hash_passwords(passwords, workers=1):
+    """make_password para cada contraseña, en `workers` procesos cuando son muchas"""
+    if workers <= 1 or len(passwords) < MIN_PARALLEL_PASSWORDS:
+        return [make_password(password) for password in passwords]
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        chunksize = max(len(passwords) // (workers * 4), 1)
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def _is_email(value):
+    try:
+        validate_email(value)
+    except ValidationError:
+        return False
+    return True
+
+
+def _validate(rows):
+    """
+    Normaliza y valida cada fila. Retorna (filas válidas, errores); cada error es
+    {'line', 'carnet', 'error'} con la línea del CSV (la 1 es el encabezado).
+    """
+    errors = []
+    valid = []
+    seen_carnets = set()
+    seen_usernames = set()
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        for row in batch:
+            row['carnet'] = row['carnet'].upper()
+
+        existing_carnets = set(User.objects.filter(
+            carnet__in=[row['carnet'] for row in batch]
+        ).values_list('carnet', flat=True))
+        existing_usernames = set(User.objects.filter(
+            username__in=[row['username'] for row in batch if row['username']]
+        ).values_list('username', flat=True))
+
+        for index, row in enumerate(batch, start=start + 2):
+            error = None
+            if not row['carnet']:
+                error = 'El carnet es requerido.'
+            elif len(row['carnet']) > 20 or not CARNET_PATTERN.match(row['carnet']):
+                error = 'El carnet debe contener solo letras mayúsculas y números (máximo 20).'
+            elif row['carnet'] in existing_carnets:
+                error = 'Ya existe un usuario con este carnet.'
+            elif row['carnet'] in seen_carnets:
+                error = 'El carnet está repetido en el archivo.'
+            elif row['email'] and not _is_email(row['email']):
+                error = 'El email no es válido.'
+            elif ' ' in row['username']:
+                error = 'El nombre de usuario no puede contener espacios.'
+            elif len(row['username']) > 150:
+                error = 'El nombre de usuario no puede tener más de 150 caracteres.'
+            elif row['username'] and (row['username'] in existing_usernames or row['username'] in seen_usernames):
+                error = 'Ya existe un usuario con este nombre de usuario.'
+            elif row['password'] and len(row['password']) < 8:
+                error = 'La contraseña debe tener al menos 8 caracteres.'
+            else:
+                try:
+                    percentage = Decimal(row['scholarship_percentage'] or '100')
+                except InvalidOperation:
+                    percentage = None
+                if percentage is None or not percentage.is_finite() or not 0 <= percentage <= 100:
+                    error = 'El porcentaje de beca debe estar entre 0 y 100.'
+                else:
+                    row['scholarship_percentage'] = percentage
+
+            if error:
+                errors.append({'line': index, 'carnet': row['carnet'], 'error': error})
+                continue
+            row['line'] = index
+            seen_carnets.add(row['carnet'])
+            if row['username']:
+                seen_usernames.add(row['username'])
+            valid.append(row)
+
+    return valid, errors
+
+
+def _assign_usernames(rows):
+    """Asigna username a las filas generadas, con una consulta de prefijos por lote"""
+    assigned = {row['username'] for row in rows if not row['generated']}
+    pending = [row for row in rows if row['generated']]
+    for start in range(0, len(pending), BATCH_SIZE):
+        batch = pending[start:start + BATCH_SIZE]
+        bases = [usernames.derive_base(row['first_name'], row['last_name'], row['carnet']) for row in batch]
+        taken = usernames.taken(bases) | assigned
+        for row, base in zip(batch, bases):
+            row['username'] = usernames.next_free(base, taken)
+            taken.add(row['username'])
+            assigned.add(row['username'])
+
+
+def _conflicts(rows):
+    """
+    Errores de las filas cuyo carnet o username explícito ya existe (creados
+    por otra transacción después de validar); reintentar no los resuelve
+    """
+    errors = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        taken_carnets = set(User.objects.filter(
+            carnet__in=[row['carnet'] for row in batch]
+        ).values_list('carnet', flat=True))
+        taken_usernames = set(User.objects.filter(
+            username__in=[row['username'] for row in batch if not row['generated']]
+        ).values_list('username', flat=True))
+        for row in batch:
+            if row['carnet'] in taken_carnets:
+                error = 'Ya existe un usuario con este carnet.'
+            elif not row['generated'] and row['username'] in taken_usernames:
+                error = 'Ya existe un usuario con este nombre de usuario.'
+            else:
+                continue
+            errors.append({'line': row['line'], 'carnet': row['carnet'], 'error': error})
+    return errors
+
+
+def _generated_taken(rows):
+    """Si algún username generado ya existe (lo tomó otra transacción)"""
+    generated = [row['username'] for row in rows if row['generated']]
+    return any(
+        User.objects.filter(username__in=generated[start:start + BATCH_SIZE]).exists()
+        for start in range(0, len(generated), BATCH_SIZE)
+    )
+
+
+def import_students(file, dry_run=False, skip_invalid=False, workers=1, max_rows=None):
+    """
+    Crea los estudiantes del CSV. Con errores de validación no crea nada, salvo
+    que `skip_invalid` indique crear las filas válidas. Con `max_rows`, un
+    archivo con más filas se rechaza con OnboardingError.
+
+    Retorna {'created', 'errors', 'students'}; `students` trae carnet, username y
+    la contraseña temporal de cada fila creada (o que se crearía con `dry_run`).
+    """
+    rows = read_rows(file)
+    if max_rows is not None and len(rows) > max_rows:
+        raise OnboardingError(
+            f'El archivo tiene {len(rows)} filas; para más de {max_rows} use python manage.py import_students'
+        )
+
+    rows, errors = _validate(rows)
+    if errors and not skip_invalid:
+        return {'created': 0, 'errors': errors, 'students': []}
+
+    for row in rows:
+        row['generated'] = not row['username']
+        row['password'] = row['password'] or secrets.token_urlsafe(9)
+    _assign_usernames(rows)
+
+    if dry_run or not rows:
+        return {'created': 0, 'errors': errors, 'students': _credentials(rows)}
+
+    hashes = hash_passwords([row['password'] for row in rows], workers=workers)
+
+    # Otra transacción puede crear un carnet, un username explícito o un username
+    # generado entre la validación y el INSERT. Los dos primeros pasan a ser errores
+    # de fila; si chocó un username generado, se vuelven a asignar. Cualquier otra
+    # violación de integridad no se resuelve reintentando y se propaga
+    for _ in range(usernames.MAX_ATTEMPTS):
+        try:
+            _insert(rows, hashes)
+            break
+        except IntegrityError:
+            conflicts = _conflicts(rows)
+            if not conflicts:
+                if not _generated_taken(rows):
+                    raise
+                _assign_usernames(rows)
+                continue
+
+            errors = sorted(errors + conflicts, key=lambda error: error['line'])
+            if not skip_invalid:
+                return {'created': 0, 'errors': errors, 'students': []}
+            conflicting = {error['line'] for error in conflicts}
+            kept = [index for index, row in enumerate(rows) if row['line'] not in conflicting]
+            rows = [rows[index] for index in kept]
+            hashes = [hashes[index] for index in kept]
+            if not rows:
+                return {'created': 0, 'errors': errors, 'students': []}
+    else:
+        raise OnboardingError('No se pudieron asignar usernames libres; intente de nuevo')
+
+    return {'created': len(rows), 'errors': errors, 'students': _credentials(rows)}
+
+
+def _credentials(rows):
+    return [
+        {'carnet': row['carnet'], 'username': row['username'], 'temp_password': row['password']}
+        for row in rows
+    ]
+
+
+def _insert(rows, hashes):
+    users = [
+        User(
+            username=row['username'],
+            password=password_hash,
+            temp_password=row['password'],
+            first_name=row['first_name'],
+            last_name=row['last_name'],
+            email=row['email'] or None,
+            carnet=row['carnet'],
+            user_type='student',
+            scholarship_type=row['scholarship_type'] or 'KEY EXCELLENCE',
+            scholarship_percentage=row['scholarship_percentage'],
+        )
+        for row, password_hash in zip(rows, hashes)
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        # Releer por carnet: no todos los backends retornan los ids de bulk_create
+        for start in range(0, len(rows), BATCH_SIZE):
+            carnets = [row['carnet'] for row in rows[start:start + BATCH_SIZE]]
+            search.index_users(User.objects.filter(carnet__in=carnets))
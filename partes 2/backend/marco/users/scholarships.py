@@ -0,0 +1,118 @@
+"""
+Progreso de becas calculado desde las horas aprobadas.
+
+UserScholarship.total_hours_completed suma las horas aprobadas del estudiante
+con fecha dentro de la vigencia de la beca (start_date..end_date) y
+current_year_hours las de esas que caen en `academic_year`. El año académico
+empieza en ACADEMIC_YEAR_START_MONTH (enero por defecto).
+
+Cada cambio de un HourLog (revisión, edición o borrado) aplica la diferencia de
+horas aprobadas con un UPDATE atómico sobre las becas del estudiante; los
+borrados, también en cascada desde proyectos, aplicaciones o usuarios, llegan
+por la señal post_delete de hours/signals.py. recompute recalcula ambos campos
+desde HourLog por lotes de ids, con un UPDATE con subconsultas por lote; es el
+cierre de año (rollover_scholarships) y sirve también después de cargas
+masivas con bulk_create o update, que no pasan por HourLog.save.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from hours.models import HourLog
+from . import compliance
+from .models import UserScholarship
+
+
+ACADEMIC_YEAR_START_MONTH = getattr(settings, 'ACADEMIC_YEAR_START_MONTH', 1)
+
+BATCH_SIZE = 1000
+
+HOURS_FIELD = DecimalField(max_digits=8, decimal_places=2)
+
+
+def academic_year(day):
+    """Año académico (el año en que empieza) de una fecha"""
+    return day.year if day.month >= ACADEMIC_YEAR_START_MONTH else day.year - 1
+
+
+def academic_year_bounds(year):
+    """(inicio, fin) del año académico; el fin es exclusivo"""
+    return date(year, ACADEMIC_YEAR_START_MONTH, 1), date(year + 1, ACADEMIC_YEAR_START_MONTH, 1)
+
+
+def current_academic_year():
+    return academic_year(timezone.localdate())
+
+
+def approved_hours(year=None):
+    """
+    Subconsulta para un queryset de UserScholarship: horas aprobadas del
+    estudiante dentro de la vigencia de la beca y, con `year`, de ese año académico
+    """
+    logs = HourLog.objects.filter(
+        user_id=OuterRef('user_id'),
+        status='approved',
+        date__gte=OuterRef('start_date'),
+        date__lte=OuterRef('end_date'),
+    )
+    if year is not None:
+        start, end = academic_year_bounds(year)
+        logs = logs.filter(date__gte=start, date__lt=end)
+    total = logs.order_by().values('user_id').annotate(total=Sum('hours')).values('total')
+    return Coalesce(Subquery(total, output_field=HOURS_FIELD), Value(Decimal('0')), output_field=HOURS_FIELD)
+
+
+def record_change(previous, current):
+    """
+    Aplica a las becas la diferencia de horas aprobadas entre dos estados de un
+    HourLog. Cada estado es None (no existe) o un dict con status, hours, date y
+    user_id. Debe llamarse en la misma transacción que guarda el registro.
+    """
+    deltas = {}
+    for state, sign in ((previous, -1), (current, 1)):
+        if state and state['status'] == 'approved':
+            key = (state['user_id'], state['date'])
+            deltas[key] = deltas.get(key, 0) + sign * state['hours']
+
+    for (user_id, day), delta in deltas.items():
+        if not delta:
+            continue
+        UserScholarship.objects.filter(user_id=user_id, start_date__lte=day, end_date__gte=day).update(
+            total_hours_completed=F('total_hours_completed') + delta,
+            current_year_hours=Case(
+                When(academic_year=academic_year(day), then=F('current_year_hours') + delta),
+                default=F('current_year_hours'),
+            ),
+        )
+        compliance.invalidate(academic_year(day))
+
+
+def recompute(scholarships=None, year=None, batch_size=BATCH_SIZE):
+    """
+    Recalcula current_year_hours (para el año académico `year`, por defecto el
+    actual) y total_hours_completed desde HourLog, por lotes de ids en
+    transacciones separadas. Retorna la cantidad de becas actualizadas.
+    """
+    scholarships = UserScholarship.objects.all() if scholarships is None else scholarships
+    year = current_academic_year() if year is None else year
+
+    bounds = scholarships.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return 0
+
+    updated = 0
+    for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+        with transaction.atomic():
+            updated += scholarships.filter(id__gte=start, id__lt=start + batch_size).update(
+                academic_year=year,
+                current_year_hours=approved_hours(year),
+                total_hours_completed=approved_hours(),
+            )
+    compliance.invalidate()
+    return updated
@@ -0,0 +1,386 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from . import blacklist, onboarding, search
+from .authentication import ClaimsJWTAuthentication, tokens_for_user
+from .models import User
+
+
+class LoginThrottleTests(TestCase):
+    """Token buckets del login: solo los intentos fallidos consumen fichas"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='estudiante', password='estudiante123', carnet='EST1', user_type='student'
+        )
+
+    def login(self, password, username='estudiante'):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password}, format='json')
+
+    def test_failed_attempts_exhaust_the_username_bucket(self):
+        for _ in range(5):
+            self.assertEqual(self.login('incorrecta').status_code, 400)
+
+        response = self.login('estudiante123')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_successful_logins_do_not_consume_tokens(self):
+        for _ in range(10):
+            self.assertEqual(self.login('estudiante123').status_code, 200)
+
+        self.assertEqual(self.login('incorrecta').status_code, 400)
+
+    def test_buckets_are_per_username(self):
+        User.objects.create_user(username='otro', password='otro12345', carnet='EST2', user_type='student')
+        for _ in range(5):
+            self.login('incorrecta')
+
+        self.assertEqual(self.login('otro12345', username='otro').status_code, 200)
+
+
+class BloomFilterTests(TestCase):
+
+    def test_added_values_are_always_found(self):
+        bloom = blacklist.BloomFilter(1000)
+        values = [f'jti-{i}' for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+
+    def test_false_positive_rate_stays_near_the_target(self):
+        bloom = blacklist.BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+
+        false_positives = sum(f'otro-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenBlacklistTests(TestCase):
+    """Blacklist de refresh tokens: rotación, logout y filas agregadas por otros procesos"""
+
+    def setUp(self):
+        blacklist.index.reset()
+        self.addCleanup(blacklist.index.reset)
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='estudiante', password='estudiante123', carnet='EST1', user_type='student'
+        )
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        token = tokens_for_user(self.user)
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_logout_blacklists_the_token(self):
+        token = tokens_for_user(self.user)
+        self.client.force_authenticate(self.user)
+
+        response = self.client.post('/api/auth/logout/', {'refresh': str(token)}, format='json')
+
+        self.assertEqual(response.status_code, 205)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_checks_skip_the_database_between_syncs(self):
+        self.refresh(tokens_for_user(self.user))
+        token = tokens_for_user(self.user)
+
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                blacklist.RefreshToken(str(token)).check_blacklist()
+
+    def test_rows_from_other_processes_are_read_on_sync(self):
+        token = tokens_for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        other = tokens_for_user(self.user)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=other['jti']))
+
+        with mock.patch.object(blacklist, 'SYNC_INTERVAL', 0):
+            self.assertEqual(self.refresh(other).status_code, 401)
+
+    def test_prune_expired_removes_only_expired_tokens(self):
+        expired = tokens_for_user(self.user)
+        expired.blacklist()
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+        current = tokens_for_user(self.user)
+
+        self.assertEqual(blacklist.prune_expired(), (1, 1))
+        self.assertTrue(OutstandingToken.objects.filter(jti=current['jti']).exists())
+        self.assertEqual(self.refresh(current).status_code, 200)
+
+
+class StudentSearchTests(TestCase):
+    """Búsqueda por prefijo sobre el índice de tokens de StudentSearchToken"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', password='admin12345', carnet='ADM1', user_type='admin',
+            first_name='Ana', last_name='Admin'
+        )
+
+    def student(self, carnet, first_name, last_name):
+        return User.objects.create_user(
+            username=carnet.lower(), password='estudiante123', carnet=carnet, user_type='student',
+            first_name=first_name, last_name=last_name
+        )
+
+    def carnets(self, query, limit=10):
+        return [row['carnet'] for row in search.search_students(query, limit=limit)]
+
+    def test_every_word_must_prefix_a_token_of_the_same_student(self):
+        self.student('EST1', 'Ana', 'García')
+        self.student('EST2', 'Ana', 'López')
+        self.student('EST3', 'Gabriel', 'Ruiz')
+
+        self.assertEqual(self.carnets('ana gar'), ['EST1'])
+        self.assertEqual(self.carnets('gar ana'), ['EST1'])
+        self.assertEqual(sorted(self.carnets('ana')), ['EST1', 'EST2'])
+        self.assertEqual(self.carnets('est3'), ['EST3'])
+
+    def test_accents_and_case_are_ignored(self):
+        self.student('EST1', 'José', 'Núñez')
+
+        self.assertEqual(self.carnets('nunez'), ['EST1'])
+        self.assertEqual(self.carnets('NÚÑ JOSE'), ['EST1'])
+
+    def test_limit_counts_students_not_matching_tokens(self):
+        # Los primeros tokens en orden son de solo dos estudiantes: llenar el límite requiere otra página
+        many_tokens = ' '.join(f'Ma{letter}' for letter in 'abcdefghijk')
+        self.student('EST01', many_tokens, 'Ruiz')
+        self.student('EST02', many_tokens, 'Ruiz')
+        for i in range(3, 8):
+            self.student(f'EST{i:02}', 'Luis', 'Mazo')
+
+        with self.assertNumQueries(3):
+            results = self.carnets('ma', limit=5)
+
+        self.assertEqual(results, ['EST01', 'EST02', 'EST03', 'EST04', 'EST05'])
+        self.assertEqual(len(self.carnets('ma', limit=20)), 7)
+
+    def test_index_follows_user_save(self):
+        user = self.student('EST1', 'Ana', 'García')
+
+        user.last_name = 'Pérez'
+        user.save()
+        self.assertEqual(self.carnets('perez'), ['EST1'])
+        self.assertEqual(self.carnets('garcia'), [])
+
+        user.user_type = 'admin'
+        user.save(update_fields=['user_type'])
+        self.assertEqual(self.carnets('ana'), [])
+
+    def test_only_admins_can_search(self):
+        student = self.student('EST1', 'Ana', 'García')
+        client = APIClient()
+
+        client.force_authenticate(student)
+        self.assertEqual(client.get('/api/auth/admin/students/search/', {'q': 'ana'}).status_code, 403)
+
+        client.force_authenticate(self.admin)
+        response = client.get('/api/auth/admin/students/search/', {'q': 'ana', 'limit': 5})
+        self.assertEqual([row['full_name'] for row in response.data['results']], ['Ana García'])
+
+
+class OnboardingTests(TestCase):
+    """Alta masiva de estudiantes desde CSV"""
+
+    HEADER = 'carnet,first_name,last_name,username,email,password\n'
+
+    def csv(self, *lines):
+        return io.BytesIO((self.HEADER + ''.join(f'{line}\n' for line in lines)).encode('utf-8'))
+
+    def test_valid_csv_creates_students(self):
+        result = onboarding.import_students(self.csv(
+            'est1,Ana,García,,ana@example.com,',
+            'EST2,Ana,Garcia,,,clave12345',
+            'EST3,,,luis,,',
+        ))
+
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(result['errors'], [])
+        self.assertEqual([student['username'] for student in result['students']], ['ana.garcía', 'ana.garcia', 'luis'])
+        student = User.objects.get(carnet='EST1')
+        self.assertEqual(student.user_type, 'student')
+        self.assertTrue(student.check_password(result['students'][0]['temp_password']))
+        self.assertTrue(User.objects.get(carnet='EST2').check_password('clave12345'))
+        self.assertEqual(sorted(row['carnet'] for row in search.search_students('garcia')), ['EST1', 'EST2'])
+
+    def test_validation_errors_create_nothing(self):
+        User.objects.create_user(username='existente', password='clave12345', carnet='EST9', user_type='student')
+
+        result = onboarding.import_students(self.csv(
+            'EST1,Ana,García,,,',
+            'EST1,Luis,Pérez,,,',
+            'EST-2,Eva,Ruiz,,,',
+            'EST9,Eva,Ruiz,,,',
+            'EST3,Eva,Ruiz,,correo-invalido,',
+            'EST4,Eva,Ruiz,existente,,',
+            'EST5,Eva,Ruiz,,,corta',
+        ))
+
+        self.assertEqual(result['created'], 0)
+        self.assertEqual([error['line'] for error in result['errors']], [3, 4, 5, 6, 7, 8])
+        self.assertEqual(result['errors'][0]['error'], 'El carnet está repetido en el archivo.')
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_skip_invalid_creates_the_valid_rows(self):
+        result = onboarding.import_students(self.csv('EST1,Ana,García,,,', 'EST 2,Luis,Pérez,,,'), skip_invalid=True)
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(result['errors'][0]['line'], 3)
+        self.assertTrue(User.objects.filter(carnet='EST1').exists())
+
+    def test_dry_run_writes_nothing(self):
+        result = onboarding.import_students(self.csv('EST1,Ana,García,,,'), dry_run=True)
+
+        self.assertEqual(result['students'][0]['username'], 'ana.garcía')
+        self.assertFalse(User.objects.filter(carnet='EST1').exists())
+
+    def race(self, **fields):
+        """Crea un usuario entre la validación y el INSERT, como otra transacción"""
+        def hash_passwords(passwords, workers=1):
+            User.objects.create_user(password='clave12345', user_type='student', **fields)
+            return [make_password(password) for password in passwords]
+        return mock.patch.object(onboarding, 'hash_passwords', side_effect=hash_passwords)
+
+    def test_race_inserted_carnet_becomes_a_row_error(self):
+        with self.race(username='otro', carnet='EST2'):
+            result = onboarding.import_students(self.csv('EST1,Ana,García,,,', 'EST2,Luis,Pérez,,,'))
+
+        self.assertEqual(result['created'], 0)
+        self.assertEqual(result['errors'], [{'line': 3, 'carnet': 'EST2', 'error': 'Ya existe un usuario con este carnet.'}])
+        self.assertFalse(User.objects.filter(carnet='EST1').exists())
+
+        with self.race(username='otro2', carnet='EST3'):
+            result = onboarding.import_students(
+                self.csv('EST1,Ana,García,,,', 'EST3,Luis,Pérez,,,'), skip_invalid=True
+            )
+        self.assertEqual(result['created'], 1)
+        self.assertTrue(User.objects.filter(carnet='EST1').exists())
+
+    def test_race_inserted_generated_username_is_reassigned(self):
+        with self.race(username='ana.garcía', carnet='OTRO1'):
+            result = onboarding.import_students(self.csv('EST1,Ana,García,,,'))
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(result['students'][0]['username'], 'ana.garcía1')
+
+    def test_other_integrity_errors_are_not_retried(self):
+        with mock.patch.object(onboarding, '_insert', side_effect=IntegrityError('NOT NULL')) as insert:
+            with self.assertRaises(IntegrityError):
+                onboarding.import_students(self.csv('EST1,Ana,García,,,'))
+
+        self.assertEqual(insert.call_count, 1)
+
+    def test_web_upload_is_limited(self):
+        admin = User.objects.create_user(username='admin', password='admin12345', carnet='ADM1', user_type='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        content = self.csv(*(f'EST{i},Ana,García,,,' for i in range(3))).getvalue()
+
+        with mock.patch.object(onboarding, 'MAX_REQUEST_ROWS', 2):
+            response = client.post('/api/auth/admin/students/import/', {
+                'file': SimpleUploadedFile('estudiantes.csv', content, content_type='text/csv')
+            })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(carnet='EST0').exists())
+
+
+class ClaimsAuthenticationTests(TestCase):
+    """Tokens con claims de autorización invalidados por token_version"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='estudiante', password='estudiante123', carnet='EST1', user_type='student'
+        )
+
+    def profile(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client.get('/api/auth/profile/')
+
+    def access(self):
+        return str(tokens_for_user(self.user).access_token)
+
+    def save(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(**kwargs)
+
+    def test_claims_token_authenticates_without_loading_the_user(self):
+        token = self.access()
+        authentication = ClaimsJWTAuthentication()
+        validated = authentication.get_validated_token(token)
+        authentication.get_user(validated)
+
+        with self.assertNumQueries(0):
+            user = authentication.get_user(validated)
+
+        self.assertEqual((user.pk, user.user_type), (self.user.pk, 'student'))
+        self.assertEqual(self.profile(token).status_code, 200)
+
+    def test_changing_user_type_rejects_old_tokens(self):
+        token = self.access()
+        self.assertEqual(self.profile(token).status_code, 200)
+
+        self.user.user_type = 'admin'
+        self.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertEqual(self.profile(token).status_code, 401)
+        self.assertEqual(self.profile(self.access()).status_code, 200)
+
+    def test_deactivating_rejects_old_tokens(self):
+        token = self.access()
+
+        self.user.is_active = False
+        self.save(update_fields=['is_active'])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertEqual(self.profile(token).status_code, 401)
+
+    def test_other_fields_keep_the_version(self):
+        token = self.access()
+        self.profile(token)
+
+        self.user.first_name = 'Ana'
+        self.save(update_fields=['first_name'])
+        self.user.last_name = 'García'
+        self.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 0)
+        self.assertEqual(self.profile(token).status_code, 200)
+
+    def test_legacy_tokens_without_claims_still_authenticate(self):
+        token = str(blacklist.RefreshToken.for_user(self.user).access_token)
+
+        self.assertEqual(self.profile(token).status_code, 200)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.profile(token).status_code, 401)
@@ -0,0 +1,80 @@
+"""
+Throttling del login con token buckets.
+
+Cada bucket (por IP y por username) tiene capacidad para `num_requests`
+intentos y se recarga a num_requests/duration por segundo, según las tasas
+'login_ip' y 'login_username' de DEFAULT_THROTTLE_RATES. Solo los intentos
+fallidos consumen fichas: la ráfaga de logins legítimos al inicio del ciclo no
+se frena, mientras que la fuerza bruta se corta antes de calcular el hash, que
+es lo que consume CPU.
+
+El estado vive en el cache de Django; la lectura y escritura no son atómicas,
+así que con varios procesos el límite es aproximado (y por proceso con el
+LocMemCache por defecto).
+"""
+
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginTokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket: allow_request solo consulta si queda una ficha; la vista
+    llama a consume() cuando el intento falla.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.tokens = self.available(self.key)
+        return self.tokens >= 1
+
+    def available(self, key):
+        """Fichas disponibles en el bucket, recargadas hasta ahora"""
+        tokens, updated_at = self.cache.get(key, (self.num_requests, self.now))
+        refill = (self.now - updated_at) * self.num_requests / self.duration
+        return min(self.num_requests, tokens + refill)
+
+    def consume(self, request, view):
+        """Descuenta una ficha por un intento fallido"""
+        if self.rate is None:
+            return
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return
+
+        self.now = self.timer()
+        tokens = max(self.available(key) - 1, 0)
+        # Tras `duration` segundos sin fallos el bucket vuelve a estar lleno
+        self.cache.set(key, (tokens, self.now), self.duration)
+
+    def wait(self):
+        """Segundos hasta que se recargue una ficha"""
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class LoginIPThrottle(LoginTokenBucketThrottle):
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginUsernameThrottle(LoginTokenBucketThrottle):
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username.strip():
+            return None
+        # El username llega tal cual del cliente: se resume para usarlo como clave
+        ident = hashlib.sha256(username.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
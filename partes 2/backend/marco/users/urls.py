@@ -18,8 +18,11 @@ urlpatterns = [
     
     # Admin student management endpoints
     path('admin/students/create/', views.AdminStudentCreateView.as_view(), name='admin-student-create'),
+    path('admin/students/import/', views.AdminStudentImportView.as_view(), name='admin-student-import'),
+    path('admin/students/search/', views.student_search, name='admin-student-search'),
     path('admin/students/credentials/', views.AdminStudentCredentialsView.as_view(), name='admin-student-credentials'),
     path('admin/students/<int:student_id>/', views.AdminStudentDetailView.as_view(), name='admin-student-detail'),
+    path('admin/scholarships/compliance/', views.ScholarshipComplianceView.as_view(), name='admin-scholarship-compliance'),
     
     # Statistics endpoints
     path('stats/', views.UserStatsView.as_view(), name='user-stats'),
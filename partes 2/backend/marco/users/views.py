@@ -1,13 +1,23 @@
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import Throttled, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.utils.encoders import JSONEncoder
 from django.contrib.auth import authenticate
+from django.http import HttpResponse, StreamingHttpResponse
 from django.db.models import Q
 from django.db import models
 
+from . import compliance, onboarding, progress, search
+from .authentication import tokens_for_user
+from .blacklist import RefreshToken
 from .models import User, Scholarship, UserScholarship
+from .throttling import LoginIPThrottle, LoginUsernameThrottle
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, UserLoginSerializer,
     UserUpdateSerializer, PasswordChangeSerializer, UserProfileSerializer,
@@ -30,7 +40,7 @@ class UserRegistrationView(generics.CreateAPIView):
         user = serializer.save()
         
         # Generar tokens JWT
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         
         return Response({
             'user': UserSerializer(user).data,
@@ -45,17 +55,24 @@ class UserRegistrationView(generics.CreateAPIView):
 class UserLoginView(APIView):
     """
     Vista para login de usuarios
+
+    Los intentos fallidos consumen los token buckets por IP y por username;
+    con alguno vacío se responde 429 sin verificar la contraseña.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
     
     def post(self, request):
         serializer = UserLoginSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        if not serializer.is_valid():
+            for throttle in self.get_throttles():
+                throttle.consume(request, self)
+            raise ValidationError(serializer.errors)
         
         user = serializer.validated_data['user']
         
         # Generar tokens JWT
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         
         return Response({
             'user': UserSerializer(user).data,
@@ -66,6 +83,9 @@ class UserLoginView(APIView):
             'message': 'Login exitoso'
         }, status=status.HTTP_200_OK)
 
+    def throttled(self, request, wait):
+        raise Throttled(wait, detail='Demasiados intentos fallidos de inicio de sesión.')
+
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """
@@ -105,7 +125,9 @@ class StudentListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = User.objects.filter(user_type='student')
+        # Horas aprobadas y proyectos completados anotados en la misma consulta,
+        # por lo que también se puede ordenar (?ordering=-total_hours) y filtrar por ellos
+        queryset = progress.with_progress(User.objects.filter(user_type='student'))
         
         # Filtros
         search = self.request.query_params.get('search', None)
@@ -117,6 +139,14 @@ class StudentListView(generics.ListAPIView):
                 Q(email__icontains=search)
             )
         
+        for param, lookup in (('min_hours', 'total_hours__gte'), ('max_hours', 'total_hours__lte')):
+            try:
+                value = Decimal(self.request.query_params.get(param, ''))
+            except InvalidOperation:
+                continue
+            if value.is_finite():
+                queryset = queryset.filter(**{lookup: value})
+        
         # Ordenamiento
         ordering = self.request.query_params.get('ordering', '-date_joined')
         if ordering:
@@ -144,7 +174,10 @@ class AdminListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = User.objects.filter(user_type='admin')
+        # El conteo de proyectos se anota para no contar por fila
+        queryset = User.objects.filter(user_type='admin').annotate(
+            managed_projects_count=models.Count('managed_projects')
+        )
         
         # Filtros
         search = self.request.query_params.get('search', None)
@@ -230,16 +263,18 @@ class UserScholarshipListView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         user_id = self.request.query_params.get('user_id', None)
+        # El serializer muestra datos de la beca en cada fila
+        queryset = UserScholarship.objects.select_related('scholarship')
         
         if user_id:
-            return UserScholarship.objects.filter(user_id=user_id)
+            return queryset.filter(user_id=user_id)
         
         # Si es admin, puede ver todas las becas
         if self.request.user.user_type == 'admin':
-            return UserScholarship.objects.all()
+            return queryset
         
         # Si es estudiante, solo sus propias becas
-        return UserScholarship.objects.filter(user=self.request.user)
+        return queryset.filter(user=self.request.user)
 
 
 class UserScholarshipDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -308,14 +343,16 @@ def user_dashboard_stats(request):
     """
     user = request.user
     
+    user_progress = progress.student_progress(user)
     stats = {
-        'user': UserSerializer(user).data,
-        'total_hours': user.get_total_hours(),
-        'completed_projects': user.get_completed_projects(),
+        'user': UserSerializer(user, context={'progress': user_progress}).data,
+        'total_hours': user_progress['total_hours'],
+        'completed_projects': user_progress['completed_projects'],
     }
     
-    # Si es estudiante, agregar información de becas
+    # Si es estudiante, agregar desglose por proyecto e información de becas
     if user.user_type == 'student':
+        stats['projects'] = user_progress['projects']
         scholarships = UserScholarship.objects.filter(user=user, status='active')
         stats['active_scholarships'] = scholarships.count()
         stats['scholarships'] = UserScholarshipSerializer(scholarships, many=True).data
@@ -346,6 +383,33 @@ def logout_view(request):
 
 # Vistas para gestión de estudiantes por administradores
 
+SEARCH_MAX_LIMIT = 20
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def student_search(request):
+    """
+    Búsqueda typeahead de estudiantes por prefijo de carnet o nombre (?q=ana gar)
+    """
+    if request.user.user_type != 'admin':
+        return Response(
+            {'error': 'No tienes permisos para realizar esta acción'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), SEARCH_MAX_LIMIT)
+    except ValueError:
+        return Response(
+            {'error': 'limit debe ser un número entero'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    results = search.search_students(request.query_params.get('q', ''), limit=limit)
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
 class AdminStudentCreateView(APIView):
     """
     Vista para que los administradores creen nuevos usuarios estudiantes
@@ -374,6 +438,13 @@ class AdminStudentCreateView(APIView):
                     'message': 'Estudiante creado exitosamente',
                     'temp_password': user.temp_password  # También en el nivel superior para fácil acceso
                 }, status=status.HTTP_201_CREATED)
+            except ValidationError:
+                # El username explícito se tomó en otra transacción entre la validación y el INSERT
+                message = 'Ya existe un usuario con este nombre de usuario.'
+                return Response(
+                    {'error': f'Nombre de usuario: {message}', 'details': {'username': message}},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             except Exception as e:
                 # Capturar errores inesperados durante la creación
                 import traceback
@@ -421,9 +492,78 @@ class AdminStudentCreateView(APIView):
         )
 
 
+class AdminStudentImportView(APIView):
+    """
+    Vista para que los administradores den de alta estudiantes en lote desde un CSV
+    (campo `file`). Ver users/onboarding.py para el formato.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        # Verificar que el usuario sea administrador
+        if request.user.user_type != 'admin':
+            return Response(
+                {'error': 'No tienes permisos para realizar esta acción'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        file = request.FILES.get('file')
+        if file is None:
+            return Response(
+                {'error': 'Se requiere un archivo CSV en el campo file'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true')
+        skip_invalid = str(request.data.get('skip_invalid', '')).lower() in ('1', 'true')
+        try:
+            # Los hashes se calculan en este proceso; las cargas grandes van por el comando
+            result = onboarding.import_students(
+                file, dry_run=dry_run, skip_invalid=skip_invalid, max_rows=onboarding.MAX_REQUEST_ROWS
+            )
+        except onboarding.OnboardingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if result['errors'] and not result['students']:
+            return Response({
+                'error': f"{len(result['errors'])} fila(s) con errores; no se creó ningún estudiante",
+                'details': result['errors']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f"{result['created']} estudiante(s) creado(s)",
+            **result
+        }, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
+
+
+CREDENTIAL_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'full_name', 'carnet', 'phone',
+    'date_of_birth', 'is_active', 'date_joined', 'last_login', 'total_hours',
+    'completed_projects', 'temp_password', 'scholarship_type', 'scholarship_percentage',
+]
+
+CREDENTIALS_MAX_LIMIT = 1000
+
+
+def credential_row(row):
+    """Completa una fila de values() con los campos derivados de la respuesta"""
+    row['full_name'] = f"{row['first_name']} {row['last_name']}".strip() or row['username']
+    row['total_hours'] = float(row['total_hours'])
+    row['scholarship_type'] = row['scholarship_type'] or 'KEY EXCELLENCE'
+    percentage = row['scholarship_percentage']
+    row['scholarship_percentage'] = float(percentage) if percentage else 100.0
+    return {field: row[field] for field in CREDENTIAL_FIELDS}
+
+
 class AdminStudentCredentialsView(APIView):
     """
     Vista para que los administradores vean las credenciales de los estudiantes
+
+    Una sola consulta con las horas y proyectos anotados. Parámetros opcionales:
+    - limit y after: paginación por keyset sobre (date_joined, id); `after` es el
+      id del último estudiante recibido y la respuesta incluye next_after.
+    - export=json|csv: respuesta en streaming, fila por fila, sin cargar todos
+      los estudiantes en memoria.
     """
     permission_classes = [permissions.IsAuthenticated]
     
@@ -435,37 +575,149 @@ class AdminStudentCredentialsView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Obtener todos los estudiantes con sus credenciales
-        students = User.objects.filter(user_type='student').order_by('-date_joined')
-        
-        # Serializar con información completa incluyendo credenciales
-        students_data = []
-        for student in students:
-            student_data = {
-                'id': student.id,
-                'username': student.username,
-                'email': student.email,
-                'first_name': student.first_name,
-                'last_name': student.last_name,
-                'full_name': student.full_name,
-                'carnet': student.carnet,
-                'phone': student.phone,
-                'date_of_birth': student.date_of_birth,
-                'is_active': student.is_active,
-                'date_joined': student.date_joined,
-                'last_login': student.last_login,
-                'total_hours': student.get_total_hours(),
-                'completed_projects': student.get_completed_projects(),
-                'temp_password': student.temp_password,  # Agregar contraseña temporal
-                'scholarship_type': student.scholarship_type or 'KEY EXCELLENCE',
-                'scholarship_percentage': float(student.scholarship_percentage) if student.scholarship_percentage else 100.0,
-            }
-            students_data.append(student_data)
+        students = progress.with_progress(
+            User.objects.filter(user_type='student')
+        ).order_by('-date_joined', '-id').values(
+            *[field for field in CREDENTIAL_FIELDS if field != 'full_name']
+        )
+        
+        export = request.query_params.get('export')
+        if export == 'csv':
+            return self.stream_csv(students)
+        if export == 'json':
+            return self.stream_json(students)
+        if export:
+            return Response(
+                {'error': 'export debe ser json o csv'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        limit = request.query_params.get('limit')
+        if limit is None:
+            students_data = [credential_row(row) for row in students]
+            return Response({
+                'students': students_data,
+                'total_count': len(students_data)
+            }, status=status.HTTP_200_OK)
+        
+        try:
+            limit = min(max(int(limit), 1), CREDENTIALS_MAX_LIMIT)
+            after = request.query_params.get('after')
+            after = int(after) if after else None
+        except ValueError:
+            return Response(
+                {'error': 'limit y after deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        page = students
+        if after is not None:
+            cursor = User.objects.filter(id=after, user_type='student').values('date_joined', 'id').first()
+            if cursor is None:
+                return Response(
+                    {'error': 'Estudiante no encontrado'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            page = students.filter(
+                Q(date_joined__lt=cursor['date_joined']) |
+                Q(date_joined=cursor['date_joined'], id__lt=cursor['id'])
+            )
+        
+        rows = list(page[:limit + 1])
         return Response({
-            'students': students_data,
-            'total_count': len(students_data)
+            'students': [credential_row(row) for row in rows[:limit]],
+            'total_count': students.count(),
+            'next_after': rows[limit - 1]['id'] if len(rows) > limit else None
         }, status=status.HTTP_200_OK)
+    
+    def stream_json(self, students):
+        def content():
+            encoder = JSONEncoder()
+            yield '{"students": ['
+            count = 0
+            for row in students.iterator(chunk_size=2000):
+                yield (',' if count else '') + encoder.encode(credential_row(row))
+                count += 1
+            yield f'], "total_count": {count}}}'
+        
+        return StreamingHttpResponse(content(), content_type='application/json')
+    
+    def stream_csv(self, students):
+        def content():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(CREDENTIAL_FIELDS)
+            for row in students.iterator(chunk_size=2000):
+                data = credential_row(row)
+                writer.writerow(['' if data[field] is None else data[field] for field in CREDENTIAL_FIELDS])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        
+        response = StreamingHttpResponse(content(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="estudiantes.csv"'
+        return response
+
+
+class ScholarshipComplianceView(APIView):
+    """
+    Vista para el reporte de cumplimiento de becas (solo admins)
+
+    Horas aprobadas del año académico contra las requeridas por cada beca
+    activa, con la proyección al cierre del año (users.compliance). Parámetros
+    opcionales: year (año académico), at_risk=true para solo los estudiantes en
+    riesgo y export=csv.
+    
+    El reporte sale de cache: con un cache compartido se invalida en cuanto se
+    aprueban horas; con el LocMemCache por defecto otros workers pueden mostrar
+    el reporte anterior hasta COMPLIANCE_LOCAL_CACHE_TTL segundos (60).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        if request.user.user_type != 'admin':
+            return Response(
+                {'error': 'No tienes permisos para realizar esta acción'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        year = request.query_params.get('year')
+        try:
+            year = int(year) if year else None
+        except ValueError:
+            return Response(
+                {'error': 'year debe ser un número entero'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if year is not None and not 1900 <= year <= 9998:
+            return Response(
+                {'error': 'year fuera de rango'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        report = compliance.compliance_report(year)
+        students = report['students']
+        if request.query_params.get('at_risk') in ('true', '1'):
+            students = [student for student in students if student['at_risk']]
+        
+        export = request.query_params.get('export')
+        if export == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(compliance.REPORT_FIELDS)
+            for student in students:
+                writer.writerow(['' if student[field] is None else student[field] for field in compliance.REPORT_FIELDS])
+            response = HttpResponse(buffer.getvalue(), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="cumplimiento_becas_{report["academic_year"]}.csv"'
+            return response
+        if export:
+            return Response(
+                {'error': 'export debe ser csv'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({**report, 'students': students}, status=status.HTTP_200_OK)
 
 
 class AdminStudentDetailView(APIView):
@@ -491,8 +743,7 @@ class AdminStudentDetailView(APIView):
             )
         
         # Obtener información completa del estudiante
-        from applications.models import Application
-        from hours.models import HourLog
+        student_progress = progress.student_progress(student)
         
         student_data = {
             'id': student.id,
@@ -508,33 +759,15 @@ class AdminStudentDetailView(APIView):
             'is_active': student.is_active,
             'date_joined': student.date_joined,
             'last_login': student.last_login,
-            'total_hours': student.get_total_hours(),
-            'completed_projects': student.get_completed_projects(),
+            'total_hours': student_progress['total_hours'],
+            'completed_projects': student_progress['completed_projects'],
             'temp_password': student.temp_password,  # Contraseña temporal
             'scholarship_type': student.scholarship_type or 'KEY EXCELLENCE',
             'scholarship_percentage': float(student.scholarship_percentage) if student.scholarship_percentage else 100.0,
         }
         
-        # Obtener proyectos en los que está el estudiante
-        applications = Application.objects.filter(user=student).select_related('project')
-        projects_data = []
-        for app in applications:
-            # Obtener horas por proyecto
-            project_hours = HourLog.objects.filter(
-                user=student,
-                project=app.project,
-                status='approved'
-            ).aggregate(total=models.Sum('hours'))['total'] or 0
-            
-            projects_data.append({
-                'project_id': app.project.id,
-                'project_name': app.project.name,
-                'status': app.status,
-                'hours_completed': project_hours,
-                'applied_at': app.applied_at,
-            })
-        
-        student_data['projects'] = projects_data
+        # Proyectos en los que está el estudiante, con sus horas aprobadas
+        student_data['projects'] = student_progress['projects']
         
         # Obtener becas del estudiante
         scholarships = UserScholarship.objects.filter(user=student)